@@ -0,0 +1,210 @@
+"""Admission control for the API gateway.
+
+The gateway holds one pooled database connection per in-flight request. Once
+concurrency exceeds the pool, SQLAlchemy queues the surplus invisibly until its
+pool timeout fires and every request slows down together. The controller below
+admits at most ``max_concurrency`` requests, parks the surplus in a bounded
+priority queue and sheds everything beyond that with a fast 503.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+# --- Route priorities (lower value is served first) ---
+
+PRIORITY_HIGH = 0    # form submissions: losing one costs a whole consultation
+PRIORITY_NORMAL = 1  # single-record reads and other writes
+PRIORITY_LOW = 2     # list browsing, safe to retry
+
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_LOW: "low"}
+
+# Paths that never touch the database and must stay reachable under overload
+EXEMPT_PATHS = ("/metrics", "/docs", "/redoc", "/openapi.json")
+
+
+def default_route_priority(method: str, path: str) -> Optional[int]:
+    """Map a request to its admission priority, or None to bypass admission."""
+    if path.startswith(EXEMPT_PATHS):
+        return None
+    if method == "POST" and path.startswith("/forms"):
+        return PRIORITY_HIGH
+    if method != "GET":
+        return PRIORITY_NORMAL
+    # "/patients/" is a list, "/patients/{id}" is a single record
+    segments = [segment for segment in path.split("/") if segment]
+    if len(segments) == 2:
+        return PRIORITY_NORMAL
+    return PRIORITY_LOW
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of admitted."""
+
+    def __init__(self, reason: str, retry_after: int):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(reason)
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded, priority-ordered wait queue."""
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._in_flight = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+        # Exponentially weighted service time, used to size Retry-After
+        self._service_time = 0.1
+
+        self.admitted_total = 0
+        self.rejected_total: Dict[str, int] = {"queue_full": 0, "timeout": 0, "displaced": 0}
+        self.wait_seconds_total = 0.0
+        self.queued_total = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up for a new arrival."""
+        backlog = (len(self._queue) + 1) / self.max_concurrency
+        return max(1, math.ceil(backlog * self._service_time))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected_total[reason] += 1
+        return AdmissionRejected(reason, self.retry_after())
+
+    def _discard(self, entry: Tuple[int, int, asyncio.Future]) -> None:
+        if entry in self._queue:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+
+    async def acquire(self, priority: int) -> None:
+        """Wait for a slot, raising AdmissionRejected if the request is shed."""
+        if self._in_flight < self.max_concurrency and not self._queue:
+            self._in_flight += 1
+            self.admitted_total += 1
+            return
+
+        if len(self._queue) >= self.max_queue:
+            # The lowest-priority, most recent waiter is the first to go
+            victim = max(self._queue, default=None)
+            if victim is None or victim[0] <= priority:
+                raise self._reject("queue_full")
+            self._discard(victim)
+            victim[2].set_exception(self._reject("displaced"))
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._sequence), future)
+        heapq.heappush(self._queue, entry)
+        self.queued_total += 1
+        started = time.monotonic()
+
+        try:
+            await asyncio.wait_for(future, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            # release() may have handed us the slot just as the wait timed out
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release()
+            else:
+                self._discard(entry)
+            raise self._reject("timeout")
+        except asyncio.CancelledError:
+            # Client went away; hand back a slot we may already have been given
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release()
+            else:
+                self._discard(entry)
+            raise
+        finally:
+            self.wait_seconds_total += time.monotonic() - started
+
+    def release(self, service_time: Optional[float] = None) -> None:
+        """Return a slot, handing it straight to the best waiter if any."""
+        if service_time is not None:
+            self._service_time = 0.8 * self._service_time + 0.2 * service_time
+
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                future.set_result(None)
+                self.admitted_total += 1
+                return
+        self._in_flight -= 1
+
+    def snapshot(self) -> dict:
+        """Point-in-time metrics for the admission metrics endpoint."""
+        depth_by_priority = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, _ in self._queue:
+            depth_by_priority[PRIORITY_NAMES.get(priority, str(priority))] += 1
+
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": len(self._queue),
+            "queue_depth_by_priority": depth_by_priority,
+            "max_queue": self.max_queue,
+            "admitted_total": self.admitted_total,
+            "queued_total": self.queued_total,
+            "rejected_total": dict(self.rejected_total),
+            "avg_queue_wait_seconds": self.wait_seconds_total / self.queued_total if self.queued_total else 0.0,
+            "avg_service_seconds": self._service_time,
+        }
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware that gates HTTP requests through an AdmissionController."""
+
+    def __init__(
+        self,
+        app,
+        controller: AdmissionController,
+        route_priority: Callable[[str, str], Optional[int]] = default_route_priority,
+    ):
+        self.app = app
+        self.controller = controller
+        self.route_priority = route_priority
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        priority = self.route_priority(scope["method"], scope["path"])
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire(priority)
+        except AdmissionRejected as e:
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry later"},
+                status_code=503,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(time.monotonic() - started)
@@ -1,14 +1,19 @@
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, Depends, HTTPException, Response, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import text
 from pydantic import BaseModel
-from typing import List, Optional
-from uuid import UUID, uuid4
+from typing import List, Literal, Optional
+from uuid import UUID
 from datetime import date, datetime
 
+from API_Gateway.admission import AdmissionController, AdmissionControlMiddleware
+from API_Gateway.audit import AuditLog, AuditMiddleware, PostgresAuditWriter
+from API_Gateway.ids import new_id
+
 # --- 1. Configuration and Setup ---
 
 # Load environment variables from .env file
@@ -19,17 +24,67 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable not set. Please create a .env file.")
 
-# Create the FastAPI app instance
-app = FastAPI()
+# Connection pool sizing; admission control is derived from it below
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# Requests beyond the pool capacity wait in a bounded priority queue and are
+# shed with a 503 once it is full, instead of queueing inside SQLAlchemy
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", str(2 * ADMISSION_MAX_CONCURRENCY)))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+
+# Audit entries are buffered in memory and flushed in batches off the request path
+AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "true").lower() == "true"
+AUDIT_MAX_PENDING = int(os.getenv("AUDIT_MAX_PENDING", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1"))
 
 # Database engine setup
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,  # Set to True for debugging to see SQL queries
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
     connect_args={"ssl": "require"}
 )
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# The audit writer gets its own connection so it never competes with requests for the pool
+audit_engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=1,
+    max_overflow=0,
+    connect_args={"ssl": "require"}
+)
+audit_log = AuditLog(
+    PostgresAuditWriter(audit_engine),
+    max_pending=AUDIT_MAX_PENDING,
+    batch_size=AUDIT_BATCH_SIZE,
+    flush_interval=AUDIT_FLUSH_INTERVAL,
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await audit_log.start()
+    yield
+    await audit_log.stop()
+    await audit_engine.dispose()
+    await engine.dispose()
+
+# Create the FastAPI app instance
+app = FastAPI(lifespan=lifespan)
+
+admission = AdmissionController(
+    max_concurrency=ADMISSION_MAX_CONCURRENCY,
+    max_queue=ADMISSION_MAX_QUEUE,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+)
+app.add_middleware(AdmissionControlMiddleware, controller=admission)
+# Added last so it is outermost and also records requests shed by admission control
+if AUDIT_ENABLED:
+    app.add_middleware(AuditMiddleware, audit=audit_log)
+
 # Dependency to get a database session
 async def get_db():
     async with async_session() as session:
@@ -83,6 +138,11 @@ class Patient(PatientBase):
     class Config:
         from_attributes = True
 
+class PatientPage(BaseModel):
+    items: List[Patient]
+    # Pass back as `after` to fetch the next page; None on the last page
+    next_cursor: Optional[UUID] = None
+
 # --- Form Schemas (Simplified for this example) ---
 # In a real app, you would have detailed models for symptoms and medications
 class SymptomCreate(BaseModel):
@@ -100,18 +160,73 @@ class FormCreate(BaseModel):
     symptoms: List[SymptomCreate]
     medications: Optional[List[MedicationCreate]] = None
 
+# --- Stats Schemas ---
+class Stats(BaseModel):
+    doctors: int
+    patients: int
+    forms: int
+    symptoms: int
+    medications: int
+    mode: Literal["exact", "estimated"]
+
+# Response field -> table it counts
+STATS_TABLES = {
+    "doctors": "doctor",
+    "patients": "patient",
+    "forms": "form",
+    "symptoms": "symptom",
+    "medications": "medication",
+}
+
 # --- 3. API Endpoints ---
 
+# === METRICS ENDPOINTS ===
+
+@app.get("/metrics/admission")
+async def read_admission_metrics():
+    return admission.snapshot()
+
+@app.get("/metrics/audit")
+async def read_audit_metrics():
+    return audit_log.snapshot()
+
+# === STATS ENDPOINT ===
+
+@app.get("/stats", response_model=Stats)
+async def read_stats(mode: Literal["exact", "estimated"] = "exact", db: AsyncSession = Depends(get_db)):
+    if mode == "exact":
+        # Counter shards maintained by triggers (db/migrations/001 and 005)
+        query = text("""
+            SELECT table_name, sum(row_count)::bigint AS row_count FROM table_count
+            WHERE table_name = ANY(:tables)
+            GROUP BY table_name
+        """)
+    else:
+        # Planner estimate refreshed by VACUUM/ANALYZE; -1 means never analysed
+        query = text("""
+            SELECT c.relname AS table_name, GREATEST(c.reltuples, 0)::bigint AS row_count
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relname = ANY(:tables)
+        """)
+    result = await db.execute(query, {"tables": list(STATS_TABLES.values())})
+    counts = {row["table_name"]: row["row_count"] for row in result.mappings().all()}
+    return {
+        "mode": mode,
+        **{field: counts.get(table, 0) for field, table in STATS_TABLES.items()},
+    }
+
 # === DOCTOR ENDPOINTS ===
 
 @app.post("/doctors/", response_model=Doctor, status_code=status.HTTP_201_CREATED)
-async def create_doctor(doctor: DoctorCreate, db: AsyncSession = Depends(get_db)):
+async def create_doctor(doctor: DoctorCreate, request: Request, db: AsyncSession = Depends(get_db)):
     query = text("""
         INSERT INTO doctor (doctor_id, full_name, email, phone)
         VALUES (:doctor_id, :full_name, :email, :phone)
         RETURNING *
     """)
-    new_doctor_id = uuid4()
+    new_doctor_id = new_id()
+    request.state.audit_entity_id = new_doctor_id
     result = await db.execute(query, {**doctor.model_dump(), "doctor_id": new_doctor_id})
     await db.commit()
     return result.mappings().first()
@@ -129,6 +244,47 @@ async def read_doctor(doctor_id: UUID, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Doctor not found")
     return db_doctor
 
+@app.get("/doctors/{doctor_id}/patients", response_model=PatientPage)
+async def read_doctor_patients(
+    doctor_id: UUID,
+    limit: int = Query(50, ge=1, le=200),
+    after: Optional[UUID] = None,
+    search: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    # Keyset pagination over the (doctor_id, patient_id) unique index, so each
+    # page costs O(limit) no matter how deep into the roster it is
+    conditions = ["dp.doctor_id = :doctor_id"]
+    params = {"doctor_id": doctor_id, "limit": limit + 1}
+    if after is not None:
+        conditions.append("dp.patient_id > :after")
+        params["after"] = after
+    if search:
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        conditions.append("(p.full_name ILIKE :pattern OR p.email ILIKE :pattern)")
+        params["pattern"] = f"%{escaped}%"
+
+    query = text(f"""
+        SELECT p.* FROM doctor_patient dp
+        JOIN patient p ON p.patient_id = dp.patient_id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY dp.patient_id
+        LIMIT :limit
+    """)
+    result = await db.execute(query, params)
+    rows = result.mappings().all()
+
+    if not rows and after is None:
+        exists = await db.execute(text("SELECT 1 FROM doctor WHERE doctor_id = :id"), {"id": doctor_id})
+        if exists.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Doctor not found")
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1]["patient_id"]
+    return {"items": rows, "next_cursor": next_cursor}
+
 @app.patch("/doctors/{doctor_id}", response_model=Doctor)
 async def update_doctor(doctor_id: UUID, doctor_data: DoctorUpdate, db: AsyncSession = Depends(get_db)):
     update_data = doctor_data.model_dump(exclude_unset=True)
@@ -154,16 +310,37 @@ async def delete_doctor(doctor_id: UUID, db: AsyncSession = Depends(get_db)):
 # === PATIENT ENDPOINTS ===
 
 @app.post("/patients/", response_model=Patient, status_code=status.HTTP_201_CREATED)
-async def create_patient(patient: PatientCreate, db: AsyncSession = Depends(get_db)):
+async def create_patient(
+    patient: PatientCreate,
+    request: Request,
+    doctor_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_db),
+):
     query = text("""
         INSERT INTO patient (patient_id, full_name, dob, sex_at_birth, phone, email)
         VALUES (:patient_id, :full_name, :dob, :sex_at_birth, :phone, :email)
         RETURNING *
     """)
-    new_patient_id = uuid4()
+    new_patient_id = new_id()
+    request.state.audit_entity_id = new_patient_id
     result = await db.execute(query, {**patient.model_dump(), "patient_id": new_patient_id})
+    new_patient = result.mappings().first()
+
+    # Put the patient straight onto the creating doctor's roster
+    if doctor_id is not None:
+        relationship_query = text("""
+            INSERT INTO doctor_patient (doctor_patient_id, doctor_id, patient_id)
+            VALUES (:id, :doctor_id, :patient_id)
+            ON CONFLICT DO NOTHING
+        """)
+        await db.execute(relationship_query, {
+            "id": new_id(),
+            "doctor_id": doctor_id,
+            "patient_id": new_patient_id
+        })
+
     await db.commit()
-    return result.mappings().first()
+    return new_patient
 
 @app.get("/patients/", response_model=List[Patient])
 async def read_patients(db: AsyncSession = Depends(get_db)):
@@ -203,10 +380,11 @@ async def delete_patient(patient_id: UUID, db: AsyncSession = Depends(get_db)):
 # === FORM SUBMISSION ENDPOINT ===
 
 @app.post("/forms/", status_code=status.HTTP_201_CREATED)
-async def create_form_submission(form_data: FormCreate, db: AsyncSession = Depends(get_db)):
+async def create_form_submission(form_data: FormCreate, request: Request, db: AsyncSession = Depends(get_db)):
     # This is a complex transaction, so we handle it carefully.
     # In a real-world scenario, you might use SQLAlchemy's ORM for this to make it cleaner.
-    new_form_id = uuid4()
+    new_form_id = new_id()
+    request.state.audit_entity_id = new_form_id
     
     try:
         # --- Logic to Check and create doctor_patient relationship ---
@@ -226,7 +404,7 @@ async def create_form_submission(form_data: FormCreate, db: AsyncSession = Depen
                 VALUES (:id, :doctor_id, :patient_id)
             """)
             await db.execute(relationship_query, {
-                "id": uuid4(),
+                "id": new_id(),
                 "doctor_id": form_data.doctor_id,
                 "patient_id": form_data.patient_id
             })
@@ -245,7 +423,7 @@ async def create_form_submission(form_data: FormCreate, db: AsyncSession = Depen
 
         # 2. Insert all symptoms and link them
         for symptom in form_data.symptoms:
-            new_symptom_id = uuid4()
+            new_symptom_id = new_id()
             symptom_query = text("""
                 INSERT INTO symptom (symptom_id, name, duration, intensity)
                 VALUES (:symptom_id, :name, :duration, :intensity)
@@ -257,7 +435,7 @@ async def create_form_submission(form_data: FormCreate, db: AsyncSession = Depen
                 VALUES (:form_symptom_id, :form_id, :symptom_id)
             """)
             await db.execute(link_symptom_query, {
-                "form_symptom_id": uuid4(),
+                "form_symptom_id": new_id(),
                 "form_id": new_form_id,
                 "symptom_id": new_symptom_id
             })
@@ -265,7 +443,7 @@ async def create_form_submission(form_data: FormCreate, db: AsyncSession = Depen
         # 3. Insert all medications and link them
         if form_data.medications:
             for medication in form_data.medications:
-                new_medication_id = uuid4()
+                new_medication_id = new_id()
                 medication_query = text("""
                     INSERT INTO medication (medication_id, name, strength)
                     VALUES (:medication_id, :name, :strength)
@@ -277,7 +455,7 @@ async def create_form_submission(form_data: FormCreate, db: AsyncSession = Depen
                     VALUES (:form_medication_id, :form_id, :medication_id)
                 """)
                 await db.execute(link_medication_query, {
-                    "form_medication_id": uuid4(),
+                    "form_medication_id": new_id(),
                     "form_id": new_form_id,
                     "medication_id": new_medication_id
                 })
@@ -0,0 +1,243 @@
+"""Append-only audit trail of clinical data access.
+
+Handlers never write audit rows themselves. The middleware captures one entry
+per request in a bounded in-memory queue after the response has been sent,
+and a background task drains the queue in batches that are written with a
+single COPY each. Audit overhead therefore stays off the request path.
+"""
+
+import asyncio
+import logging
+from datetime import date, datetime, timezone
+from typing import Awaitable, Callable, List, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from API_Gateway.ids import new_id
+
+logger = logging.getLogger(__name__)
+
+# First path segment -> audited entity type
+AUDITED_ENTITIES = {"doctors": "doctor", "patients": "patient", "forms": "form"}
+
+ACTIONS = {"GET": "read", "POST": "create", "PUT": "update", "PATCH": "update", "DELETE": "delete"}
+
+
+class AuditEntry(NamedTuple):
+    audit_id: UUID
+    occurred_at: datetime
+    actor: Optional[str]
+    client_addr: Optional[str]
+    action: str
+    entity_type: str
+    entity_id: Optional[UUID]
+    method: str
+    path: str
+    status_code: int
+
+
+AUDIT_COLUMNS = AuditEntry._fields
+
+
+def classify_request(method: str, path: str) -> Optional[Tuple[str, str, Optional[UUID]]]:
+    """Return (action, entity_type, entity_id) for audited routes, else None."""
+    segments = [segment for segment in path.split("/") if segment]
+    if not segments or segments[0] not in AUDITED_ENTITIES or method not in ACTIONS:
+        return None
+
+    entity_id = None
+    if len(segments) > 1:
+        try:
+            entity_id = UUID(segments[1])
+        except ValueError:
+            return None
+
+    action = ACTIONS[method]
+    if action == "read" and (entity_id is None or len(segments) > 2):
+        # Collection reads, including a doctor's patient roster
+        action = "list"
+    return action, AUDITED_ENTITIES[segments[0]], entity_id
+
+
+class AuditLog:
+    """Bounded buffer of audit entries flushed in batches by a background task."""
+
+    def __init__(
+        self,
+        writer: Callable[[List[AuditEntry]], Awaitable[None]],
+        max_pending: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        enqueue_timeout: float = 0.05,
+        max_attempts: int = 3,
+    ):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.max_attempts = max_attempts
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+
+        self.written_total = 0
+        self.dropped_total = 0
+        self.failed_batches_total = 0
+        self.backpressure_waits_total = 0
+
+    async def submit(self, entry: AuditEntry) -> None:
+        """Queue an entry, waiting briefly if the writer has fallen behind."""
+        try:
+            self._queue.put_nowait(entry)
+            return
+        except asyncio.QueueFull:
+            self.backpressure_waits_total += 1
+
+        try:
+            await asyncio.wait_for(self._queue.put(entry), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.dropped_total += 1
+            logger.error("Audit queue full, dropped entry for %s %s", entry.method, entry.path)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write out everything still queued."""
+        if self._task is not None:
+            if not self._task.done():
+                # The sentinel makes the flusher write the batch it is
+                # collecting and return, rather than lose it to a cancel
+                await self._queue.put(None)
+            await self._task
+            self._task = None
+
+        while not self._queue.empty():
+            await self._write(self._drain(self.batch_size))
+
+    def _drain(self, limit: int) -> List[AuditEntry]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size and None not in batch:
+                batch.extend(self._drain(self.batch_size - len(batch)))
+                remaining = deadline - loop.time()
+                if len(batch) >= self.batch_size or remaining <= 0 or None in batch:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            stopping = None in batch
+            await self._write([entry for entry in batch if entry is not None])
+
+    async def _write(self, batch: List[AuditEntry]) -> None:
+        if not batch:
+            return
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self.writer(batch)
+                self.written_total += len(batch)
+                return
+            except Exception as e:
+                logger.warning("Audit batch write failed (attempt %d): %s", attempt, e)
+                await asyncio.sleep(0.5 * attempt)
+        self.failed_batches_total += 1
+        self.dropped_total += len(batch)
+        logger.error("Audit batch of %d entries dropped after %d attempts", len(batch), self.max_attempts)
+
+    def snapshot(self) -> dict:
+        """Point-in-time metrics for the audit metrics endpoint."""
+        return {
+            "pending": self._queue.qsize(),
+            "max_pending": self._queue.maxsize,
+            "written_total": self.written_total,
+            "dropped_total": self.dropped_total,
+            "failed_batches_total": self.failed_batches_total,
+            "backpressure_waits_total": self.backpressure_waits_total,
+        }
+
+
+class PostgresAuditWriter:
+    """Writes audit batches into the partitioned audit_log table with COPY."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self._partitions: Set[date] = set()
+
+    async def _ensure_partitions(self, months: Set[date]) -> None:
+        missing = months - self._partitions
+        if not missing:
+            return
+        async with self.engine.begin() as conn:
+            for month in sorted(missing):
+                await conn.execute(text("SELECT public.audit_log_ensure_partition(:month)"), {"month": month})
+        self._partitions |= missing
+
+    async def __call__(self, batch: List[AuditEntry]) -> None:
+        await self._ensure_partitions({entry.occurred_at.date().replace(day=1) for entry in batch})
+        async with self.engine.begin() as conn:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                "audit_log", records=batch, columns=AUDIT_COLUMNS, schema_name="public"
+            )
+
+
+class AuditMiddleware:
+    """ASGI middleware that records an audit entry for every clinical data request."""
+
+    def __init__(self, app, audit: AuditLog):
+        self.app = app
+        self.audit = audit
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        classified = classify_request(scope["method"], scope["path"])
+        if classified is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            action, entity_type, entity_id = classified
+            # Create handlers report the new record's id through request.state
+            entity_id = scope.get("state", {}).get("audit_entity_id", entity_id)
+            headers = dict(scope.get("headers") or [])
+            actor = headers.get(b"x-actor-id")
+            client = scope.get("client")
+
+            await self.audit.submit(AuditEntry(
+                audit_id=new_id(),
+                occurred_at=datetime.now(timezone.utc),
+                actor=actor.decode("latin-1") if actor else None,
+                client_addr=client[0] if client else None,
+                action=action,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                method=scope["method"],
+                path=scope["path"],
+                status_code=status_code,
+            ))
@@ -1,19 +1,159 @@
-from fastapi import FastAPI, Body
-from agent.form_agent.schemas import PatientSchema, RecommendationSchema
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Body, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+from typing import AsyncIterator, List
+from pydantic import BaseModel
+import json
+import agent.cache as cache
+from agent.ratelimit import Priority, priority
+from agent.singleflight import SingleFlight, flight_key
+import agent.config as conf
+from agent.form_agent.schemas import PatientSchema, RecommendationSchema, extractionStrategy
 from agent.form_agent.utils import PatientFormBuilder
+from agent.form_agent.session import TranscriptSession
+from agent.batch import BatchItem, extract_batch
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await conf.PROVIDERS.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 builder = PatientFormBuilder()
 
+# Identical requests arriving together, e.g. from Streamlit reruns, share one extraction
+flights = SingleFlight()
+
 
 @app.post("/get_form/", response_model=PatientSchema)
-async def get_form(text: str = Body(...)):
-    form = await builder.get_patient_form(text)
+async def get_form(
+    text: str = Body(...),
+    strategy: extractionStrategy | None = Query(None),
+    no_cache: bool = Query(False),
+):
+    key = flight_key("form", text, strategy, no_cache)
+    with cache.bypass(no_cache):
+        form = await flights.do(key, lambda: builder.get_patient_form(text, strategy))
     return form
 
 
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def sse_stream(
+    results: AsyncIterator[dict | BaseModel],
+    no_cache: bool,
+    level: Priority = Priority.STANDARD,
+) -> AsyncIterator[str]:
+    # "partial" events carry the response so far, "complete" the validated
+    # response and "error" ends a stream that failed part way
+    with cache.bypass(no_cache), priority(level):
+        try:
+            async for result in results:
+                if isinstance(result, BaseModel):
+                    yield sse_event("complete", result.model_dump(mode="json"))
+                else:
+                    yield sse_event("partial", result)
+        except Exception as e:
+            yield sse_event("error", {"message": str(e)})
+
+
+@app.post("/get_form/stream")
+async def stream_form(
+    text: str = Body(...),
+    strategy: extractionStrategy | None = Query(None),
+    no_cache: bool = Query(False),
+):
+    results = builder.stream_patient_form(text, strategy)
+    return StreamingResponse(sse_stream(results, no_cache, Priority.INTERACTIVE), media_type="text/event-stream")
+
+
+@app.post("/get_forms/batch")
+async def get_forms_batch(
+    items: List[BatchItem],
+    strategy: extractionStrategy | None = Query(None),
+    no_cache: bool = Query(False),
+):
+    """Extract many transcripts; one NDJSON line per item, in completion order."""
+    async def stream():
+        with cache.bypass(no_cache), priority(Priority.BACKGROUND):
+            async for result in extract_batch(builder, items, conf.BATCH_CONCURRENCY, strategy):
+                yield json.dumps(result) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.websocket("/sessions/form")
+async def form_session(websocket: WebSocket, strategy: extractionStrategy | None = Query(None)):
+    """Live consultation: receive transcript deltas as text, push form changes as JSON."""
+    await websocket.accept()
+    session = TranscriptSession(builder, strategy)
+
+    try:
+        while True:
+            delta = await websocket.receive_text()
+            if not delta.strip():
+                continue
+            try:
+                with priority(Priority.INTERACTIVE):
+                    changes = await session.update(delta)
+            except Exception as e:
+                await websocket.send_json({"type": "error", "message": str(e)})
+                continue
+            # One reply per delta; an empty `changes` means nothing new was found
+            await websocket.send_json({"type": "update", "version": session.version, "changes": changes})
+    except WebSocketDisconnect:
+        pass
+
+
 @app.post("/get_recommendation/", response_model=RecommendationSchema) 
-async def get_recommendation(text: str = Body(...)):
-    recommendation = await builder.get_patient_recommendation(text)
+async def get_recommendation(text: str = Body(...), no_cache: bool = Query(False)):
+    key = flight_key("recommendation", text, no_cache)
+    with cache.bypass(no_cache), priority(Priority.BACKGROUND):
+        recommendation = await flights.do(key, lambda: builder.get_patient_recommendation(text))
     return recommendation
+
+
+@app.post("/get_recommendation/stream")
+async def stream_recommendation(text: str = Body(...), no_cache: bool = Query(False)):
+    results = builder.stream_patient_recommendation(text)
+    return StreamingResponse(sse_stream(results, no_cache, Priority.BACKGROUND), media_type="text/event-stream")
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    stats = {"enabled": False} if conf.LLM_CACHE is None else {"enabled": True, **await conf.LLM_CACHE.stats()}
+    semantic = conf.SEMANTIC_CACHE
+    stats["semantic"] = {"enabled": False} if semantic is None else {"enabled": True, **await semantic.stats()}
+    stats["single_flight"] = flights.stats()
+    return stats
+
+
+@app.delete("/cache/")
+async def invalidate_cache(schema: str | None = Query(None)):
+    """Drop cached responses for one schema name, e.g. PatientSchema, or all of them."""
+    if conf.LLM_CACHE is None:
+        return {"invalidated": 0}
+    return {"invalidated": await conf.LLM_CACHE.invalidate(schema)}
+
+
+@app.get("/providers/health")
+async def get_provider_health():
+    health = conf.PROVIDER_HEALTH.snapshot(conf.LLM_HEDGE_PERCENTILE)
+    health["queues"] = conf.SCHEDULERS.snapshot()
+    return health
+
+
+@app.get("/usage")
+async def get_token_usage():
+    return conf.TOKEN_USAGE.snapshot()
+
+
+@app.get("/metrics")
+async def get_metrics():
+    return Response(conf.TELEMETRY.exposition(), media_type=CONTENT_TYPE_LATEST)
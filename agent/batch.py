@@ -0,0 +1,150 @@
+"""Batch form extraction for archived consultation notes.
+
+    python -m agent.batch notes.jsonl -o forms.ndjson
+    python -m agent.batch notes/ -o forms.ndjson --concurrency 16 --strategy auto
+
+The input is a JSONL file of {"id": ..., "text": ...} objects or a directory
+of .txt files, whose names become the ids. Every result is appended to the
+output as one NDJSON line, {"id", "form"} or {"id", "error"}, as soon as it
+is ready. The output doubles as the checkpoint: rerunning the same command
+skips ids that already have a form and retries the ones that failed.
+"""
+
+from pydantic import BaseModel
+from typing import AsyncIterator, Iterable, Iterator
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import sys
+
+from agent.form_agent.schemas import extractionStrategy
+from agent.form_agent.utils import PatientFormBuilder
+import agent.config as conf
+
+
+class BatchItem(BaseModel):
+    id: str
+    text: str
+
+
+async def extract_batch(
+    builder: PatientFormBuilder,
+    items: Iterable[BatchItem],
+    concurrency: int = conf.BATCH_CONCURRENCY,
+    strategy: extractionStrategy | None = None,
+) -> AsyncIterator[dict]:
+    """Yield one result per item in completion order, `concurrency` at a time."""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def produce():
+        cancelled = False
+        try:
+            for item in items:
+                await queue.put(item)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # When cancelled, the workers are cancelled too and would never
+            # make room in a full queue for the sentinels
+            if not cancelled:
+                for _ in range(concurrency):
+                    await queue.put(None)
+
+    async def work():
+        while (item := await queue.get()) is not None:
+            try:
+                form = await builder.get_patient_form(item.text, strategy)
+                results.put_nowait({"id": item.id, "form": form.model_dump(mode="json")})
+            except Exception as e:
+                results.put_nowait({"id": item.id, "error": str(e) or type(e).__name__})
+        results.put_nowait(None)
+
+    tasks = [asyncio.create_task(produce())] + [asyncio.create_task(work()) for _ in range(concurrency)]
+    try:
+        running = concurrency
+        while running:
+            result = await results.get()
+            if result is None:
+                running -= 1
+                continue
+            yield result
+        # Surface a failure to read the input
+        await tasks[0]
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def read_items(source: Path) -> Iterator[BatchItem]:
+    if source.is_dir():
+        for path in sorted(source.glob("*.txt")):
+            yield BatchItem(id=path.stem, text=path.read_text())
+        return
+
+    with source.open() as f:
+        for line in f:
+            if line.strip():
+                yield BatchItem.model_validate_json(line)
+
+
+def completed_ids(output: Path) -> set[str]:
+    if not output.exists():
+        return set()
+    done = set()
+    with output.open() as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by an interrupted run
+                continue
+            if "form" in result:
+                done.add(result["id"])
+    return done
+
+
+async def run(source: Path, output: Path, concurrency: int, strategy: extractionStrategy | None) -> tuple[int, int]:
+    done = completed_ids(output)
+    pending = (item for item in read_items(source) if item.id not in done)
+    if done:
+        print(f"Resuming: {len(done)} transcripts already extracted", file=sys.stderr)
+
+    succeeded = failed = 0
+    with output.open("a+") as out:
+        # Start on a fresh line if the last run stopped mid-write
+        if out.tell() > 0:
+            out.seek(out.tell() - 1)
+            if out.read(1) != "\n":
+                out.write("\n")
+        async for result in extract_batch(PatientFormBuilder(), pending, concurrency, strategy):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            if "form" in result:
+                succeeded += 1
+            else:
+                failed += 1
+            if (succeeded + failed) % 50 == 0:
+                print(f"{succeeded + failed} processed, {failed} failed", file=sys.stderr)
+    return succeeded, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", type=Path, help="JSONL file or directory of .txt transcripts")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="NDJSON results, also the checkpoint")
+    parser.add_argument("--concurrency", type=int, default=conf.BATCH_CONCURRENCY)
+    parser.add_argument("--strategy", choices=[s.value for s in extractionStrategy])
+    args = parser.parse_args()
+
+    strategy = extractionStrategy(args.strategy) if args.strategy else None
+    succeeded, failed = asyncio.run(run(args.source, args.output, args.concurrency, strategy))
+    print(f"Done: {succeeded} extracted, {failed} failed", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
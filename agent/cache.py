@@ -0,0 +1,177 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pydantic import BaseModel, ValidationError
+from typing import Iterator, Type
+from pathlib import Path
+import threading
+import hashlib
+import sqlite3
+import asyncio
+import json
+import time
+
+######################################################################
+#                        LLM Response Cache                          #
+######################################################################
+
+# Set for the duration of a request that must reach the provider
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass(enabled: bool = True) -> Iterator[None]:
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def is_bypassed() -> bool:
+    return _bypass.get()
+
+
+def cache_key(prompt: str, schema: Type[BaseModel], model: str) -> str:
+    # The JSON schema is part of the key so editing a schema never serves
+    # results shaped for the old one
+    payload = json.dumps(
+        [prompt, schema.model_json_schema(), model],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMCache:
+    """Validated LLM responses in SQLite, keyed by prompt, schema and model.
+
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted beyond `max_entries`. SQLite calls run in a worker thread.
+    """
+
+    def __init__(self, path: Path | str, ttl: float = 86400.0, max_entries: int = 10_000):
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                schema TEXT NOT NULL,
+                model TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at);
+            CREATE INDEX IF NOT EXISTS llm_cache_schema ON llm_cache (schema);
+            """
+        )
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.expired = 0
+        self.evictions = 0
+        self.bypassed = 0
+
+    def _get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_at = row
+            if now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.expired += 1
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def _put(self, key: str, schema: str, model: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, schema, model, value, now, now),
+            )
+            evicted = self._conn.execute(
+                """
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            ).rowcount
+            self.evictions += evicted
+
+    def _invalidate(self, schema: str | None) -> int:
+        with self._lock, self._conn:
+            if schema is None:
+                return self._conn.execute("DELETE FROM llm_cache").rowcount
+            return self._conn.execute("DELETE FROM llm_cache WHERE schema = ?", (schema,)).rowcount
+
+    def _invalidate_key(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    def _count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    async def get(self, prompt: str, schema: Type[BaseModel], model: str) -> BaseModel | None:
+        if is_bypassed():
+            self.bypassed += 1
+            return None
+
+        key = cache_key(prompt, schema, model)
+        value = await asyncio.to_thread(self._get, key)
+        if value is not None:
+            try:
+                resp = schema.model_validate_json(value)
+                self.hits += 1
+                return resp
+            except ValidationError:
+                await asyncio.to_thread(self._invalidate_key, key)
+
+        self.misses += 1
+        return None
+
+    async def put(self, prompt: str, schema: Type[BaseModel], model: str, resp: BaseModel) -> None:
+        key = cache_key(prompt, schema, model)
+        await asyncio.to_thread(self._put, key, schema.__name__, model, resp.model_dump_json())
+        self.stores += 1
+
+    async def invalidate(self, schema: Type[BaseModel] | str | None = None) -> int:
+        """Drop every entry for one response schema, or all entries."""
+        if isinstance(schema, type):
+            schema = schema.__name__
+        return await asyncio.to_thread(self._invalidate, schema)
+
+    async def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": await asyncio.to_thread(self._count),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "bypassed": self.bypassed,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,12 +1,15 @@
-from instructor import from_openai
-
 # import google.generativeai as genai
 from dotenv import load_dotenv
-from openai import OpenAI
 from pathlib import Path
 from os import getenv
 
-from agent.schemas import ClientBase
+from agent.cache import LLMCache
+from agent.resilience import ProviderHealth
+from agent.telemetry import UsageStats, CallTelemetry
+from agent.ratelimit import TokenBucket, Schedulers, parse_limits
+from agent.providers import ProviderConfig, ProviderRegistry, load_providers
+from agent.transport import TransportConfig
+import agent.semantic_cache as semantic_cache
 
 ######################################################################
 #                            LLM Clients                             #
@@ -25,15 +28,146 @@ GPT35TURBO = "gpt-3.5-turbo"
 GPT4oMINI = "gpt-4o-mini"
 GEMINI = "models/gemini-1.5-flash-latest"
 
-OPENAI_CLIENT = from_openai(OpenAI(api_key=OPENAI_API_KEY))
+# Per-call deadline and per-client cap on calls in flight
+LLM_TIMEOUT = float(getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_CONCURRENCY = int(getenv("LLM_MAX_CONCURRENCY", "8"))
+
+# Fire the next client once a call outlasts this percentile of the current
+# client's recent latencies, and stop trying a client after repeated failures
+LLM_HEDGE_PERCENTILE = float(getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_MIN_SAMPLES = int(getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_BREAKER_FAILURES = int(getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET = float(getenv("LLM_BREAKER_RESET", "30"))
+
+PROVIDER_HEALTH = ProviderHealth(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET, LLM_HEDGE_MIN_SAMPLES)
+TOKEN_USAGE = UsageStats()
+
+# One JSONL line per LLM call (model, schema, outcome, latency, tokens) is
+# appended here when set. Prompts and responses are never written.
+LLM_TRACE_PATH = getenv("LLM_TRACE_PATH")
+TELEMETRY = CallTelemetry(LLM_TRACE_PATH)
+
+# Requests per minute across every client, shared by interactive and batch
+# traffic. 0 disables the limiter.
+LLM_RATE_LIMIT_RPM = float(getenv("LLM_RATE_LIMIT_RPM", "0"))
+LLM_RATE_LIMIT_BURST = float(getenv("LLM_RATE_LIMIT_BURST", "10"))
+RATE_LIMITER = TokenBucket(LLM_RATE_LIMIT_RPM / 60, LLM_RATE_LIMIT_BURST) if LLM_RATE_LIMIT_RPM > 0 else None
+
+# The provider's own limits per model, "model=rpm:tpm,..", with LLM_MODEL_RPM
+# and LLM_MODEL_TPM for models not listed. Calls beyond them queue by
+# priority (live sessions first, batch and recommendations last) instead of
+# failing. 0 is unlimited.
+LLM_MODEL_LIMITS = getenv("LLM_MODEL_LIMITS", "")
+LLM_MODEL_RPM = float(getenv("LLM_MODEL_RPM", "0"))
+LLM_MODEL_TPM = float(getenv("LLM_MODEL_TPM", "0"))
+SCHEDULERS = Schedulers(parse_limits(LLM_MODEL_LIMITS), default=(LLM_MODEL_RPM, LLM_MODEL_TPM))
+
+# Transcripts extracted at once by /get_forms/batch and the batch CLI
+BATCH_CONCURRENCY = int(getenv("AGENT_BATCH_CONCURRENCY", "8"))
+
 # GEMINI_CLIENT = from_gemini(
 #     client=genai.GenerativeModel(
 #         model_name=GEMINI,
 #     )
 # )
 
-CLIENTS = [
-    # ClientBase(client=GEMINI_CLIENT, model=GEMINI),
-    ClientBase(client=OPENAI_CLIENT, model=GPT35TURBO),
-    ClientBase(client=OPENAI_CLIENT, model=GPT4oMINI),
-]
+# LLM_PROVIDER=simulated swaps the real models for an offline fake with
+# configurable latency and failure rates, for load tests and benchmarks
+LLM_PROVIDER = getenv("LLM_PROVIDER", "openai")
+
+DEFAULT_PROVIDERS = {
+    "openai": ProviderConfig(
+        name="openai",
+        models=[GPT35TURBO, GPT4oMINI],
+        api_key_env="OPENAI_API_KEY",
+        timeout=LLM_TIMEOUT,
+        max_concurrency=LLM_MAX_CONCURRENCY,
+    ),
+    "simulated": ProviderConfig(
+        name="simulated",
+        kind="simulated",
+        models=["simulated"],
+        timeout=LLM_TIMEOUT,
+        max_concurrency=LLM_MAX_CONCURRENCY,
+        options={
+            "latency_median": float(getenv("SIMULATED_LATENCY_MEDIAN", "0.8")),
+            "latency_sigma": float(getenv("SIMULATED_LATENCY_SIGMA", "0.5")),
+            "error_rate": float(getenv("SIMULATED_ERROR_RATE", "0")),
+            "validation_failure_rate": float(getenv("SIMULATED_VALIDATION_FAILURE_RATE", "0")),
+        },
+    ),
+}
+
+# The fallback chain as a JSON list of providers, inline or in a file, e.g.
+# [{"name": "local", "base_url": "http://localhost:11434/v1", "api_key": "ollama",
+#   "models": [{"name": "llama3.1", "rpm": 600}]}]
+# Without it, LLM_PROVIDER picks one of DEFAULT_PROVIDERS.
+LLM_PROVIDERS = load_providers(getenv("LLM_PROVIDERS"), getenv("LLM_PROVIDERS_FILE"))
+
+# One connection pool shared by every HTTP provider. HTTP/2 is used when the
+# h2 package is installed.
+LLM_HTTP_READ_TIMEOUT = getenv("LLM_HTTP_READ_TIMEOUT")
+TRANSPORT = TransportConfig(
+    max_connections=int(getenv("LLM_HTTP_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(getenv("LLM_HTTP_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=float(getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "30")),
+    connect_timeout=float(getenv("LLM_HTTP_CONNECT_TIMEOUT", "5")),
+    read_timeout=float(LLM_HTTP_READ_TIMEOUT) if LLM_HTTP_READ_TIMEOUT else None,
+    http2=getenv("LLM_HTTP2", "true").lower() == "true",
+)
+
+PROVIDERS = ProviderRegistry(
+    LLM_PROVIDERS or [DEFAULT_PROVIDERS[LLM_PROVIDER]],
+    schedulers=SCHEDULERS,
+    transport=TRANSPORT,
+    telemetry=TELEMETRY,
+)
+
+
+def __getattr__(name: str):
+    # Clients are only built, and the provider SDKs only imported, on first use
+    if name == "CLIENTS":
+        return PROVIDERS.clients()
+    if name == "OPENAI_CLIENT":
+        return PROVIDERS.instance("openai")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+######################################################################
+#                         LLM Response Cache                         #
+######################################################################
+
+# Off by default: cached responses hold patient details in plain SQLite
+LLM_CACHE_ENABLED = getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+LLM_CACHE_PATH = getenv("LLM_CACHE_PATH", str(BASE_DIR / "llm_cache.sqlite3"))
+LLM_CACHE_TTL = float(getenv("LLM_CACHE_TTL", "86400"))
+LLM_CACHE_MAX_ENTRIES = int(getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+LLM_CACHE = LLMCache(LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES) if LLM_CACHE_ENABLED else None
+
+######################################################################
+#                     Semantic Transcript Cache                      #
+######################################################################
+
+# Reuses a previous form for a near-identical transcript. "numpy" keeps the
+# index in process for development; "pgvector" shares it through Postgres.
+SEMANTIC_CACHE_ENABLED = getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_BACKEND = getenv("SEMANTIC_CACHE_BACKEND", "numpy")
+SEMANTIC_CACHE_MODEL = getenv("SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2")
+SEMANTIC_CACHE_THRESHOLD = float(getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000"))
+SEMANTIC_CACHE_DATABASE_URL = getenv("SEMANTIC_CACHE_DATABASE_URL", getenv("DATABASE_URL"))
+
+
+def _semantic_index() -> semantic_cache.VectorIndex:
+    if SEMANTIC_CACHE_BACKEND == "pgvector":
+        if not SEMANTIC_CACHE_DATABASE_URL:
+            raise ValueError("SEMANTIC_CACHE_DATABASE_URL or DATABASE_URL must be set for the pgvector backend.")
+        return semantic_cache.PgVectorIndex(SEMANTIC_CACHE_DATABASE_URL, max_entries=SEMANTIC_CACHE_MAX_ENTRIES)
+    return semantic_cache.NumpyIndex(max_entries=SEMANTIC_CACHE_MAX_ENTRIES)
+
+
+SEMANTIC_CACHE = semantic_cache.SemanticCache(
+    _semantic_index(),
+    semantic_cache.SentenceTransformerEmbedder(SEMANTIC_CACHE_MODEL),
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+) if SEMANTIC_CACHE_ENABLED else None
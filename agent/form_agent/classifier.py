@@ -0,0 +1,141 @@
+from typing import Awaitable, Callable
+import numpy as np
+import re
+
+from agent.form_agent.schemas import infoIntent as ii
+
+######################################################################
+#                      Local Intent Classification                   #
+######################################################################
+
+# Sentences typical of each intent. A transcript sentence close to any of
+# them counts as a mention.
+PROTOTYPES = {
+    ii.PII: [
+        "My name is John Smith.",
+        "I am 45 years old.",
+        "I was born on the 3rd of March 1980.",
+        "You can email me at john@example.com.",
+        "I'm a 32 year old woman.",
+        "The patient is Maria Garcia, aged 60.",
+    ],
+    ii.MEDS: [
+        "I take Metformin 500 mg twice a day.",
+        "I'm currently on ibuprofen for the pain.",
+        "My doctor prescribed me antibiotics last week.",
+        "I use an inhaler every morning.",
+        "I stopped taking my blood pressure tablets.",
+        "She takes one pill of Lisinopril daily.",
+    ],
+    ii.SYMPS: [
+        "I've had a headache for three days.",
+        "I feel tired and dizzy all the time.",
+        "There's a sharp pain in my chest.",
+        "I have a cough and a fever.",
+        "I've been feeling nauseous since Monday.",
+        "My knee hurts when I walk.",
+    ],
+}
+
+# Used instead of embeddings when the model cannot be loaded
+KEYWORDS = {
+    ii.PII: re.compile(
+        r"\b(my name|name is|years? old|aged? \d+|born|birthday|date of birth)\b|@",
+        re.IGNORECASE,
+    ),
+    ii.MEDS: re.compile(
+        r"\b(mg|tablets?|pills?|capsules?|medications?|medicines?|prescribed|prescription|dose|dosage"
+        r"|inhaler|antibiotics?|taking|take)\b",
+        re.IGNORECASE,
+    ),
+    ii.SYMPS: re.compile(
+        r"\b(pain|aches?|headaches?|hurts?|sore|fever|cough(ing)?|nause\w*|vomit\w*|dizz\w*|tired|fatigue"
+        r"|rash|itch\w*|swollen|breath|symptoms?|feel(ing)? (sick|unwell|bad))\b",
+        re.IGNORECASE,
+    ),
+}
+
+_SENTENCES = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def split_sentences(text: str) -> list[str]:
+    return [sentence.strip() for sentence in _SENTENCES.split(text) if sentence.strip()]
+
+
+class IntentClassifier:
+    """Decides which intents a transcript mentions without calling an LLM.
+
+    Each transcript sentence is embedded and compared with the prototype
+    sentences of every intent. An intent scoring at least `present` is
+    mentioned and one below `absent` is not; anything in between is left to
+    the LLM by returning None. When the embedding model is unavailable,
+    keyword matching takes over.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[list[str]], Awaitable[np.ndarray]],
+        present: float = 0.55,
+        absent: float = 0.35,
+    ):
+        self.embed = embed
+        self.present = present
+        self.absent = absent
+
+        self._prototypes: np.ndarray | None = None
+        self._labels = np.array([intent.value for intent, sentences in PROTOTYPES.items() for _ in sentences])
+        self._embeddings_available = True
+
+        self.classified = 0
+        self.keyword_fallbacks = 0
+        self.escalated = 0
+
+    async def scores(self, text: str) -> dict[ii, float]:
+        """Best similarity between any transcript sentence and each intent's prototypes."""
+        if self._prototypes is None:
+            self._prototypes = np.asarray(await self.embed([s for sentences in PROTOTYPES.values() for s in sentences]))
+
+        sentences = split_sentences(text)
+        if not sentences:
+            return {intent: 0.0 for intent in PROTOTYPES}
+
+        # Embeddings are normalised, so the dot product is the cosine similarity
+        similarities = np.asarray(await self.embed(sentences)) @ self._prototypes.T
+        best = similarities.max(axis=0)
+        return {intent: float(best[self._labels == intent.value].max()) for intent in PROTOTYPES}
+
+    def keywords(self, text: str) -> dict[ii, bool] | None:
+        detected = {intent: bool(pattern.search(text)) for intent, pattern in KEYWORDS.items()}
+        # No keyword at all says little about an unusual transcript
+        return detected if any(detected.values()) else None
+
+    async def classify(self, text: str) -> dict[ii, bool] | None:
+        """Intents mentioned in `text`, or None when the LLM should decide."""
+        detected = None
+        if self._embeddings_available:
+            try:
+                scores = await self.scores(text)
+            except (ImportError, OSError) as e:
+                print(f"Intent embeddings unavailable, using keywords: {e}")
+                self._embeddings_available = False
+            else:
+                if all(score >= self.present or score < self.absent for score in scores.values()):
+                    detected = {intent: score >= self.present for intent, score in scores.items()}
+
+        if not self._embeddings_available:
+            self.keyword_fallbacks += 1
+            detected = self.keywords(text)
+
+        if detected is None:
+            self.escalated += 1
+        else:
+            self.classified += 1
+        return detected
+
+    def stats(self) -> dict:
+        return {
+            "embeddings_available": self._embeddings_available,
+            "classified": self.classified,
+            "keyword_fallbacks": self.keyword_fallbacks,
+            "escalated": self.escalated,
+        }
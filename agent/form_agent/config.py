@@ -0,0 +1,66 @@
+from os import getenv
+
+from agent.form_agent.schemas import infoIntent as ii
+from agent.form_agent.classifier import IntentClassifier
+from agent.form_agent.pii import PIIExtractor
+from agent.semantic_cache import SentenceTransformerEmbedder
+
+######################################################################
+#                        Form Builder Settings                       #
+######################################################################
+
+# Start every per-intent extraction together with classification and drop
+# the ones it rules out. Trades extra provider calls for one fewer round trip.
+SPECULATIVE_EXTRACTION = getenv("AGENT_SPECULATIVE_EXTRACTION", "false").lower() == "true"
+
+# "multi-call" classifies first and extracts each intent separately,
+# "single-call" fills the whole form with one structured call and "auto"
+# picks single-call for transcripts up to SINGLE_CALL_MAX_CHARS
+EXTRACTION_STRATEGY = getenv("AGENT_EXTRACTION_STRATEGY", "multi-call")
+SINGLE_CALL_MAX_CHARS = int(getenv("AGENT_SINGLE_CALL_MAX_CHARS", "2000"))
+
+# Transcripts longer than CHUNK_MIN_CHARS are split into overlapping chunks
+# of CHUNK_CHARS, extracted CHUNK_CONCURRENCY at a time and merged, instead of
+# having their middle trimmed to the token budget. 0 disables chunking.
+CHUNK_MIN_CHARS = int(getenv("AGENT_CHUNK_MIN_CHARS", "12000"))
+CHUNK_CHARS = int(getenv("AGENT_CHUNK_CHARS", "6000"))
+CHUNK_OVERLAP_CHARS = int(getenv("AGENT_CHUNK_OVERLAP_CHARS", "400"))
+CHUNK_CONCURRENCY = int(getenv("AGENT_CHUNK_CONCURRENCY", "4"))
+
+# Earlier transcript kept in front of each streamed delta, so a sentence
+# split across two deltas is still understood
+SESSION_CONTEXT_CHARS = int(getenv("AGENT_SESSION_CONTEXT_CHARS", "500"))
+
+# Transcript tokens sent per call; longer transcripts keep their opening and
+# end. Classification only needs the gist, so it gets half.
+TRANSCRIPT_TOKEN_BUDGET = int(getenv("AGENT_TRANSCRIPT_TOKEN_BUDGET", "3000"))
+TRANSCRIPT_TOKEN_BUDGETS = {
+    ii.CONT: TRANSCRIPT_TOKEN_BUDGET // 2,
+    ii.PII: TRANSCRIPT_TOKEN_BUDGET,
+    ii.MEDS: TRANSCRIPT_TOKEN_BUDGET,
+    ii.SYMPS: TRANSCRIPT_TOKEN_BUDGET,
+    ii.ALL: TRANSCRIPT_TOKEN_BUDGET,
+}
+
+# "local" decides which intents a transcript mentions with a sentence
+# embedding model, falling back to keywords without it, and only asks the LLM
+# when a score lands between the two thresholds. "llm" always asks the LLM.
+INTENT_CLASSIFIER = getenv("AGENT_INTENT_CLASSIFIER", "llm")
+INTENT_MODEL = getenv("AGENT_INTENT_MODEL", "all-MiniLM-L6-v2")
+INTENT_PRESENT_THRESHOLD = float(getenv("AGENT_INTENT_PRESENT_THRESHOLD", "0.55"))
+INTENT_ABSENT_THRESHOLD = float(getenv("AGENT_INTENT_ABSENT_THRESHOLD", "0.35"))
+
+LOCAL_CLASSIFIER = IntentClassifier(
+    SentenceTransformerEmbedder(INTENT_MODEL),
+    present=INTENT_PRESENT_THRESHOLD,
+    absent=INTENT_ABSENT_THRESHOLD,
+) if INTENT_CLASSIFIER == "local" else None
+
+# "local" reads names, emails and dates of birth with patterns and only asks
+# the LLM when they are missing, conflicting or ambiguous, so most PII never
+# leaves the server. "llm" always asks the LLM.
+PII_EXTRACTOR = getenv("AGENT_PII_EXTRACTOR", "local")
+# Whether 03/04/1980 is the 3rd of April; dates that read both ways go to the LLM
+PII_DAY_FIRST = getenv("AGENT_PII_DAY_FIRST", "true").lower() == "true"
+
+LOCAL_PII_EXTRACTOR = PIIExtractor(day_first=PII_DAY_FIRST) if PII_EXTRACTOR == "local" else None
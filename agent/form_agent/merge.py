@@ -0,0 +1,84 @@
+from pydantic import BaseModel
+from typing import Any
+
+import agent.form_agent.schemas as schemas
+
+######################################################################
+#                          Form Merging                              #
+######################################################################
+
+
+def normalize_name(name: str | None) -> str:
+    return " ".join((name or "").lower().split())
+
+
+def _merge_fields(old: BaseModel | None, new: BaseModel | None, keep: tuple[str, ...] = ()) -> BaseModel | None:
+    # Values the newer extraction actually found win; gaps keep the old value
+    if old is None:
+        return new
+    if new is None:
+        return old
+    found = {field: value for field, value in new if value is not None and field not in ("error", *keep)}
+    return old.model_copy(update=found)
+
+
+def _merge_items(old: list[BaseModel], new: list[BaseModel]) -> list[BaseModel]:
+    merged = {normalize_name(item.name): item for item in old}
+    for item in new:
+        key = normalize_name(item.name)
+        # The first spelling of a name is the one the doctor has already seen
+        merged[key] = _merge_fields(merged.get(key), item, keep=("name",))
+    return list(merged.values())
+
+
+def merge_forms(base: schemas.PatientSchema, update: schemas.PatientSchema) -> schemas.PatientSchema:
+    """Fold a form extracted from new text into the existing one.
+
+    Medications and symptoms are matched by normalised name, so a repeated
+    mention refines the existing entry instead of adding a duplicate.
+    """
+    medication = base.medication
+    if update.medication is not None:
+        meds = _merge_items(base.medication.meds if base.medication else [], update.medication.meds)
+        medication = schemas.ListMedicationSchema(meds=meds, error=None)
+
+    symptoms = base.symptoms
+    if update.symptoms is not None:
+        symps = _merge_items(base.symptoms.symps if base.symptoms else [], update.symptoms.symps)
+        symptoms = schemas.ListSymptomSchema(symps=symps, error=None)
+
+    return schemas.PatientSchema(
+        pii=_merge_fields(base.pii, update.pii),
+        medication=medication,
+        symptoms=symptoms,
+    )
+
+
+def _changed_items(old: list[BaseModel], new: list[BaseModel]) -> list[dict]:
+    previous = {normalize_name(item.name): item for item in old}
+    return [
+        item.model_dump(mode="json")
+        for item in new
+        if previous.get(normalize_name(item.name)) != item
+    ]
+
+
+def diff_forms(old: schemas.PatientSchema, new: schemas.PatientSchema) -> dict[str, Any]:
+    """Fields of `new` that differ from `old`; list sections only carry changed entries."""
+    changes: dict[str, Any] = {}
+
+    old_pii = old.pii.model_dump(mode="json") if old.pii else {}
+    new_pii = new.pii.model_dump(mode="json", exclude={"error"}) if new.pii else {}
+    pii = {field: value for field, value in new_pii.items() if old_pii.get(field) != value}
+    if pii:
+        changes["pii"] = pii
+
+    meds = _changed_items(old.medication.meds if old.medication else [], new.medication.meds if new.medication else [])
+    if meds:
+        changes["medication"] = meds
+
+    symps = _changed_items(old.symptoms.symps if old.symptoms else [], new.symptoms.symps if new.symptoms else [])
+    if symps:
+        changes["symptoms"] = symps
+
+    return changes
@@ -0,0 +1,188 @@
+from dataclasses import dataclass, field
+from datetime import date
+from pydantic import ValidationError
+import re
+
+import agent.form_agent.schemas as schemas
+from agent.form_agent.classifier import split_sentences
+
+######################################################################
+#                       Local PII Extraction                         #
+######################################################################
+
+EMAIL = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+EMAIL_CUE = re.compile(r"\b(e-?mail|email address)\b", re.IGNORECASE)
+
+# Names follow one of these cues and are capitalised, so "my name is john"
+# from a lower-case transcript is left to the LLM
+_NAME_WORD = r"[A-Z][\w'’-]*"
+_NAME_PARTICLE = r"(?:de|da|del|der|di|la|le|van|von|bin|ibn)"
+_NAME = (
+    r"\s+(?:(?:Mr|Mrs|Ms|Miss|Dr)\.?\s+)?"
+    rf"(?P<name>{_NAME_WORD}(?:\s+(?:{_NAME_PARTICLE}\s+)*{_NAME_WORD}){{0,3}})"
+)
+NAME = re.compile(r"(?i:\b(?:my name is|my name's|name is|name's|name:|i am called|call me))" + _NAME)
+# "I am Greek" and "I'm Fine" capitalise words that are not names, so these
+# cues alone never make a confident name
+WEAK_NAME = re.compile(r"(?i:\b(?:i'm|i’m|i am|patient is))" + _NAME)
+NAME_CUE = re.compile(r"\b(my name|name is|name's|name:|call me)\b", re.IGNORECASE)
+
+BIRTH_CUE = re.compile(r"\b(born|birthday|date of birth|d\.?o\.?b\.?)\b", re.IGNORECASE)
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH = r"(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?" \
+         r"|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?"
+_DAY = r"(?P<day>\d{1,2})(?:st|nd|rd|th)?"
+_YEAR = r"(?P<year>\d{4})"
+DATES = [
+    # 1980-03-14, 1980/03/14
+    re.compile(r"\b(?P<year>\d{4})[-/.](?P<month>\d{1,2})[-/.](?P<day>\d{1,2})\b"),
+    # 14/03/1980, 03-14-80; day or month first, see `day_first`
+    re.compile(r"\b(?P<first>\d{1,2})[-/.](?P<second>\d{1,2})[-/.](?P<year>\d{4}|\d{2})\b"),
+    # 14 March 1980, 14th of March, 1980
+    re.compile(rf"\b{_DAY}\s+(?:of\s+)?{_MONTH},?\s+{_YEAR}\b", re.IGNORECASE),
+    # March 14, 1980, Mar 14th 1980
+    re.compile(rf"\b{_MONTH}\s+{_DAY},?\s+{_YEAR}\b", re.IGNORECASE),
+]
+
+
+@dataclass
+class LocalPII:
+    pii: schemas.PatientPIISchema
+    # Why the LLM should extract instead, e.g. "name:conflict"
+    uncertain: list[str] = field(default_factory=list)
+
+    @property
+    def confident(self) -> bool:
+        return not self.uncertain
+
+
+def _year(year: str) -> int:
+    if len(year) == 4:
+        return int(year)
+    # Two-digit years in the future belong to the previous century
+    return 2000 + int(year) if int(year) <= date.today().year % 100 else 1900 + int(year)
+
+
+def parse_dates(text: str, day_first: bool = True) -> tuple[list[date], bool]:
+    """Dates written in `text`, and whether any of them could be read two ways."""
+    found, ambiguous = [], False
+    for pattern in DATES:
+        for match in pattern.finditer(text):
+            parts = match.groupdict()
+            if "first" in parts:
+                first, second = int(parts["first"]), int(parts["second"])
+                if first <= 12 and second <= 12 and first != second:
+                    ambiguous = True
+                day, month = (first, second) if day_first else (second, first)
+                if month > 12:
+                    day, month = month, day
+            else:
+                day = int(parts["day"])
+                month = int(parts["month"]) if parts["month"].isdigit() else MONTHS[parts["month"].lower()[:3]]
+            try:
+                found.append(date(_year(parts["year"]), month, day))
+            except ValueError:
+                continue
+    return found, ambiguous
+
+
+def _same_person(names: list[str]) -> str | None:
+    # "John" and "John Smith" are one person; the fuller name is kept
+    names = sorted(set(names), key=len, reverse=True)
+    fullest = names[0].split()
+    if all(set(name.split()) <= set(fullest) for name in names[1:]):
+        return names[0]
+    return None
+
+
+class PIIExtractor:
+    """Reads names, emails and dates of birth from a transcript without an LLM.
+
+    Each field is taken from a well-defined pattern. When a cue is present
+    without a readable value, a name only follows "I am", values conflict or
+    a date could be read two ways, the result is marked uncertain and the
+    LLM extracts instead.
+    """
+
+    def __init__(self, day_first: bool = True):
+        self.day_first = day_first
+
+        self.extracted = 0
+        self.escalated = 0
+
+    def _name(self, text: str, uncertain: list[str]) -> str | None:
+        names = [" ".join(match.group("name").split()) for match in NAME.finditer(text)]
+        if not names:
+            if NAME_CUE.search(text):
+                uncertain.append("name:unreadable")
+            elif WEAK_NAME.search(text):
+                uncertain.append("name:weak_cue")
+            return None
+        name = _same_person(names)
+        if name is None:
+            uncertain.append("name:conflict")
+        return name
+
+    def _email(self, text: str, uncertain: list[str]) -> str | None:
+        emails = {email.lower() for email in EMAIL.findall(text)}
+        if not emails:
+            if EMAIL_CUE.search(text):
+                uncertain.append("email:unreadable")
+            return None
+        if len(emails) > 1:
+            uncertain.append("email:conflict")
+            return None
+        return emails.pop()
+
+    def _date_of_birth(self, text: str, uncertain: list[str]) -> date | None:
+        # Only dates in a sentence about birth; others are appointments,
+        # prescriptions and the like
+        sentences = [sentence for sentence in split_sentences(text) if BIRTH_CUE.search(sentence)]
+        if not sentences:
+            return None
+        dates, ambiguous = parse_dates(" ".join(sentences), self.day_first)
+        dates = set(dates)
+        if not dates:
+            uncertain.append("date_of_birth:unreadable")
+            return None
+        if len(dates) > 1:
+            uncertain.append("date_of_birth:conflict")
+            return None
+        if ambiguous:
+            uncertain.append("date_of_birth:ambiguous")
+        born = dates.pop()
+        if born > date.today():
+            uncertain.append("date_of_birth:future")
+            return None
+        return born
+
+    def extract(self, text: str) -> LocalPII:
+        uncertain: list[str] = []
+        values = {
+            "name": self._name(text, uncertain),
+            "email": self._email(text, uncertain),
+            "date_of_birth": self._date_of_birth(text, uncertain),
+        }
+        if not any(values.values()):
+            # Classification saw PII the patterns do not cover
+            uncertain.append("none_found")
+
+        try:
+            pii = schemas.PatientPIISchema(**values, error=None)
+        except ValidationError:
+            uncertain.append("email:invalid")
+            pii = schemas.PatientPIISchema(**{**values, "email": None}, error=None)
+
+        result = LocalPII(pii, uncertain)
+        if result.confident:
+            self.extracted += 1
+        else:
+            self.escalated += 1
+        return result
+
+    def stats(self) -> dict:
+        return {"extracted": self.extracted, "escalated": self.escalated}
@@ -97,18 +97,27 @@ def examples_for_SYMPS() -> str:
     """
 
 
+# Every prompt starts with the same role and examples and ends with the
+# variable text, so the shared part can be served from a provider's prefix
+# cache. OpenAI only caches prompts of at least 1024 tokens, and these
+# prefixes are roughly 270-650 tokens, so today only long transcripts, whose
+# prompts pass the minimum, get cached tokens. Padding the prefixes to the
+# minimum would bill more tokens than the cache discount saves.
+
+
 def get_patient_PII_prompt(text: str) -> str:
     return f"""
     {interview_role()}\n
 
     -----------------------------------------------------------------------------------------------
-    Extract any personally identifiable information (PII) from the following text.
+    {examples_for_PII()}
+
+    -----------------------------------------------------------------------------------------------
+    Extract any personally identifiable information (PII) from the text below.
     Be pedantic: include all details mentioned (names, addresses, phone numbers, DOB, IDs, emails).
     Be instructive: present your output as a structured list under categories.
-    Text: {text}
 
-    -----------------------------------------------------------------------------------------------
-    {examples_for_PII()}
+    Text: {text}
     """
 
 
@@ -117,13 +126,14 @@ def get_patient_medication_prompt(text: str) -> str:
     {interview_role()}\n
 
     -----------------------------------------------------------------------------------------------
-    Extract all medications mentioned in the following text.
+    {examples_for_MEDS()}
+
+    -----------------------------------------------------------------------------------------------
+    Extract all medications mentioned in the text below.
     Be pedantic: include exact names, dosages, frequencies, and administration routes.
     Be instructive: present as a structured list with medication name, dosage, route, frequency.
-    Text: {text}
 
-    -----------------------------------------------------------------------------------------------
-    {examples_for_MEDS()}
+    Text: {text}
     """
 
 
@@ -132,13 +142,34 @@ def get_patient_symptoms_prompt(text: str) -> str:
     {interview_role()}\n
 
     -----------------------------------------------------------------------------------------------
-    Extract all symptoms mentioned in the following text.
+    {examples_for_SYMPS()}
+
+    -----------------------------------------------------------------------------------------------
+    Extract all symptoms mentioned in the text below.
     Be pedantic: include all qualifiers (mild, severe, persistent, duration).
     Be instructive: present as a structured list with symptom name and any descriptors.
+
     Text: {text}
+    """
+
+
+def get_patient_form_prompt(text: str) -> str:
+    return f"""
+    {interview_role()}\n
 
     -----------------------------------------------------------------------------------------------
+    {examples_for_PII()}
+    {examples_for_MEDS()}
     {examples_for_SYMPS()}
+
+    -----------------------------------------------------------------------------------------------
+    Extract the complete patient form from the text below in one pass.
+    - pii: name, email and date of birth, or null if none are mentioned.
+    - medication: every medication with strength in mg, daily frequency and duration in days, or null if none.
+    - symptoms: every symptom with duration in days, intensity (1-5) and recurrence, or null if none.
+    Be pedantic: only include information explicitly mentioned; leave unknown fields null.
+
+    Text: {text}
     """
 
 
@@ -147,7 +178,7 @@ def get_patient_info_prompt(text: str) -> str:
     {interview_role()}\n
 
     -----------------------------------------------------------------------------------------------
-    Review the following text and identify which categories of information are present:
+    Review the text below and identify which categories of information are present:
     - Personally Identifiable Information (PII)
     - Medications
     - Symptoms
@@ -164,7 +195,10 @@ def get_patient_recommendation_prompt(form: dict) -> str:
     {recommender_role()}
 
     -----------------------------------------------------------------------------------------------
-    You are given the following structured patient data. Generate clinical recommendations in text form.
+    {examples_for_recommendation()}
+
+    -----------------------------------------------------------------------------------------------
+    You are given the structured patient data below. Generate clinical recommendations in text form.
     - Prioritize patient safety.
     - Base recommendations only on the provided data.
     - Be clear, structured, and concise.
@@ -174,9 +208,6 @@ def get_patient_recommendation_prompt(form: dict) -> str:
     Patient Form Data:
     {form}
 
-    -----------------------------------------------------------------------------------------------
-    {examples_for_recommendation()}
-
     Your Output:
     """
 
@@ -185,6 +216,7 @@ PROMPTS = {
     intent.PII: get_patient_PII_prompt,
     intent.MEDS: get_patient_medication_prompt,
     intent.SYMPS: get_patient_symptoms_prompt,
+    intent.ALL: get_patient_form_prompt,
     intent.CONT: get_patient_info_prompt,
     intent.REC: get_patient_recommendation_prompt
 }
@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from typing import Any
+import math
+import re
+
+######################################################################
+#                      Local Response Repair                         #
+######################################################################
+
+# Repairs only happen when validation gets a context with a "repairs" list,
+# as LLM calls do. Building a schema in code still rejects bad values.
+REPAIRS = "repairs"
+
+_NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "once": 1, "two": 2, "twice": 2, "three": 3, "thrice": 3, "four": 4,
+    "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "twelve": 12, "fourteen": 14,
+}
+_QUANTITY = re.compile(
+    r"^\s*(?P<number>\d+(?:[.,]\d+)*|(?:" + "|".join(_NUMBER_WORDS) + r")\b)\s*(?P<unit>[a-zµ]+)?\b",
+    re.IGNORECASE,
+)
+# "1,000" and "12,500,000"; any other comma is a decimal comma, as in "0,5 g"
+_THOUSANDS = re.compile(r"^\d{1,3}(?:,\d{3})+(?:\.\d+)?$")
+_OUT_OF_TEN = re.compile(r"^\s*(?P<number>\d+(?:\.\d+)?)\s*(/|out of)\s*10\s*$", re.IGNORECASE)
+
+# Multipliers into the unit each field is stored in
+STRENGTH_UNITS = {"mg": 1, "milligram": 1, "milligrams": 1, "g": 1000, "gram": 1000, "grams": 1000,
+                  "mcg": 0.001, "µg": 0.001, "ug": 0.001, "microgram": 0.001, "micrograms": 0.001}
+DURATION_UNITS = {"day": 1, "days": 1, "d": 1, "week": 7, "weeks": 7, "wk": 7, "wks": 7,
+                  "month": 30, "months": 30, "year": 365, "years": 365}
+FREQUENCY_UNITS = {"time": 1, "times": 1, "x": 1, "daily": 1, "a": 1, "per": 1}
+INTENSITY_WORDS = {"mild": 2, "moderate": 3, "severe": 4, "extreme": 5, "unbearable": 5}
+
+
+@dataclass(frozen=True)
+class Repair:
+    schema: str
+    field: str
+    action: str
+    original: Any
+    value: Any
+
+    @property
+    def label(self) -> str:
+        return f"{self.schema}.{self.field}:{self.action}"
+
+
+def _quantity(value: Any, units: dict[str, float]) -> float | None:
+    """A number from strings like "500mg", "1,000 mg", "two weeks" or "twice daily"."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = _QUANTITY.match(value)
+    if match is None:
+        return None
+    number, unit = match.group("number").lower(), (match.group("unit") or "").lower()
+    if number in _NUMBER_WORDS:
+        amount = float(_NUMBER_WORDS[number])
+    elif _THOUSANDS.match(number):
+        amount = float(number.replace(",", ""))
+    elif number.count(",") + number.count(".") <= 1:
+        amount = float(number.replace(",", "."))
+    else:
+        return None
+    if unit and unit not in units:
+        return None
+    return amount * units.get(unit, 1)
+
+
+def _positive_int(schema: str, field: str, value: Any, units: dict[str, float], repairs: list) -> Any:
+    if value is None or (isinstance(value, int) and not isinstance(value, bool) and value > 0):
+        return value
+    if isinstance(value, str) and value.strip().isdigit() and int(value) > 0:
+        # Validation accepts digit strings as they are
+        return value
+    amount = _quantity(value, units)
+    if amount is None:
+        # Left for validation to reject
+        return value
+    if amount <= 0 or not math.isclose(amount, round(amount)):
+        # Rounding "25 mcg" up to 1 mg or "2.5 mg" down to 2 would change the
+        # dose, so a value the field cannot hold exactly is dropped instead
+        repairs.append(Repair(schema, field, "nulled", value, None))
+        return None
+    repaired = round(amount)
+    repairs.append(Repair(schema, field, "coerced", value, repaired))
+    return repaired
+
+
+def _intensity(schema: str, value: Any, repairs: list) -> Any:
+    if value is None or (type(value) is int and 1 <= value <= 5):
+        return value
+    out_of_ten = _OUT_OF_TEN.match(value) if isinstance(value, str) else None
+    if out_of_ten is not None:
+        repaired = max(1, math.ceil(float(out_of_ten.group("number")) / 2))
+        repairs.append(Repair(schema, "intensity", "rescaled", value, repaired))
+        return repaired
+    if isinstance(value, str) and value.strip().lower() in INTENSITY_WORDS:
+        repaired = INTENSITY_WORDS[value.strip().lower()]
+        repairs.append(Repair(schema, "intensity", "coerced", value, repaired))
+        return repaired
+    amount = _quantity(value, {})
+    if amount is None:
+        return value
+    repaired = min(5, max(1, round(amount)))
+    repairs.append(Repair(schema, "intensity", "coerced" if 1 <= amount <= 5 else "clamped", value, repaired))
+    return repaired
+
+
+def repair_medication(data: Any, repairs: list) -> Any:
+    if not isinstance(data, dict):
+        return data
+    data = dict(data)
+    for field, units in (("strength", STRENGTH_UNITS), ("frequency", FREQUENCY_UNITS), ("duration", DURATION_UNITS)):
+        if field in data:
+            data[field] = _positive_int("MedicationSchema", field, data[field], units, repairs)
+    return data
+
+
+def repair_symptom(data: Any, repairs: list) -> Any:
+    if not isinstance(data, dict):
+        return data
+    data = dict(data)
+    if "duration" in data:
+        data["duration"] = _positive_int("SymptomSchema", "duration", data["duration"], DURATION_UNITS, repairs)
+    if "intensity" in data:
+        data["intensity"] = _intensity("SymptomSchema", data["intensity"], repairs)
+    return data
+
+
+def repair_context() -> dict[str, list[Repair]]:
+    """Validation context that turns repairs on and collects what they changed."""
+    return {REPAIRS: []}
@@ -1,8 +1,13 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Literal
+from pydantic import BaseModel, Field, EmailStr, ValidationInfo, model_validator
+from typing import Any, List, Literal, Optional
 from datetime import date
 from enum import Enum
 
+from agent.form_agent.repair import REPAIRS, repair_medication, repair_symptom
+
+# Optional[...] rather than "X | None": instructor's Partial, used to stream
+# partial responses, cannot rebuild PEP 604 unions.
+
 ######################################################################
 #                             Error Schemas                          #
 ######################################################################
@@ -14,7 +19,7 @@ class ErrorMixin(BaseModel):
         description="True if there was an error \\\
             with parsing the user intent",
     )
-    error_message: str | None = Field(
+    error_message: Optional[str] = Field(
         default=None,
         description="A user friendly error message \\\
             to drive better user prompting",
@@ -27,46 +32,60 @@ class ErrorMixin(BaseModel):
 
 
 class PatientPIISchema(BaseModel):
-    name: str | None
-    email: EmailStr | None
-    date_of_birth: date | None
-    error: ErrorMixin | None
+    name: Optional[str]
+    email: Optional[EmailStr]
+    date_of_birth: Optional[date]
+    error: Optional[ErrorMixin]
 
 
 class MedicationSchema(BaseModel):
-    name: str | None
-    strength: int | None = Field(..., description="Strength in mg.", gt=0)
-    frequency: int | None = Field(..., gt=0)
-    duration: int | None = Field(..., gt=0)
+    name: Optional[str]
+    strength: Optional[int] = Field(..., description="Strength in mg.", gt=0)
+    frequency: Optional[int] = Field(..., gt=0)
+    duration: Optional[int] = Field(..., gt=0)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _repair(cls, data: Any, info: ValidationInfo) -> Any:
+        if info.context and REPAIRS in info.context:
+            return repair_medication(data, info.context[REPAIRS])
+        return data
 
 
 class SymptomSchema(BaseModel):
-    name: str | None = Field(..., description="amoxicillin")
-    duration: int | None = Field(..., description="Duration in days", gt=0)
-    intensity: Literal[1, 2, 3, 4, 5] | None = Field(..., description="Symptom intensity")
-    recurrence: bool | None
+    name: Optional[str] = Field(..., description="amoxicillin")
+    duration: Optional[int] = Field(..., description="Duration in days", gt=0)
+    intensity: Optional[Literal[1, 2, 3, 4, 5]] = Field(..., description="Symptom intensity")
+    recurrence: Optional[bool]
+
+    @model_validator(mode="before")
+    @classmethod
+    def _repair(cls, data: Any, info: ValidationInfo) -> Any:
+        if info.context and REPAIRS in info.context:
+            return repair_symptom(data, info.context[REPAIRS])
+        return data
 
 
 class ListMedicationSchema(BaseModel):
     meds: List[MedicationSchema]
-    error: ErrorMixin | None
+    error: Optional[ErrorMixin]
 
 
 class ListSymptomSchema(BaseModel):
     symps: List[SymptomSchema]
-    error: ErrorMixin | None
+    error: Optional[ErrorMixin]
 
 
 class PatientSchema(BaseModel):
-    pii: PatientPIISchema | None = None
-    medication: ListMedicationSchema | None = None
-    symptoms: ListSymptomSchema | None = None
-    error: ErrorMixin | None = None
+    pii: Optional[PatientPIISchema] = None
+    medication: Optional[ListMedicationSchema] = None
+    symptoms: Optional[ListSymptomSchema] = None
+    error: Optional[ErrorMixin] = None
 
 
 class RecommendationSchema(BaseModel):
-    recommendation: str | None = None
-    error: ErrorMixin | None = None
+    recommendation: Optional[str] = None
+    error: Optional[ErrorMixin] = None
 
 
 ######################################################################
@@ -84,17 +103,23 @@ class infoIntent(Enum):
     REC = 6
 
 
+class extractionStrategy(str, Enum):
+    MULTI = "multi-call"
+    SINGLE = "single-call"
+    AUTO = "auto"
+
+
 INTENT_LITERALS = ["Personally identifiable information", "Medication", "Symptoms"]
 
 
 class InfoIntentSchema(BaseModel):
-    intents: List[Literal["Personally identifiable information", "Medication", "Symptoms"]] | None = Field(
+    intents: Optional[List[Literal["Personally identifiable information", "Medication", "Symptoms"]]] = Field(
         default=None,
         description="If you recognise that one \\\
                       or more of the literals exist in the text, please \\\
                       include them in the base model.",
     )
-    error: ErrorMixin | None
+    error: Optional[ErrorMixin]
 
     def to_ii(self, intent: str) -> infoIntent:
         if intent == INTENT_LITERALS[0]:
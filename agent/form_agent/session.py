@@ -0,0 +1,39 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from agent.form_agent.schemas import extractionStrategy as es
+from agent.form_agent.merge import merge_forms, diff_forms
+from agent.form_agent.utils import PatientFormBuilder
+import agent.form_agent.config as config
+import agent.form_agent.schemas as schemas
+
+
+@dataclass
+class TranscriptSession:
+    """Form state of one live consultation, updated from transcript deltas.
+
+    Each delta is extracted together with only the last `context_chars` of
+    earlier transcript, so the cost of an update does not grow with the
+    length of the consultation.
+    """
+
+    builder: PatientFormBuilder
+    strategy: es | None = None
+    context_chars: int = config.SESSION_CONTEXT_CHARS
+    form: schemas.PatientSchema = field(default_factory=schemas.PatientSchema)
+    context: str = ""
+    version: int = 0
+
+    async def update(self, delta: str) -> dict[str, Any]:
+        """Extract from the delta, merge it into the form and return what changed."""
+        text = f"{self.context} {delta}".strip()
+        extracted = await self.builder.get_patient_form(text, self.strategy)
+
+        merged = merge_forms(self.form, extracted)
+        changes = diff_forms(self.form, merged)
+
+        self.form = merged
+        self.context = text[-self.context_chars:] if self.context_chars > 0 else ""
+        if changes:
+            self.version += 1
+        return changes
@@ -1,15 +1,29 @@
 from dataclasses import dataclass
 from pydantic import BaseModel
-from typing import cast, Type
+from typing import cast, AsyncIterator, Type
+import asyncio
 
 from agent.form_agent.schemas import infoIntent as ii
 from agent.form_agent.schemas import INTENT_LITERALS
+from agent.form_agent.schemas import extractionStrategy as es
+from agent.form_agent.classifier import IntentClassifier
+from agent.form_agent.pii import PIIExtractor
+from agent.form_agent.merge import merge_forms
+import agent.form_agent.config as config
 import agent.form_agent.schemas as schemas
 import agent.form_agent.prompts as prompts
 
-from agent.utils import query_llm
+from agent.utils import query_llm, stream_llm
+from agent.tokens import fit_to_budget, split_chunks
+import agent.config as conf
 from agent.errors import error
 
+# Intents that get their own extraction call
+EXTRACTED_INTENTS = (ii.PII, ii.MEDS, ii.SYMPS)
+
+# PatientSchema field filled by each extraction
+FORM_SECTIONS = {ii.PII: "pii", ii.MEDS: "medication", ii.SYMPS: "symptoms"}
+
 
 def from_str(intent: str) -> Type[ii]:
     if intent == INTENT_LITERALS[0]:
@@ -26,50 +40,209 @@ def from_str(intent: str) -> Type[ii]:
 
 @dataclass
 class PatientFormBuilder:
+    speculative: bool = config.SPECULATIVE_EXTRACTION
+    strategy: es = es(config.EXTRACTION_STRATEGY)
+    single_call_max_chars: int = config.SINGLE_CALL_MAX_CHARS
+    chunk_min_chars: int = config.CHUNK_MIN_CHARS
+    chunk_chars: int = config.CHUNK_CHARS
+    chunk_overlap_chars: int = config.CHUNK_OVERLAP_CHARS
+    chunk_concurrency: int = config.CHUNK_CONCURRENCY
+    classifier: IntentClassifier | None = config.LOCAL_CLASSIFIER
+    pii_extractor: PIIExtractor | None = config.LOCAL_PII_EXTRACTOR
+
     async def _contains(self, text: str) -> dict[ii, bool]:
-        prompt = prompts.PROMPTS[ii.CONT](text)
+        if self.classifier is not None:
+            detected = await self.classifier.classify(text)
+            if detected is not None:
+                return detected
+
+        prompt = prompts.PROMPTS[ii.CONT](fit_to_budget(text, config.TRANSCRIPT_TOKEN_BUDGETS[ii.CONT]))
         schema = schemas.SCHEMAS[ii.CONT]
         resp = await query_llm(prompt, schema)
 
         detected = []
-        for intent in resp.intents:
+        for intent in resp.intents or []:
             if intent is not None:
                 detected.append(intent)
 
         return {from_str(intent): (intent in detected) for intent in INTENT_LITERALS}
 
+    def _prompt(self, intent: ii, text: str) -> str:
+        return prompts.PROMPTS[intent](fit_to_budget(text, config.TRANSCRIPT_TOKEN_BUDGETS[intent]))
+
+    def _checked(self, resp: BaseModel) -> BaseModel:
+        if resp.error is not None:
+            if resp.error.error:
+                raise error.LLMError(resp.error.error_message)
+
+        return resp
+
+    def _local(self, intent: ii, text: str) -> BaseModel | None:
+        # PII the extractor reads with confidence needs no LLM call
+        if intent == ii.PII and self.pii_extractor is not None:
+            local = self.pii_extractor.extract(text)
+            if local.confident:
+                return local.pii
+        return None
+
     async def get_info(self, intent: ii, text: str) -> BaseModel:
-        prompt = prompts.PROMPTS[intent](text)
+        local = self._local(intent, text)
+        if local is not None:
+            return local
+
         schema = schemas.SCHEMAS[intent]
-        resp = await query_llm(prompt, schema)
+        resp = await query_llm(self._prompt(intent, text), schema)
 
         typed_resp = cast(schema, resp)
 
-        if typed_resp.error is not None:
-            if typed_resp.error.error:
-                raise error.LLMError(typed_resp.error.error_message)
+        return self._checked(typed_resp)
 
-        return typed_resp
+    async def _settle(self, intent: ii, text: str) -> BaseModel | Exception:
+        # Speculative extractions may fail for intents classification will
+        # rule out anyway, so their errors are held until we know they matter
+        try:
+            return await self.get_info(intent, text)
+        except Exception as e:
+            return e
 
-    async def get_patient_form(self, text: str) -> schemas.PatientSchema:
-        info = {ii.PII: None, ii.MEDS: None, ii.SYMPS: None}
+    async def _extract(self, intents: list[ii], text: str) -> dict[ii, BaseModel]:
+        # The first failure cancels the remaining extractions
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = {intent: tg.create_task(self.get_info(intent, text)) for intent in intents}
+        except ExceptionGroup as eg:
+            raise eg.exceptions[0]
 
-        contains_results = await self._contains(text)
-        for intent, cond in contains_results.items():
-            if cond:
-                if intent is not None:
-                    info[intent] = await self.get_info(intent, text)
+        return {intent: task.result() for intent, task in tasks.items()}
+
+    async def _extract_speculative(self, text: str) -> dict[ii, BaseModel]:
+        try:
+            async with asyncio.TaskGroup() as tg:
+                contains = tg.create_task(self._contains(text))
+                tasks = {intent: tg.create_task(self._settle(intent, text)) for intent in EXTRACTED_INTENTS}
+
+                detected = await contains
+                for intent, task in tasks.items():
+                    if not detected.get(intent):
+                        task.cancel()
+
+                info = {}
+                for intent, task in tasks.items():
+                    if task.cancelled() or not detected.get(intent):
+                        continue
+                    result = await task
+                    if isinstance(result, Exception):
+                        raise result
+                    info[intent] = result
+        except ExceptionGroup as eg:
+            raise eg.exceptions[0]
+
+        return info
+
+    def resolve_strategy(self, text: str, strategy: es | None = None) -> es:
+        strategy = strategy or self.strategy
+        if strategy == es.AUTO:
+            # Short transcripts fit one combined call; long ones do better
+            # with focused per-intent prompts running in parallel
+            if len(text) <= self.single_call_max_chars:
+                return es.SINGLE
+            return es.MULTI
+        return strategy
+
+    async def _get_form_single_call(self, text: str) -> schemas.PatientSchema:
+        form = cast(schemas.PatientSchema, await self.get_info(ii.ALL, text))
+        return self._drop_failed_sections(form)
+
+    def _drop_failed_sections(self, form: schemas.PatientSchema) -> schemas.PatientSchema:
+        # A section the model flags as an error is treated as not mentioned,
+        # the same outcome classification gives in multi-call mode
+        for section in FORM_SECTIONS.values():
+            value = getattr(form, section)
+            if value is not None and value.error is not None and value.error.error:
+                setattr(form, section, None)
+
+        return form
+
+    async def get_patient_form(self, text: str, strategy: es | None = None) -> schemas.PatientSchema:
+        semantic = conf.SEMANTIC_CACHE
+        if semantic is not None:
+            cached = await semantic.lookup("form", text)
+            if cached is not None:
+                form = schemas.PatientSchema.model_validate(cached)
+                # A near-duplicate may be another patient's consultation, so
+                # PII is never stored or reused; it is read from this text
+                form.pii = await self._get_pii(text)
+                return form
+
+        form = await self._build_patient_form(text, strategy)
+
+        if semantic is not None:
+            await semantic.store("form", text, form.model_dump(mode="json", exclude={"pii"}))
+
+        return form
 
-        pii = info[ii.PII]
-        meds = info[ii.MEDS]
-        symps = info[ii.SYMPS]
+    async def _get_pii(self, text: str) -> schemas.PatientPIISchema | None:
+        try:
+            return await self.get_info(ii.PII, text)
+        except error.LLMError:
+            # The model found no PII in the text
+            return None
 
-        breakpoint()
+    def chunks(self, text: str) -> list[str]:
+        if self.chunk_min_chars <= 0 or len(text) <= self.chunk_min_chars:
+            return [text]
+        return split_chunks(text, self.chunk_chars, self.chunk_overlap_chars)
+
+    async def _map_chunks(self, chunks: list[str], strategy: es | None = None) -> AsyncIterator[schemas.PatientSchema]:
+        """Extract the chunks concurrently, yielding the merged form whenever one finishes."""
+        slots = asyncio.Semaphore(max(1, self.chunk_concurrency))
+
+        async def extract(chunk: str) -> schemas.PatientSchema:
+            async with slots:
+                return await self._extract_form(chunk, strategy)
+
+        tasks = [asyncio.create_task(extract(chunk)) for chunk in chunks]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                await finished
+                # Merged in transcript order: medications and symptoms are
+                # matched by name and a later mention's values win
+                form = schemas.PatientSchema()
+                for task in tasks:
+                    if task.done():
+                        form = merge_forms(form, task.result())
+                yield form
+        finally:
+            # The first failure cancels the remaining chunks
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _build_patient_form(self, text: str, strategy: es | None = None) -> schemas.PatientSchema:
+        chunks = self.chunks(text)
+        if len(chunks) > 1:
+            form = None
+            async for form in self._map_chunks(chunks, strategy):
+                pass
+            return form
+
+        return await self._extract_form(text, strategy)
+
+    async def _extract_form(self, text: str, strategy: es | None = None) -> schemas.PatientSchema:
+        if self.resolve_strategy(text, strategy) == es.SINGLE:
+            return await self._get_form_single_call(text)
+
+        if self.speculative:
+            info = await self._extract_speculative(text)
+        else:
+            contains_results = await self._contains(text)
+            intents = [intent for intent, cond in contains_results.items() if cond and intent in EXTRACTED_INTENTS]
+            info = await self._extract(intents, text)
 
         res = schemas.PatientSchema(
-            pii=pii,
-            medication=meds,
-            symptoms=symps
+            pii=info.get(ii.PII),
+            medication=info.get(ii.MEDS),
+            symptoms=info.get(ii.SYMPS)
         )
 
         return res
@@ -84,3 +257,98 @@ class PatientFormBuilder:
         resp = await query_llm(prompt, schema)
 
         return resp
+
+    ##################################################################
+    #                       Streaming Responses                      #
+    ##################################################################
+
+    def _final(self, schema: Type[BaseModel], partial: BaseModel | None) -> BaseModel:
+        if partial is None:
+            raise error.LLMError("The model returned an empty response")
+        return self._checked(schema.model_validate(partial.model_dump()))
+
+    async def stream_patient_form(
+            self,
+            text: str,
+            strategy: es | None = None
+    ) -> AsyncIterator[dict | schemas.PatientSchema]:
+        """Yield the form as it is generated: partial dicts, then the validated PatientSchema."""
+        chunks = self.chunks(text)
+        if len(chunks) > 1:
+            # Long transcripts report the merged form as each chunk completes
+            form = None
+            async for form in self._map_chunks(chunks, strategy):
+                yield form.model_dump(mode="json")
+            yield form
+            return
+
+        if self.resolve_strategy(text, strategy) == es.SINGLE:
+            last = None
+            async for partial in stream_llm(self._prompt(ii.ALL, text), schemas.PatientSchema):
+                last = partial
+                yield partial.model_dump(mode="json")
+            yield self._drop_failed_sections(self._final(schemas.PatientSchema, last))
+            return
+
+        contains_results = await self._contains(text)
+        intents = [intent for intent, cond in contains_results.items() if cond and intent in EXTRACTED_INTENTS]
+
+        # Each relevant intent streams on its own task; their partials are
+        # combined into one form snapshot in arrival order
+        updates: asyncio.Queue = asyncio.Queue()
+
+        async def pump(intent: ii):
+            try:
+                local = self._local(intent, text)
+                if local is not None:
+                    updates.put_nowait((intent, local, None))
+                    updates.put_nowait((intent, None, None))
+                    return
+                async for partial in stream_llm(self._prompt(intent, text), schemas.SCHEMAS[intent]):
+                    updates.put_nowait((intent, partial, None))
+                updates.put_nowait((intent, None, None))
+            except Exception as e:
+                updates.put_nowait((intent, None, e))
+
+        latest: dict[ii, BaseModel] = {}
+        tasks = [asyncio.create_task(pump(intent)) for intent in intents]
+        try:
+            running = len(tasks)
+            while running:
+                intent, partial, exc = await updates.get()
+                if exc is not None:
+                    raise exc
+                if partial is None:
+                    running -= 1
+                    continue
+                latest[intent] = partial
+                yield {
+                    section: latest[i].model_dump(mode="json") if i in latest else None
+                    for i, section in FORM_SECTIONS.items()
+                }
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        info = {intent: self._final(schemas.SCHEMAS[intent], latest.get(intent)) for intent in intents}
+        yield schemas.PatientSchema(
+            pii=info.get(ii.PII),
+            medication=info.get(ii.MEDS),
+            symptoms=info.get(ii.SYMPS)
+        )
+
+    async def stream_patient_recommendation(
+            self,
+            form: str
+    ) -> AsyncIterator[dict | schemas.RecommendationSchema]:
+        """Yield the recommendation text as it grows, then the validated RecommendationSchema."""
+        prompt = prompts.PROMPTS[ii.REC](form)
+
+        last = None
+        async for partial in stream_llm(prompt, schemas.RecommendationSchema):
+            last = partial
+            yield partial.model_dump(mode="json")
+        if last is None:
+            raise error.LLMError("The model returned an empty response")
+        yield schemas.RecommendationSchema.model_validate(last.model_dump())
@@ -0,0 +1,175 @@
+from pydantic import BaseModel, field_validator
+from typing import Any, Callable
+from pathlib import Path
+from os import getenv
+import importlib
+import json
+
+from agent.schemas import ClientBase
+from agent.ratelimit import Schedulers
+from agent.telemetry import instrument_client
+from agent.transport import ConnectionTracer, TransportConfig, build_http_client
+
+######################################################################
+#                         Provider Registry                          #
+######################################################################
+
+
+class ModelConfig(BaseModel):
+    name: str
+    # Provider limits for this model; 0 is unlimited
+    rpm: float = 0
+    tpm: float = 0
+
+
+class ProviderConfig(BaseModel):
+    """One provider and the models tried on it, in fallback order.
+
+    `kind` is "openai" (any OpenAI-compatible API, with `base_url` for
+    others), "simulated", or "package.module:function" for a factory that
+    takes this config and the registry and returns an instructor
+    AsyncInstructor.
+    """
+
+    name: str
+    kind: str = "openai"
+    models: list[ModelConfig]
+    api_key: str | None = None
+    api_key_env: str | None = None
+    base_url: str | None = None
+    timeout: float = 30.0
+    max_concurrency: int = 8
+    # Extra keyword arguments for the factory
+    options: dict[str, Any] = {}
+
+    @field_validator("models", mode="before")
+    @classmethod
+    def _model_names(cls, models: list) -> list:
+        return [{"name": model} if isinstance(model, str) else model for model in models]
+
+    def resolve_api_key(self) -> str | None:
+        if self.api_key is not None:
+            return self.api_key
+        if self.api_key_env is None:
+            return None
+        key = getenv(self.api_key_env)
+        if not key:
+            raise ValueError(f"{self.api_key_env} must be set for the {self.name} provider.")
+        return key
+
+
+def _openai(config: ProviderConfig, registry: "ProviderRegistry") -> Any:
+    from instructor import from_openai
+    from openai import AsyncOpenAI
+    import httpx
+
+    transport = registry.transport
+    client = from_openai(AsyncOpenAI(
+        api_key=config.resolve_api_key(),
+        base_url=config.base_url,
+        # The SDK sends its timeout with every request, overriding the
+        # shared client's, so the transport settings are repeated here
+        timeout=httpx.Timeout(
+            config.timeout,
+            connect=transport.connect_timeout,
+            read=transport.read_timeout or config.timeout,
+        ),
+        http_client=registry.http_client(),
+        **config.options,
+    ))
+    instrument_client(client)
+    return client
+
+
+def _simulated(config: ProviderConfig, registry: "ProviderRegistry") -> Any:
+    from agent.simulated import SimulatedProvider
+
+    return SimulatedProvider(**config.options).client
+
+
+FACTORIES: dict[str, Callable[[ProviderConfig, "ProviderRegistry"], Any]] = {
+    "openai": _openai,
+    "simulated": _simulated,
+}
+
+
+def factory(kind: str) -> Callable[[ProviderConfig, "ProviderRegistry"], Any]:
+    if kind in FACTORIES:
+        return FACTORIES[kind]
+    module, _, name = kind.partition(":")
+    if not name:
+        raise ValueError(f"Unknown provider kind {kind!r}; use one of {sorted(FACTORIES)} or 'module:function'.")
+    return getattr(importlib.import_module(module), name)
+
+
+def load_providers(inline: str | None, path: str | None) -> list[ProviderConfig] | None:
+    """Provider configs from a JSON list, given inline or as a file; None if neither is set."""
+    if inline:
+        raw = json.loads(inline)
+    elif path:
+        raw = json.loads(Path(path).read_text())
+    else:
+        return None
+    return [ProviderConfig.model_validate(entry) for entry in raw]
+
+
+class ProviderRegistry:
+    """Builds provider clients on first use, so importing the agent loads no SDK.
+
+    `clients()` is the fallback chain: every model of every provider, in
+    config order. HTTP providers share one pooled connection client.
+    """
+
+    def __init__(
+        self,
+        configs: list[ProviderConfig],
+        schedulers: Schedulers | None = None,
+        transport: TransportConfig | None = None,
+        telemetry: Any = None,
+    ):
+        self.configs = {config.name: config for config in configs}
+        self.schedulers = schedulers
+        self.transport = transport or TransportConfig()
+        self.tracer = ConnectionTracer(telemetry)
+
+        self._http_client: Any = None
+        self._instances: dict[str, Any] = {}
+        self._clients: list[ClientBase] | None = None
+
+    def http_client(self) -> Any:
+        if self._http_client is None:
+            self._http_client = build_http_client(self.transport, self.tracer)
+        return self._http_client
+
+    def instance(self, name: str) -> Any:
+        """The instructor client of provider `name`."""
+        if name not in self._instances:
+            config = self.configs[name]
+            self._instances[name] = factory(config.kind)(config, self)
+        return self._instances[name]
+
+    def clients(self) -> list[ClientBase]:
+        if self._clients is None:
+            clients = []
+            for config in self.configs.values():
+                for model in config.models:
+                    clients.append(ClientBase(
+                        client=self.instance(config.name),
+                        model=model.name,
+                        max_concurrency=config.max_concurrency,
+                        timeout=config.timeout,
+                    ))
+                    # Limits set through LLM_MODEL_LIMITS take precedence
+                    if self.schedulers is not None and (model.rpm or model.tpm):
+                        self.schedulers.limits.setdefault(model.name, (model.rpm, model.tpm))
+            self._clients = clients
+        return self._clients
+
+    async def aclose(self) -> None:
+        # The provider clients hold the closed pool, so they are rebuilt on
+        # next use, e.g. by a second app startup in the same process
+        self._instances = {}
+        self._clients = None
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
@@ -0,0 +1,202 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Iterator
+import statistics
+import itertools
+import asyncio
+import heapq
+import time
+
+######################################################################
+#                           Rate Limiting                            #
+######################################################################
+
+
+class TokenBucket:
+    """Allows `rate` units per second on average and bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.waits = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # Waiters are not queued: whoever wakes first after a refill goes first
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            self.waits += 1
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class Priority(IntEnum):
+    """Order in which queued LLM calls are let through; lower goes first."""
+
+    INTERACTIVE = 0
+    STANDARD = 1
+    BACKGROUND = 2
+
+
+_priority: ContextVar[Priority] = ContextVar("llm_call_priority", default=Priority.STANDARD)
+
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+class Scheduler:
+    """Queues calls to one provider model within its requests and tokens per minute.
+
+    Calls that fit the budget go straight through. Otherwise they wait in a
+    queue ordered by priority, then arrival, so a live session's calls
+    overtake batch backfills that are already waiting. A limit of 0 is not
+    enforced.
+    """
+
+    def __init__(self, rpm: float = 0, tpm: float = 0, burst_seconds: float = 10.0):
+        self.requests = TokenBucket(rpm / 60, max(1.0, rpm / 60 * burst_seconds)) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm / 60, tpm / 60 * burst_seconds) if tpm > 0 else None
+
+        self._queue: list[tuple[int, int, asyncio.Future, float]] = []
+        self._arrivals = itertools.count()
+        self._drainer: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        self.waits: dict[Priority, list[float]] = {level: [] for level in Priority}
+
+    def _fits(self, tokens: float) -> bool:
+        for bucket, amount in ((self.requests, 1.0), (self.tokens, tokens)):
+            if bucket is not None:
+                bucket._refill()
+                if bucket.tokens < min(amount, bucket.capacity):
+                    return False
+        return True
+
+    def _take(self, tokens: float) -> None:
+        if self.requests is not None:
+            self.requests.tokens -= 1.0
+        if self.tokens is not None:
+            self.tokens.tokens -= min(tokens, self.tokens.capacity)
+
+    def _delay(self, tokens: float) -> float:
+        delay = 0.0
+        for bucket, amount in ((self.requests, 1.0), (self.tokens, tokens)):
+            if bucket is not None:
+                delay = max(delay, (min(amount, bucket.capacity) - bucket.tokens) / bucket.rate)
+        return delay
+
+    async def _drain(self) -> None:
+        while self._queue:
+            _, _, future, tokens = self._queue[0]
+            if future.done():
+                # Cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+            if not self._fits(tokens):
+                await asyncio.sleep(self._delay(tokens))
+                continue
+            heapq.heappop(self._queue)
+            self._take(tokens)
+            future.set_result(None)
+        self._drainer = None
+
+    async def acquire(self, tokens: float = 0.0) -> float:
+        """Wait for room to send a call of about `tokens` tokens; returns the seconds waited."""
+        if self.requests is None and self.tokens is None:
+            return 0.0
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Futures and the drain task belong to one event loop
+            self._queue.clear()
+            self._drainer = None
+            self._loop = loop
+
+        level = current_priority()
+        waited = 0.0
+        if not self._queue and self._fits(tokens):
+            self._take(tokens)
+        else:
+            started = loop.time()
+            future = loop.create_future()
+            heapq.heappush(self._queue, (level, next(self._arrivals), future, tokens))
+            if self._drainer is None:
+                self._drainer = loop.create_task(self._drain())
+            await future
+            waited = loop.time() - started
+
+        self.waits[level].append(waited)
+        del self.waits[level][:-200]
+        return waited
+
+    def settle(self, estimated: float, actual: float | None) -> None:
+        """Charge the token budget for the tokens a call really used."""
+        if self.tokens is not None and actual is not None:
+            # Running into debt delays the next calls until it is paid back
+            self.tokens.tokens -= actual - min(estimated, self.tokens.capacity)
+
+    def snapshot(self) -> dict:
+        return {
+            "queued": sum(not future.done() for _, _, future, _ in self._queue),
+            "wait_seconds": {
+                level.name.lower(): {
+                    "p50": statistics.median(waits) if waits else 0.0,
+                    "max": max(waits, default=0.0),
+                }
+                for level, waits in self.waits.items()
+            },
+        }
+
+
+def parse_limits(spec: str) -> dict[str, tuple[float, float]]:
+    """Parse "model=rpm:tpm,..." into {model: (rpm, tpm)}."""
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, values = entry.partition("=")
+        rpm, _, tpm = values.partition(":")
+        limits[model.strip()] = (float(rpm or 0), float(tpm or 0))
+    return limits
+
+
+class Schedulers:
+    """One scheduler per model, shared by every client and request using it."""
+
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, float]] | None = None,
+        default: tuple[float, float] = (0, 0),
+        burst_seconds: float = 10.0,
+    ):
+        self.limits = limits or {}
+        self.default = default
+        self.burst_seconds = burst_seconds
+        self.schedulers: dict[str, Scheduler] = {}
+
+    def get(self, model: str) -> Scheduler:
+        if model not in self.schedulers:
+            rpm, tpm = self.limits.get(model, self.default)
+            self.schedulers[model] = Scheduler(rpm, tpm, self.burst_seconds)
+        return self.schedulers[model]
+
+    def snapshot(self) -> dict:
+        return {model: scheduler.snapshot() for model, scheduler in self.schedulers.items()}
@@ -0,0 +1,132 @@
+from pydantic import ValidationError
+from collections import deque
+from functools import cache
+import statistics
+import time
+
+######################################################################
+#                      Provider Failure Handling                     #
+######################################################################
+
+@cache
+def provider_errors() -> tuple[type[BaseException], ...]:
+    """Failures that move the request on to the next client.
+
+    Anything else is a bug in our code and is left to propagate. Built on
+    first use, as the SDKs are only imported once a provider is.
+    """
+    from instructor.exceptions import InstructorRetryException
+    import openai
+    import httpx
+
+    return (
+        ValidationError,
+        InstructorRetryException,
+        TimeoutError,
+        openai.APIError,
+        httpx.HTTPError,
+        OSError,
+    )
+
+
+class CircuitBreaker:
+    """Skips a provider after `failure_threshold` consecutive failures.
+
+    After `reset_timeout` seconds one trial call is let through (half-open);
+    its outcome closes the breaker again or restarts the wait.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def record_cancelled(self) -> None:
+        # A hedged call that lost the race, or one that failed on our side,
+        # says nothing about the provider
+        self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """Recent successful call latencies of one provider."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> float | None:
+        """The p-th percentile (0-1) in seconds, or None until enough calls were seen."""
+        if len(self._samples) < self.min_samples:
+            return None
+        cut = min(max(round(p * 100), 1), 99)
+        return statistics.quantiles(self._samples, n=100, method="inclusive")[cut - 1]
+
+
+class ProviderHealth:
+    """Breaker and latency history per model, shared by every request."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, min_samples: int):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.min_samples = min_samples
+
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.latencies: dict[str, LatencyTracker] = {}
+        self.hedges = 0
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        if model not in self.breakers:
+            self.breakers[model] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self.breakers[model]
+
+    def latency(self, model: str) -> LatencyTracker:
+        if model not in self.latencies:
+            self.latencies[model] = LatencyTracker(min_samples=self.min_samples)
+        return self.latencies[model]
+
+    def snapshot(self, percentile: float) -> dict:
+        return {
+            "hedges": self.hedges,
+            "providers": {
+                model: {
+                    "state": breaker.state,
+                    "consecutive_failures": breaker.failures,
+                    "hedge_after": self.latency(model).percentile(percentile),
+                }
+                for model, breaker in self.breakers.items()
+            },
+        }
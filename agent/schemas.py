@@ -1,9 +1,29 @@
-from instructor import Instructor
-from pydantic import BaseModel
+from typing import Any
+import asyncio
+
+from pydantic import BaseModel, PrivateAttr
 
 
 class ClientBase(BaseModel):
-    client: Instructor
+    # An instructor AsyncInstructor; not checked so that importing this
+    # module does not load the provider SDKs
+    client: Any
     model: str
+    # Calls in flight at once against this client; the rest wait their turn
+    max_concurrency: int = 8
+    # Seconds before a single call is abandoned
+    timeout: float = 30.0
 
     model_config = {"arbitrary_types_allowed": True}
+
+    _semaphore: asyncio.Semaphore | None = PrivateAttr(default=None)
+    _loop: asyncio.AbstractEventLoop | None = PrivateAttr(default=None)
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives are bound to one event loop, so rebuild per loop
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
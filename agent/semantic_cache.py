@@ -0,0 +1,230 @@
+from typing import Awaitable, Callable, Protocol
+from collections import deque
+import numpy as np
+import asyncio
+import json
+import re
+
+import agent.cache as cache
+
+######################################################################
+#                  Near-Duplicate Transcript Cache                   #
+######################################################################
+
+NUMBER_WORDS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4", "five": "5",
+    "six": "6", "seven": "7", "eight": "8", "nine": "9", "ten": "10",
+    "eleven": "11", "twelve": "12", "thirteen": "13", "fourteen": "14", "fifteen": "15",
+    "sixteen": "16", "seventeen": "17", "eighteen": "18", "nineteen": "19", "twenty": "20",
+    "thirty": "30", "forty": "40", "fifty": "50", "sixty": "60", "ninety": "90",
+    "hundred": "100", "once": "1", "twice": "2", "a week": "7", "a fortnight": "14",
+}
+
+NEGATIONS = r"no|not|never|none|nothing|without|den(?:y|ies|ied)|\w+n['’]t"
+
+# A name cue and the word after it, which lower-case transcripts do not capitalise
+NAME_CUES = r"my name is|my name's|name is|call me|i am called|i'm|i’m|i am"
+
+_GUARD_TOKENS = re.compile(
+    r"(?i:\b(?:" + NAME_CUES + r")\s+(?P<name>[\w'’-]+))"
+    r"|(?i:\b(?:" + NEGATIONS + r")\b)"
+    r"|[\w.+-]+@[\w-]+\.[\w.]+"
+    r"|\d+(?:\.\d+)?"
+    r"|(?i:\b(?:" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True)) + r")\b)"
+    r"|(?<![.!?]\s)(?<!^)\b[A-Z][a-z]+\b"
+)
+
+
+def guard_tokens(text: str) -> str:
+    """Numbers, emails, negations, names and mid-sentence capitalised words in the text.
+
+    Embeddings place "headache for 3 days" right next to "headache for 5 days",
+    "no headache" next to "headache" and "I'm John" next to "I'm Jane". A
+    cached result is only reused when these tokens match exactly and in
+    order, with number words as digits. Names are taken from the word after
+    a cue such as "my name is", so lower-case transcripts are covered too.
+    """
+    tokens = []
+    for match in _GUARD_TOKENS.finditer(text.strip()):
+        token = (match.group("name") or match.group(0)).lower()
+        tokens.append(NUMBER_WORDS.get(token, token))
+    return " ".join(tokens)
+
+
+class VectorIndex(Protocol):
+    async def search(self, namespace: str, vector: np.ndarray, limit: int) -> list[tuple[float, str, dict]]: ...
+
+    async def add(self, namespace: str, vector: np.ndarray, guard: str, payload: dict) -> None: ...
+
+    async def count(self) -> int: ...
+
+
+class NumpyIndex:
+    """In-process index for development; keeps the newest `max_entries` per namespace."""
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self._entries: dict[str, deque] = {}
+
+    async def search(self, namespace: str, vector: np.ndarray, limit: int) -> list[tuple[float, str, dict]]:
+        entries = self._entries.get(namespace)
+        if not entries:
+            return []
+        # Vectors are normalised, so the dot product is the cosine similarity
+        matrix = np.stack([entry[0] for entry in entries])
+        similarities = matrix @ vector
+        best = np.argsort(similarities)[::-1][:limit]
+        return [(float(similarities[i]), entries[i][1], entries[i][2]) for i in best]
+
+    async def add(self, namespace: str, vector: np.ndarray, guard: str, payload: dict) -> None:
+        entries = self._entries.setdefault(namespace, deque(maxlen=self.max_entries))
+        entries.append((vector, guard, payload))
+
+    async def count(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+
+class PgVectorIndex:
+    """pgvector-backed index shared by every agent instance (db/migrations/004)."""
+
+    def __init__(self, database_url: str, max_entries: int = 100_000):
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        self.max_entries = max_entries
+        self.engine = create_async_engine(database_url, pool_size=2, max_overflow=0)
+
+    @staticmethod
+    def _literal(vector: np.ndarray) -> str:
+        return "[" + ",".join(f"{x:.7g}" for x in vector.tolist()) + "]"
+
+    async def search(self, namespace: str, vector: np.ndarray, limit: int) -> list[tuple[float, str, dict]]:
+        from sqlalchemy import text
+
+        async with self.engine.connect() as conn:
+            rows = await conn.execute(
+                text(
+                    """
+                    SELECT 1 - (embedding <=> CAST(:vector AS vector)) AS similarity, guard, payload
+                    FROM public.agent_semantic_cache
+                    WHERE namespace = :namespace
+                    ORDER BY embedding <=> CAST(:vector AS vector)
+                    LIMIT :limit
+                    """
+                ),
+                {"vector": self._literal(vector), "namespace": namespace, "limit": limit},
+            )
+            # asyncpg hands jsonb back as text
+            return [
+                (float(row.similarity), row.guard, json.loads(row.payload) if isinstance(row.payload, str) else row.payload)
+                for row in rows
+            ]
+
+    async def add(self, namespace: str, vector: np.ndarray, guard: str, payload: dict) -> None:
+        from sqlalchemy import text
+
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text(
+                    """
+                    INSERT INTO public.agent_semantic_cache (namespace, guard, embedding, payload)
+                    VALUES (:namespace, :guard, CAST(:vector AS vector), CAST(:payload AS jsonb))
+                    """
+                ),
+                {
+                    "namespace": namespace,
+                    "guard": guard,
+                    "vector": self._literal(vector),
+                    "payload": json.dumps(payload),
+                },
+            )
+            await conn.execute(
+                text(
+                    """
+                    DELETE FROM public.agent_semantic_cache WHERE id IN (
+                        SELECT id FROM public.agent_semantic_cache
+                        ORDER BY created_at DESC OFFSET :max_entries
+                    )
+                    """
+                ),
+                {"max_entries": self.max_entries},
+            )
+
+    async def count(self) -> int:
+        from sqlalchemy import text
+
+        async with self.engine.connect() as conn:
+            return (await conn.execute(text("SELECT COUNT(*) FROM public.agent_semantic_cache"))).scalar_one()
+
+
+class SentenceTransformerEmbedder:
+    """Local embedding model, loaded on first use so the agent starts without it."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+
+    def _encode(self, text: str | list[str]) -> np.ndarray:
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            self._model = SentenceTransformer(self.model_name)
+        return self._model.encode(text, normalize_embeddings=True)
+
+    async def __call__(self, text: str | list[str]) -> np.ndarray:
+        # A list of texts is encoded as one batch, one row per text
+        return await asyncio.to_thread(self._encode, text)
+
+
+class SemanticCache:
+    """Reuses a stored result for a transcript similar enough to a previous one."""
+
+    def __init__(
+        self,
+        index: VectorIndex,
+        embed: Callable[[str], Awaitable[np.ndarray]],
+        threshold: float = 0.92,
+        candidates: int = 5,
+    ):
+        self.index = index
+        self.embed = embed
+        self.threshold = threshold
+        self.candidates = candidates
+
+        self.hits = 0
+        self.misses = 0
+        self.guard_rejections = 0
+        self.stores = 0
+
+    async def lookup(self, namespace: str, text: str) -> dict | None:
+        if cache.is_bypassed():
+            return None
+
+        vector = await self.embed(text)
+        guard = guard_tokens(text)
+        for similarity, candidate_guard, payload in await self.index.search(namespace, vector, self.candidates):
+            if similarity < self.threshold:
+                break
+            if candidate_guard == guard:
+                self.hits += 1
+                return payload
+            self.guard_rejections += 1
+
+        self.misses += 1
+        return None
+
+    async def store(self, namespace: str, text: str, payload: dict) -> None:
+        vector = await self.embed(text)
+        await self.index.add(namespace, vector, guard_tokens(text), payload)
+        self.stores += 1
+
+    async def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": await self.index.count(),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "guard_rejections": self.guard_rejections,
+            "stores": self.stores,
+        }
@@ -0,0 +1,158 @@
+from instructor.exceptions import InstructorRetryException
+from typing import Any, Literal, Type, Union, get_args, get_origin
+from pydantic import BaseModel
+from instructor import AsyncInstructor
+from types import SimpleNamespace
+from datetime import date
+import asyncio
+import random
+import types
+import math
+
+import httpx
+
+from agent.tokens import estimate_tokens
+
+######################################################################
+#                       Simulated LLM Provider                       #
+######################################################################
+
+SYMPTOMS = ["headache", "fatigue", "cough", "fever", "nausea", "dizziness", "joint pain", "insomnia"]
+MEDICATIONS = ["Metformin", "Ibuprofen", "Lisinopril", "Atorvastatin", "Amoxicillin", "Paracetamol"]
+NAMES = ["John Smith", "Alice Thompson", "Maria Garcia", "David Lee", "Emma Brown"]
+
+
+class SimulatedProvider:
+    """Instructor-compatible stand-in for an LLM provider, for offline load tests.
+
+    Answers with schema-valid data after a log-normal delay around
+    `latency_median` seconds. A share of calls fails with a network error,
+    and each attempt can fail validation, which costs a retry just as it
+    does with a real model.
+    """
+
+    def __init__(
+        self,
+        latency_median: float = 0.8,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        validation_failure_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.validation_failure_rate = validation_failure_rate
+        self.random = random.Random(seed)
+
+        self.calls = 0
+        self.attempts = 0
+        self.errors = 0
+        self.validation_failures = 0
+
+        self.client = AsyncInstructor(client=None, create=self.create)
+
+    def latency(self) -> float:
+        if self.latency_median <= 0:
+            return 0.0
+        return self.random.lognormvariate(math.log(self.latency_median), self.latency_sigma)
+
+    def synthesize(self, annotation: Any, name: str = "", owner: str = "") -> Any:
+        """Random data that validates against `annotation`, a model or field type."""
+        if name.startswith("error"):
+            # Simulated failures are raised, never reported in the response
+            return False if annotation is bool else None
+        origin = get_origin(annotation)
+        if origin in (Union, types.UnionType):
+            options = [arg for arg in get_args(annotation) if arg is not type(None)]
+            return self.synthesize(options[0], name, owner)
+        if origin is Literal:
+            return self.random.choice(get_args(annotation))
+        if origin is list:
+            return [self.synthesize(get_args(annotation)[0], name, owner) for _ in range(self.random.randint(1, 3))]
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return {
+                field: self.synthesize(info.annotation, field, annotation.__name__)
+                for field, info in annotation.model_fields.items()
+            }
+        if annotation is bool:
+            return self.random.random() < 0.5
+        if annotation is int:
+            return self.random.randint(1, 30)
+        if annotation is date:
+            return date(self.random.randint(1940, 2005), self.random.randint(1, 12), self.random.randint(1, 28))
+        if name == "email":
+            return "patient@example.com"
+        if name == "recommendation":
+            return "- Review symptoms at a follow-up consultation in two weeks."
+        if name == "name":
+            if "Symptom" in owner:
+                return self.random.choice(SYMPTOMS)
+            if "Medication" in owner:
+                return self.random.choice(MEDICATIONS)
+            return self.random.choice(NAMES)
+        return "simulated"
+
+    def respond(self, response_model: Type[BaseModel]) -> BaseModel:
+        return response_model.model_validate(self.synthesize(response_model))
+
+    async def create(self, response_model: Type[BaseModel], messages: list[dict], stream: bool = False, **kwargs):
+        self.calls += 1
+        max_retries = kwargs.get("max_retries", 3)
+        max_retries = max_retries if isinstance(max_retries, int) else 3
+
+        if stream:
+            return self._stream(response_model)
+
+        for _ in range(max_retries):
+            self.attempts += 1
+            await asyncio.sleep(self.latency())
+
+            if self.random.random() < self.error_rate:
+                self.errors += 1
+                raise httpx.ConnectError("Simulated provider connection error")
+            if self.random.random() < self.validation_failure_rate:
+                self.validation_failures += 1
+                continue
+
+            resp = self.respond(response_model)
+            prompt = "".join(message["content"] for message in messages)
+            # Usage in the shape of an OpenAI response, for token accounting
+            prompt_tokens = estimate_tokens(prompt)
+            completion_tokens = estimate_tokens(resp.model_dump_json())
+            resp._raw_response = SimpleNamespace(usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+                prompt_tokens_details=None,
+            ))
+            return resp
+
+        raise InstructorRetryException(
+            "Simulated validation failures",
+            n_attempts=max_retries,
+            total_usage=0,
+        )
+
+    async def _stream(self, response_model: Type[BaseModel]):
+        # Half the latency to the first partial, the rest to the full answer
+        full = self.synthesize(response_model)
+        partial_model = response_model.get_partial_model()
+        self.attempts += 1
+
+        await asyncio.sleep(self.latency() / 2)
+        if self.random.random() < self.error_rate:
+            self.errors += 1
+            raise httpx.ConnectError("Simulated provider connection error")
+        first_field = next(iter(full))
+        yield partial_model.model_validate({first_field: full[first_field]})
+        await asyncio.sleep(self.latency() / 2)
+        yield partial_model.model_validate(full)
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "errors": self.errors,
+            "validation_failures": self.validation_failures,
+        }
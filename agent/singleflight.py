@@ -0,0 +1,58 @@
+from typing import Any, Awaitable, Callable, TypeVar
+import hashlib
+import asyncio
+import json
+
+######################################################################
+#                    In-Flight Request De-duplication                #
+######################################################################
+
+T = TypeVar("T")
+
+
+def flight_key(operation: str, text: str, *options: Any) -> str:
+    """Identical for requests that would run the same work.
+
+    Whitespace is collapsed so a rerun that only re-wrapped the transcript
+    still matches; case is kept, as it can change what is extracted.
+    """
+    payload = json.dumps([operation, " ".join(text.split()), *map(str, options)], separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SingleFlight:
+    """Runs concurrent calls with the same key once and hands every caller the result.
+
+    The shared task keeps running while any caller still waits for it, and is
+    cancelled once none do.
+    """
+
+    def __init__(self):
+        self._flights: dict[str, tuple[asyncio.Task, list[int]]] = {}
+
+        self.started = 0
+        self.joined = 0
+
+    async def do(self, key: str, work: Callable[[], Awaitable[T]]) -> T:
+        if key in self._flights:
+            task, waiters = self._flights[key]
+            self.joined += 1
+        else:
+            # The task copies this caller's context, e.g. its cache bypass
+            task, waiters = asyncio.ensure_future(work()), [0]
+            self._flights[key] = (task, waiters)
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+            self.started += 1
+
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if waiters[0] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._flights), "started": self.started, "joined": self.joined}
@@ -0,0 +1,180 @@
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest
+from dataclasses import dataclass, asdict, field
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+import json
+import time
+
+from agent.tokens import estimate_tokens
+from agent.resilience import provider_errors
+from pydantic import ValidationError
+import asyncio
+
+######################################################################
+#                          Token Usage                               #
+######################################################################
+
+
+@dataclass
+class UsageTotals:
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    estimated_prompt_tokens: int = 0
+
+
+class UsageStats:
+    """Prompt and completion tokens per model and response schema."""
+
+    def __init__(self):
+        self.totals: dict[tuple[str, str], UsageTotals] = {}
+
+    def record(self, model: str, schema: str, prompt: str, usage: Any | None) -> None:
+        totals = self.totals.setdefault((model, schema), UsageTotals())
+        totals.calls += 1
+        totals.estimated_prompt_tokens += estimate_tokens(prompt)
+        if usage is None:
+            return
+
+        totals.prompt_tokens += usage.prompt_tokens or 0
+        totals.completion_tokens += usage.completion_tokens or 0
+        # Prompt tokens served from the provider's prefix cache
+        details = getattr(usage, "prompt_tokens_details", None)
+        totals.cached_prompt_tokens += getattr(details, "cached_tokens", None) or 0
+
+    def snapshot(self) -> list[dict]:
+        return [
+            {"model": model, "schema": schema, **asdict(totals)}
+            for (model, schema), totals in sorted(self.totals.items())
+        ]
+
+
+######################################################################
+#                          Call Telemetry                            #
+######################################################################
+
+# Validation retries instructor made inside the current call
+_retries: ContextVar[list[int] | None] = ContextVar("llm_call_retries", default=None)
+
+
+def count_retry(*args: Any, **kwargs: Any) -> None:
+    counter = _retries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def instrument_client(client: Any) -> None:
+    """Count validation retries of an instructor client through its parse:error hook."""
+    client.on("parse:error", count_retry)
+
+
+def outcome_of(exc: BaseException) -> str:
+    from instructor.exceptions import InstructorRetryException
+
+    if isinstance(exc, asyncio.CancelledError):
+        return "cancelled"
+    if isinstance(exc, TimeoutError):
+        return "timeout"
+    if isinstance(exc, (ValidationError, InstructorRetryException)):
+        return "validation_error"
+    if isinstance(exc, provider_errors()):
+        return "provider_error"
+    return "error"
+
+
+@dataclass
+class CallRecord:
+    model: str
+    schema: str
+    outcome: str
+    latency: float
+    retries: int = 0
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    cached_prompt_tokens: int | None = None
+    error: str | None = None
+    # Fields fixed locally instead of retrying, as "Schema.field:action"
+    repairs: list[str] = field(default_factory=list)
+
+
+class CallTelemetry:
+    """Per-call LLM metrics for Prometheus, plus an optional JSONL trace."""
+
+    def __init__(self, trace_path: str | None = None):
+        self.registry = CollectorRegistry()
+        self.calls = Counter(
+            "agent_llm_calls", "LLM calls by model, response schema and outcome",
+            ["model", "schema", "outcome"], registry=self.registry,
+        )
+        self.latency = Histogram(
+            "agent_llm_call_duration_seconds", "LLM call latency",
+            ["model", "schema", "outcome"], registry=self.registry,
+            buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+        )
+        self.tokens = Counter(
+            "agent_llm_tokens", "Tokens reported by the provider",
+            ["model", "schema", "kind"], registry=self.registry,
+        )
+        self.retries = Counter(
+            "agent_llm_validation_retries", "Calls instructor repeated after a validation error",
+            ["model", "schema"], registry=self.registry,
+        )
+        self.repairs = Counter(
+            "agent_llm_repairs", "Response fields fixed locally instead of retrying the call",
+            ["model", "repair"], registry=self.registry,
+        )
+        self.fallbacks = Counter(
+            "agent_llm_fallbacks", "Requests moved on to the next model after this one failed",
+            ["model"], registry=self.registry,
+        )
+        self.hedges = Counter(
+            "agent_llm_hedges", "Extra calls started because the current one was slow",
+            registry=self.registry,
+        )
+        self.queue_wait = Histogram(
+            "agent_llm_queue_wait_seconds", "Time calls waited for rate limits before being sent",
+            ["model", "priority"], registry=self.registry,
+            buckets=(0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60),
+        )
+        self.http_requests = Counter(
+            "agent_http_requests", "HTTP requests sent to providers",
+            ["host", "protocol"], registry=self.registry,
+        )
+        self.connections = Counter(
+            "agent_http_connections_opened", "New provider connections; requests minus these reused one",
+            ["host"], registry=self.registry,
+        )
+        self.trace_path = trace_path
+
+    @contextmanager
+    def retry_counter(self) -> Iterator[list[int]]:
+        counter = [0]
+        token = _retries.set(counter)
+        try:
+            yield counter
+        finally:
+            _retries.reset(token)
+
+    def record(self, call: CallRecord) -> None:
+        self.calls.labels(call.model, call.schema, call.outcome).inc()
+        self.latency.labels(call.model, call.schema, call.outcome).observe(call.latency)
+        if call.retries:
+            self.retries.labels(call.model, call.schema).inc(call.retries)
+        for repair in call.repairs:
+            self.repairs.labels(call.model, repair).inc()
+        for kind in ("prompt", "completion", "cached_prompt"):
+            count = getattr(call, f"{kind}_tokens")
+            if count:
+                self.tokens.labels(call.model, call.schema, kind).inc(count)
+
+        if self.trace_path:
+            with open(self.trace_path, "a") as trace:
+                trace.write(json.dumps({"ts": time.time(), **asdict(call)}) + "\n")
+
+    def skipped(self, model: str, schema: str) -> None:
+        self.calls.labels(model, schema, "circuit_open").inc()
+
+    def exposition(self) -> bytes:
+        return generate_latest(self.registry)
@@ -0,0 +1,73 @@
+import math
+import re
+
+######################################################################
+#                          Token Budgeting                           #
+######################################################################
+
+# English clinical text averages about four characters per token for the
+# OpenAI tokenizers; close enough for budgeting without a tokenizer dependency
+CHARS_PER_TOKEN = 4
+
+TRIM_MARKER = "\n[... part of the transcript omitted ...]\n"
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def fit_to_budget(text: str, max_tokens: int, head_share: float = 0.25) -> str:
+    """Trim text to roughly `max_tokens`, keeping its opening and its end.
+
+    Introductions (name, date of birth) tend to come first and the most
+    recent findings last, so the middle of an over-long transcript goes.
+    """
+    if max_tokens <= 0 or estimate_tokens(text) <= max_tokens:
+        return text
+
+    max_chars = max_tokens * CHARS_PER_TOKEN - len(TRIM_MARKER)
+    head = int(max_chars * head_share)
+    tail = max_chars - head
+    return text[:head] + TRIM_MARKER + text[len(text) - tail:]
+
+
+######################################################################
+#                             Chunking                               #
+######################################################################
+
+_SENTENCE_ENDS = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def split_chunks(text: str, max_chars: int, overlap_chars: int = 0) -> list[str]:
+    """Split text into chunks of at most `max_chars`, breaking between sentences.
+
+    Each chunk starts with up to `overlap_chars` of the sentences that ended
+    the previous one, so a mention cut by a boundary is still seen whole.
+    Sentences longer than a chunk are cut where they must be.
+    """
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text]
+
+    sentences = []
+    for sentence in _SENTENCE_ENDS.split(text):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            sentences.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if sentence:
+            sentences.append(sentence)
+
+    chunks, current = [], []
+    for sentence in sentences:
+        if current and len(" ".join([*current, sentence])) > max_chars:
+            chunks.append(" ".join(current))
+            overlap = []
+            for previous in reversed(current):
+                if (len(" ".join([previous, *overlap])) > overlap_chars
+                        or len(" ".join([previous, *overlap, sentence])) > max_chars):
+                    break
+                overlap.insert(0, previous)
+            current = overlap
+        current.append(sentence)
+    chunks.append(" ".join(current))
+    return chunks
@@ -0,0 +1,78 @@
+from pydantic import BaseModel
+from typing import Any
+import importlib.util
+
+######################################################################
+#                       Shared Provider Transport                    #
+######################################################################
+
+
+class TransportConfig(BaseModel):
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    # Seconds an idle connection is kept for reuse
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    # Longest gap between two chunks of a response; None uses the provider timeout
+    read_timeout: float | None = None
+    # Used only when the h2 package is installed
+    http2: bool = True
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class ConnectionTracer:
+    """Counts requests and newly opened connections from httpcore trace events.
+
+    Requests minus opened connections are the requests that reused a pooled
+    connection.
+    """
+
+    def __init__(self, telemetry: Any = None):
+        self.telemetry = telemetry
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+
+    async def on_request(self, request: Any) -> None:
+        host = request.url.host
+
+        async def trace(event: str, info: dict) -> None:
+            if event == "connection.connect_tcp.complete":
+                self.connections += 1
+                if self.telemetry is not None:
+                    self.telemetry.connections.labels(host).inc()
+            elif event == "connection.start_tls.complete":
+                self.tls_handshakes += 1
+            elif event.endswith(".send_request_headers.started"):
+                self.requests += 1
+                if self.telemetry is not None:
+                    self.telemetry.http_requests.labels(host, event.split(".")[0]).inc()
+
+        request.extensions["trace"] = trace
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections,
+            "tls_handshakes": self.tls_handshakes,
+            "reuse_ratio": 1 - self.connections / self.requests if self.requests else 0.0,
+        }
+
+
+def build_http_client(config: TransportConfig, tracer: ConnectionTracer | None = None) -> Any:
+    """One pooled httpx.AsyncClient for every provider SDK client."""
+    import httpx
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(None, connect=config.connect_timeout, read=config.read_timeout),
+        http2=config.http2 and http2_available(),
+        event_hooks={"request": [tracer.on_request]} if tracer is not None else None,
+    )
@@ -1,42 +1,318 @@
-from pydantic import BaseModel, ValidationError
-from instructor import Instructor
-from typing import Type
+from pydantic import BaseModel
+from pydantic import ValidationError
+from typing import TYPE_CHECKING, AsyncIterator, Type
+import asyncio
 
+from agent.resilience import provider_errors
+from agent.ratelimit import current_priority
+from agent.tokens import estimate_tokens
+from agent.form_agent.repair import REPAIRS, repair_context
+from agent.telemetry import CallRecord, outcome_of
+from agent.schemas import ClientBase
 import agent.config as conf
 
+if TYPE_CHECKING:
+    from instructor import AsyncInstructor
+
+
+def cache_model() -> str:
+    # Any client in the fallback chain may answer, so the chain is the model
+    return ",".join(client.model for client in conf.CLIENTS)
+
 
 async def query_llm(prompt: str, schema: Type[BaseModel]) -> Type[BaseModel]:
+    cache = conf.LLM_CACHE
+    if cache is not None:
+        cached = await cache.get(prompt, schema, cache_model())
+        if cached is not None:
+            return cached
+
     resp = await LLM_CALL_FALLABLE(schema, prompt)
 
+    if cache is not None:
+        await cache.put(prompt, schema, cache_model(), resp)
+
     return resp
 
 
 async def LLM_CALL(
     response_model: Type[BaseModel],
     model: str | None,
-    client: Instructor,
+    client: "AsyncInstructor",
     content: str,
+    context: dict | None = None,
 ) -> BaseModel:
     if model == conf.GEMINI:
-        return client.chat.completions.create(
+        return await client.chat.completions.create(
             messages=[{"role": "user", "content": content}],
             response_model=response_model,
+            context=context,
         )
 
-    return client.chat.completions.create(
+    return await client.chat.completions.create(
         model=model,
         messages=[{"role": "user", "content": content}],
         response_model=response_model,
+        context=context,
     )
 
 
+async def _admit(client: ClientBase, content: str) -> int:
+    """Wait until the account and the model's limits allow another call.
+
+    Returns the estimated prompt tokens, settled against the real usage once
+    the call is done.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    if conf.RATE_LIMITER is not None:
+        await conf.RATE_LIMITER.acquire()
+    estimated = estimate_tokens(content)
+    await conf.SCHEDULERS.get(client.model).acquire(estimated)
+    conf.TELEMETRY.queue_wait.labels(client.model, current_priority().name.lower()).observe(loop.time() - started)
+    return estimated
+
+
+async def _attempt(client: ClientBase, response_model: Type[BaseModel], content: str) -> BaseModel:
+    loop = asyncio.get_running_loop()
+    estimated = await _admit(client, content)
+    # Answers with fixable values, such as "500mg" for an int, are repaired
+    # in place instead of costing another round trip
+    context = repair_context()
+    async with client.semaphore:
+        started = loop.time()
+        with conf.TELEMETRY.retry_counter() as retries:
+            try:
+                async with asyncio.timeout(client.timeout):
+                    resp = await LLM_CALL(response_model, client.model, client.client, content, context)
+            except BaseException as e:
+                conf.TELEMETRY.record(CallRecord(
+                    model=client.model,
+                    schema=response_model.__name__,
+                    outcome=outcome_of(e),
+                    latency=loop.time() - started,
+                    retries=retries[0],
+                    error=str(e) or type(e).__name__,
+                ))
+                raise
+    latency = loop.time() - started
+
+    conf.PROVIDER_HEALTH.latency(client.model).record(latency)
+    # Instructor keeps the provider response, and with it the usage, on the model
+    usage = getattr(getattr(resp, "_raw_response", None), "usage", None)
+    conf.TOKEN_USAGE.record(client.model, response_model.__name__, content, usage)
+    conf.SCHEDULERS.get(client.model).settle(estimated, getattr(usage, "total_tokens", None))
+    conf.TELEMETRY.record(CallRecord(
+        model=client.model,
+        schema=response_model.__name__,
+        outcome="success",
+        latency=latency,
+        retries=retries[0],
+        prompt_tokens=getattr(usage, "prompt_tokens", None),
+        completion_tokens=getattr(usage, "completion_tokens", None),
+        cached_prompt_tokens=getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None),
+        repairs=[repair.label for repair in context[REPAIRS]],
+    ))
+    return resp
+
+
 async def LLM_CALL_FALLABLE(
     response_model: Type[BaseModel],
     content: str,
 ) -> BaseModel:
-    for client in conf.CLIENTS:
+    health = conf.PROVIDER_HEALTH
+    candidates = iter(conf.CLIENTS)
+    pending: dict[asyncio.Task, ClientBase] = {}
+    latest: ClientBase | None = None
+
+    def launch_next() -> bool:
+        nonlocal latest
+        for client in candidates:
+            if not health.breaker(client.model).allow():
+                print(f"{client.model} skipped, circuit open")
+                conf.TELEMETRY.skipped(client.model, response_model.__name__)
+                continue
+            pending[asyncio.create_task(_attempt(client, response_model, content))] = client
+            latest = client
+            return True
+        return False
+
+    exhausted = not launch_next()
+    try:
+        while pending:
+            # Hedge: if the newest call is slower than usual, start the next
+            # client alongside it and take whichever answers first
+            hedge_after = None
+            if not exhausted:
+                hedge_after = health.latency(latest.model).percentile(conf.LLM_HEDGE_PERCENTILE)
+
+            done, _ = await asyncio.wait(pending, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                health.hedges += 1
+                conf.TELEMETRY.hedges.inc()
+                exhausted = not launch_next()
+                continue
+
+            for task in done:
+                client = pending.pop(task)
+                try:
+                    resp = task.result()
+                except provider_errors() as e:
+                    health.breaker(client.model).record_failure()
+                    conf.TELEMETRY.fallbacks.labels(client.model).inc()
+                    if isinstance(e, TimeoutError):
+                        print(f"{client.model} timed out after {client.timeout}s")
+                    else:
+                        print(str(e))
+                    continue
+                except BaseException:
+                    # Not the provider's fault, but a half-open breaker still
+                    # waits for its trial call to report back
+                    health.breaker(client.model).record_cancelled()
+                    raise
+                health.breaker(client.model).record_success()
+                return resp
+
+            if not pending and not exhausted:
+                exhausted = not launch_next()
+    finally:
+        for task, client in pending.items():
+            task.cancel()
+            health.breaker(client.model).record_cancelled()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    raise RuntimeError("No model managed to get a validated response")
+
+
+######################################################################
+#                        Streaming Responses                         #
+######################################################################
+
+
+async def stream_llm(prompt: str, schema: Type[BaseModel]) -> AsyncIterator[BaseModel]:
+    """Yield partial responses as the model generates them.
+
+    Partials have every field optional; the last one holds the full answer.
+    """
+    cache = conf.LLM_CACHE
+    if cache is not None:
+        cached = await cache.get(prompt, schema, cache_model())
+        if cached is not None:
+            yield cached
+            return
+
+    last = None
+    async for partial in LLM_STREAM_FALLABLE(schema, prompt):
+        last = partial
+        yield partial
+
+    if cache is not None and last is not None:
         try:
-            return await LLM_CALL(response_model, client.model, client.client, content)
-        except ValidationError as e:
-            print(str(e))
+            await cache.put(prompt, schema, cache_model(), schema.model_validate(last.model_dump()))
+        except ValidationError:
+            pass
+
+
+async def LLM_STREAM(
+    response_model: Type[BaseModel],
+    model: str | None,
+    client: "AsyncInstructor",
+    content: str,
+    context: dict | None = None,
+) -> AsyncIterator[BaseModel]:
+    kwargs = {} if model == conf.GEMINI else {"model": model}
+    async for partial in client.chat.completions.create_partial(
+        messages=[{"role": "user", "content": content}],
+        response_model=response_model,
+        context=context,
+        **kwargs,
+    ):
+        yield partial
+
+
+def _record_stream(
+    client: ClientBase,
+    response_model: Type[BaseModel],
+    outcome: str,
+    latency: float,
+    error: BaseException | None = None,
+    repairs: list[str] | None = None,
+) -> None:
+    # Streams report no usage, so only the outcome and duration are recorded
+    conf.TELEMETRY.record(CallRecord(
+        model=client.model,
+        schema=response_model.__name__,
+        outcome=outcome,
+        latency=latency,
+        error=None if error is None else str(error) or type(error).__name__,
+        repairs=repairs or [],
+    ))
+
+
+async def LLM_STREAM_FALLABLE(
+    response_model: Type[BaseModel],
+    content: str,
+) -> AsyncIterator[BaseModel]:
+    # No hedging here: two streams cannot be merged once one has started.
+    # A client that fails before its first partial falls through to the next.
+    health = conf.PROVIDER_HEALTH
+    loop = asyncio.get_running_loop()
+
+    for client in conf.CLIENTS:
+        breaker = health.breaker(client.model)
+        if not breaker.allow():
+            print(f"{client.model} skipped, circuit open")
+            conf.TELEMETRY.skipped(client.model, response_model.__name__)
+            continue
+
+        started = False
+        last = None
+        estimated = await _admit(client, content)
+        async with client.semaphore:
+            context = repair_context()
+            stream = LLM_STREAM(response_model, client.model, client.client, content, context)
+            opened = loop.time()
+            deadline = opened + client.timeout
+            try:
+                while True:
+                    # The deadline is applied per partial so no timeout scope
+                    # stays open across a yield to the caller
+                    try:
+                        partial = await asyncio.wait_for(anext(stream), deadline - loop.time())
+                    except StopAsyncIteration:
+                        break
+                    started = True
+                    last = partial
+                    yield partial
+            except provider_errors() as e:
+                breaker.record_failure()
+                _record_stream(client, response_model, outcome_of(e), loop.time() - opened, e)
+                if started:
+                    raise
+                conf.TELEMETRY.fallbacks.labels(client.model).inc()
+                if isinstance(e, TimeoutError):
+                    print(f"{client.model} timed out after {client.timeout}s")
+                else:
+                    print(str(e))
+                continue
+            except (GeneratorExit, asyncio.CancelledError) as e:
+                breaker.record_cancelled()
+                _record_stream(client, response_model, "cancelled", loop.time() - opened, e)
+                raise
+            except Exception as e:
+                breaker.record_cancelled()
+                _record_stream(client, response_model, outcome_of(e), loop.time() - opened, e)
+                raise
+            finally:
+                await stream.aclose()
+
+        breaker.record_success()
+        # Every partial is validated again, so the same repair repeats
+        repairs = sorted({repair.label for repair in context[REPAIRS]})
+        _record_stream(client, response_model, "success", loop.time() - opened, repairs=repairs)
+        # Charge the answer's estimated size in place of the usage streams lack
+        conf.SCHEDULERS.get(client.model).settle(estimated, estimated + estimate_tokens(last.model_dump_json() if last else ""))
+        return
+
     raise RuntimeError("No model managed to get a validated response")
@@ -0,0 +1,135 @@
+"""Offline load benchmark of the form agent against a simulated LLM provider.
+
+Replaces the configured models with agent.simulated.SimulatedProvider and
+sends the fixture consultations through PatientFormBuilder directly and
+through the FastAPI app in process, both with many requests in flight.
+Reports throughput, tail latency and LLM calls per request. No network
+access or API key is needed.
+
+    python -m benchmarks.bench_agent_pipeline --requests 500 --concurrency 50
+    python -m benchmarks.bench_agent_pipeline --error-rate 0.05 --validation-failure-rate 0.1
+
+Latency is log-normal around --latency-median seconds per call. With two
+simulated models the fallback chain, hedging and circuit breakers are
+exercised as well.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+import agent.config as conf
+from agent.api_gateway import app
+from agent.form_agent.schemas import extractionStrategy
+from agent.form_agent.utils import PatientFormBuilder
+from agent.schemas import ClientBase
+from agent.simulated import SimulatedProvider
+from benchmarks.bench_extraction import FIXTURES
+
+
+def percentile(samples: list, p: float) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else float("nan")
+    return statistics.quantiles(samples, n=100, method="inclusive")[round(p * 100) - 1]
+
+
+async def drive(name: str, send, texts: list, requests: int, concurrency: int, providers: list) -> dict:
+    calls_before = sum(p.calls for p in providers)
+    slots = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async def one(i: int):
+        nonlocal failures
+        async with slots:
+            started = time.perf_counter()
+            try:
+                await send(texts[i % len(texts)])
+            except Exception:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "target": name,
+        "throughput": requests / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "calls": (sum(p.calls for p in providers) - calls_before) / requests,
+        "failures": failures,
+    }
+
+
+async def main_async(args) -> list:
+    providers = [
+        SimulatedProvider(
+            latency_median=args.latency_median,
+            latency_sigma=args.latency_sigma,
+            error_rate=args.error_rate,
+            validation_failure_rate=args.validation_failure_rate,
+            seed=args.seed + i,
+        )
+        for i in range(args.models)
+    ]
+    conf.CLIENTS = [
+        ClientBase(client=p.client, model=f"simulated-{i}", max_concurrency=args.max_concurrency, timeout=args.timeout)
+        for i, p in enumerate(providers)
+    ]
+    conf.LLM_CACHE = None
+    conf.SEMANTIC_CACHE = None
+
+    texts = [case["text"] for case in json.loads(FIXTURES.read_text())]
+    strategy = extractionStrategy(args.strategy)
+    builder = PatientFormBuilder(strategy=strategy)
+
+    async def via_builder(text):
+        await builder.get_patient_form(text)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def via_app(text):
+            response = await client.post("/get_form/", json=text, params={"strategy": strategy.value})
+            response.raise_for_status()
+
+        return [
+            await drive("builder", via_builder, texts, args.requests, args.concurrency, providers),
+            await drive("fastapi", via_app, texts, args.requests, args.concurrency, providers),
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--strategy", default="multi-call", choices=[s.value for s in extractionStrategy])
+    parser.add_argument("--models", type=int, default=2, help="simulated models in the fallback chain")
+    parser.add_argument("--max-concurrency", type=int, default=conf.LLM_MAX_CONCURRENCY, help="calls in flight per model")
+    parser.add_argument("--timeout", type=float, default=conf.LLM_TIMEOUT)
+    parser.add_argument("--latency-median", type=float, default=0.2)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--validation-failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+
+    print(f"{args.requests} requests, {args.concurrency} in flight, {args.strategy}")
+    print(f"{'target':<10}{'req/s':>9}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'calls':>8}{'failed':>8}")
+    for r in results:
+        print(
+            f"{r['target']:<10}{r['throughput']:>9.1f}{r['p50']:>8.2f}{r['p95']:>8.2f}{r['p99']:>8.2f}"
+            f"{r['calls']:>8.2f}{r['failures']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Long-transcript benchmark: map-reduce chunking versus single-shot extraction.
+
+Builds consultation-length transcripts from the fixture corpus, padded with
+small talk to --length characters, and extracts each with chunking disabled
+(chunk size 0, the transcript trimmed to the token budget) and with every
+given chunk size. Reports latency, LLM calls, tokens and F1 per setting.
+
+    OPENAI_API_KEY=... python -m benchmarks.bench_chunking --chunk-chars 0 3000 6000 --repeat 3
+    python -m benchmarks.bench_chunking --simulated
+
+A 45-minute consultation is about 40,000 characters. F1 covers medication
+and symptom names only, since the corpus joins several patients' details.
+With --simulated the answers are random, so only latency and calls count.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+import agent.config as conf
+import agent.form_agent.utils as form_utils
+from agent.form_agent.utils import PatientFormBuilder
+from agent.schemas import ClientBase
+from agent.simulated import SimulatedProvider
+from benchmarks.bench_extraction import FIXTURES, UsageRecorder, extracted_items, f1
+
+SMALL_TALK = [
+    "Let me just pull up your notes from last time.",
+    "How was the drive over here today?",
+    "I'll make a note of that in your file.",
+    "Could you sit up on the table for a moment?",
+    "We can talk about the test results in a minute.",
+    "Take a deep breath in for me, and out again.",
+    "Is there anything else that has been on your mind?",
+    "The weather has been awful this week, hasn't it?",
+]
+
+
+def long_transcripts(corpus: list, length: int, count: int, seed: int = 0) -> list[dict]:
+    """Transcripts of about `length` characters mixing the corpus with small talk."""
+    rng = random.Random(seed)
+    transcripts = []
+    for _ in range(count):
+        cases = rng.sample(corpus, k=min(len(corpus), 4))
+        padding = max(0, length - sum(len(case["text"]) for case in cases))
+        gaps = [[] for _ in cases]
+        while padding > 0:
+            sentence = rng.choice(SMALL_TALK)
+            gaps[rng.randrange(len(gaps))].append(sentence)
+            padding -= len(sentence) + 1
+        text = " ".join(" ".join([*gap, case["text"]]) for gap, case in zip(gaps, cases))
+        expected = {
+            (section, name)
+            for case in cases
+            for section, names in case["expected"].items() if section != "pii"
+            for name in names
+        }
+        transcripts.append({"text": text, "expected": expected})
+    return transcripts
+
+
+async def run(chunk_chars: int, overlap: int, transcripts: list, repeat: int) -> dict:
+    builder = PatientFormBuilder(
+        chunk_min_chars=chunk_chars,
+        chunk_chars=chunk_chars,
+        chunk_overlap_chars=overlap,
+    )
+    recorder = UsageRecorder(form_utils.query_llm)
+    form_utils.query_llm = recorder
+
+    latencies, scores, failures = [], [], 0
+    try:
+        for _ in range(repeat):
+            for case in transcripts:
+                started = time.perf_counter()
+                try:
+                    form = await builder._build_patient_form(case["text"])
+                except Exception:
+                    failures += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+                items = {item for item in extracted_items(form) if item[0] != "pii"}
+                scores.append(f1(case["expected"], items))
+    finally:
+        form_utils.query_llm = recorder.query
+
+    runs = repeat * len(transcripts)
+    return {
+        "chunk_chars": chunk_chars,
+        "chunks": len(builder.chunks(transcripts[0]["text"])),
+        "p50_s": statistics.median(latencies) if latencies else float("nan"),
+        "mean_s": statistics.fmean(latencies) if latencies else float("nan"),
+        "calls": recorder.calls / runs,
+        "tokens": recorder.tokens / runs,
+        "f1": statistics.fmean(scores) if scores else 0.0,
+        "failures": failures,
+    }
+
+
+async def main_async(args) -> list:
+    if args.simulated:
+        provider = SimulatedProvider(latency_median=args.latency_median, seed=0)
+        conf.CLIENTS = [ClientBase(client=provider.client, model="simulated")]
+
+    corpus = json.loads(args.fixtures.read_text())
+    transcripts = long_transcripts(corpus, args.length, args.transcripts)
+    return [await run(size, args.overlap, transcripts, args.repeat) for size in args.chunk_chars]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-chars", type=int, nargs="+", default=[0, 3000, 6000, 12000])
+    parser.add_argument("--overlap", type=int, default=400)
+    parser.add_argument("--length", type=int, default=40000)
+    parser.add_argument("--transcripts", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES)
+    parser.add_argument("--simulated", action="store_true")
+    parser.add_argument("--latency-median", type=float, default=0.5)
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+
+    print(f"{'chunk chars':<13}{'chunks':>7}{'p50 s':>8}{'mean s':>8}{'calls':>8}{'tokens':>9}{'F1':>7}{'failed':>8}")
+    for r in results:
+        print(
+            f"{r['chunk_chars'] or 'single-shot':<13}{r['chunks']:>7}{r['p50_s']:>8.2f}{r['mean_s']:>8.2f}"
+            f"{r['calls']:>8.1f}{r['tokens']:>9.0f}{r['f1']:>7.2f}{r['failures']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Form extraction benchmark: multi-call versus single-call strategies.
+
+Runs every consultation in the fixture corpus through PatientFormBuilder with
+each extraction strategy against the configured LLM providers, then reports
+latency, LLM calls, tokens and field accuracy per strategy.
+
+    OPENAI_API_KEY=... python -m benchmarks.bench_extraction --repeat 3
+
+Accuracy is the F1 score over the extracted patient names, medication names
+and symptom names, compared case-insensitively against the expected values.
+Symptom wording varies between runs, so treat it as a relative measure.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+
+import agent.form_agent.utils as form_utils
+from agent.form_agent.schemas import extractionStrategy
+from agent.form_agent.utils import PatientFormBuilder
+
+FIXTURES = Path(__file__).parent / "fixtures" / "consultations.json"
+
+
+class UsageRecorder:
+    """Wraps query_llm to count calls and the tokens reported by the provider."""
+
+    def __init__(self, query):
+        self.query = query
+        self.calls = 0
+        self.tokens = 0
+
+    async def __call__(self, prompt, schema):
+        resp = await self.query(prompt, schema)
+        self.calls += 1
+        # Instructor keeps the provider response on the parsed model
+        usage = getattr(getattr(resp, "_raw_response", None), "usage", None)
+        if usage is not None:
+            self.tokens += usage.total_tokens
+        return resp
+
+
+def extracted_items(form) -> set:
+    items = set()
+    if form.pii is not None and form.pii.name:
+        items.add(("pii", form.pii.name.lower()))
+    if form.medication is not None:
+        items |= {("medication", med.name.lower()) for med in form.medication.meds if med.name}
+    if form.symptoms is not None:
+        items |= {("symptoms", symp.name.lower()) for symp in form.symptoms.symps if symp.name}
+    return items
+
+
+def f1(expected: set, actual: set) -> float:
+    if not expected and not actual:
+        return 1.0
+    true_positives = len(expected & actual)
+    if true_positives == 0:
+        return 0.0
+    precision = true_positives / len(actual)
+    recall = true_positives / len(expected)
+    return 2 * precision * recall / (precision + recall)
+
+
+async def run(strategy: extractionStrategy, corpus: list, repeat: int) -> dict:
+    builder = PatientFormBuilder(strategy=strategy)
+    recorder = UsageRecorder(form_utils.query_llm)
+    form_utils.query_llm = recorder
+
+    latencies, scores, failures = [], [], 0
+    try:
+        for _ in range(repeat):
+            for case in corpus:
+                expected = {(section, name) for section, names in case["expected"].items() for name in names}
+                started = time.perf_counter()
+                try:
+                    form = await builder.get_patient_form(case["text"])
+                except Exception:
+                    failures += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+                scores.append(f1(expected, extracted_items(form)))
+    finally:
+        form_utils.query_llm = recorder.query
+
+    runs = repeat * len(corpus)
+    return {
+        "strategy": strategy.value,
+        "p50_s": statistics.median(latencies) if latencies else float("nan"),
+        "mean_s": statistics.fmean(latencies) if latencies else float("nan"),
+        "calls": recorder.calls / runs,
+        "tokens": recorder.tokens / runs,
+        "f1": statistics.fmean(scores) if scores else 0.0,
+        "failures": failures,
+    }
+
+
+async def main_async(args) -> list:
+    corpus = json.loads(args.fixtures.read_text())
+    strategies = [extractionStrategy(s) for s in args.strategies]
+    return [await run(strategy, corpus, args.repeat) for strategy in strategies]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES)
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=[s.value for s in extractionStrategy],
+        choices=[s.value for s in extractionStrategy],
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+
+    print(f"{'strategy':<13}{'p50 s':>8}{'mean s':>8}{'calls':>8}{'tokens':>9}{'F1':>7}{'failed':>8}")
+    for r in results:
+        print(
+            f"{r['strategy']:<13}{r['p50_s']:>8.2f}{r['mean_s']:>8.2f}{r['calls']:>8.1f}"
+            f"{r['tokens']:>9.0f}{r['f1']:>7.2f}{r['failures']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
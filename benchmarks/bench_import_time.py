@@ -0,0 +1,60 @@
+"""Cold-start import time of the agent service.
+
+Imports a module in fresh interpreters and reports the median wall time,
+plus the slowest imports from one run of python -X importtime.
+
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --module agent.config --runs 20
+
+Run it without OPENAI_API_KEY to check that importing the agent does not
+need provider credentials.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+SNIPPET = "import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+
+
+def import_seconds(module: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", SNIPPET.format(module=module)],
+        capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip())
+
+
+def slowest_imports(module: str, top: int) -> list[tuple[int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="agent.api_gateway")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    times = [import_seconds(args.module) for _ in range(args.runs)]
+    print(f"import {args.module}: median {statistics.median(times) * 1000:.0f} ms, "
+          f"min {min(times) * 1000:.0f} ms over {args.runs} runs")
+
+    print(f"\n{'cumulative':>12}  module")
+    for micros, name in slowest_imports(args.module, args.top):
+        print(f"{micros / 1000:>10.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Insert benchmark: random UUIDv4 versus time-ordered UUIDv7 primary keys.
+
+Inserts the same number of rows into two scratch tables that differ only in
+how their keys are generated, then reports insert throughput, primary key
+index size and WAL volume for each.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_uuid_keys --rows 1000000
+
+The scratch tables are dropped afterwards. Run against a disposable database:
+the benchmark writes several hundred megabytes at a million rows.
+"""
+
+import argparse
+import os
+import time
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from API_Gateway.ids import ID_STRATEGIES
+
+
+def connect():
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        raise ValueError("DATABASE_URL environment variable not set.")
+    # The gateway uses SQLAlchemy's asyncpg dialect prefix; psycopg2 wants plain libpq
+    return psycopg2.connect(url.replace("postgresql+asyncpg://", "postgresql://"))
+
+
+def run(cur, strategy: str, rows: int, batch: int) -> dict:
+    table = f"bench_keys_{strategy}"
+    generate = ID_STRATEGIES[strategy]
+
+    cur.execute(f"DROP TABLE IF EXISTS {table}")
+    cur.execute(f"CREATE TABLE {table} (id uuid PRIMARY KEY, payload text NOT NULL)")
+    cur.connection.commit()
+
+    cur.execute("SELECT pg_current_wal_lsn()")
+    wal_start = cur.fetchone()[0]
+
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+        # One commit per batch, like a stream of form submissions
+        values = [(str(generate()), "x" * 64) for _ in range(min(batch, rows - offset))]
+        execute_values(cur, f"INSERT INTO {table} (id, payload) VALUES %s", values)
+        cur.connection.commit()
+    elapsed = time.perf_counter() - started
+
+    cur.execute("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s)", (wal_start,))
+    wal_bytes = int(cur.fetchone()[0])
+    cur.execute("SELECT pg_relation_size(%s)", (f"{table}_pkey",))
+    index_bytes = cur.fetchone()[0]
+
+    cur.execute(f"DROP TABLE {table}")
+    cur.connection.commit()
+
+    return {
+        "strategy": strategy,
+        "rows_per_second": rows / elapsed,
+        "index_mb": index_bytes / 2**20,
+        "wal_mb": wal_bytes / 2**20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    conn = connect()
+    cur = conn.cursor()
+    try:
+        results = [run(cur, strategy, args.rows, args.batch) for strategy in ("uuid4", "uuid7")]
+    finally:
+        cur.close()
+        conn.close()
+
+    print(f"{args.rows:,} rows, {args.batch} rows per commit")
+    print(f"{'strategy':<10}{'rows/s':>12}{'index MB':>12}{'WAL MB':>12}")
+    for r in results:
+        print(f"{r['strategy']:<10}{r['rows_per_second']:>12,.0f}{r['index_mb']:>12.1f}{r['wal_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
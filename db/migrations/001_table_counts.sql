@@ -0,0 +1,80 @@
+--
+-- Exact row counts for the dashboard statistics endpoint.
+--
+-- Statement-level triggers keep one counter row per table up to date, so
+-- GET /stats?mode=exact reads five rows instead of running COUNT(*) scans.
+--
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.table_count (
+    table_name text PRIMARY KEY,
+    row_count bigint NOT NULL DEFAULT 0
+);
+
+
+CREATE OR REPLACE FUNCTION public.table_count_on_insert() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE public.table_count
+    SET row_count = row_count + (SELECT count(*) FROM new_rows)
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.table_count_on_delete() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE public.table_count
+    SET row_count = row_count - (SELECT count(*) FROM old_rows)
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.table_count_on_truncate() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE public.table_count SET row_count = 0 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$;
+
+
+DO $$
+DECLARE
+    t text;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['doctor', 'patient', 'form', 'symptom', 'medication'] LOOP
+        -- Block writers while seeding so no row is counted twice or missed
+        EXECUTE format('LOCK TABLE public.%I IN SHARE ROW EXCLUSIVE MODE', t);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_count_insert', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_count_delete', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON public.%I', t || '_count_truncate', t);
+
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT ON public.%I REFERENCING NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.table_count_on_insert()',
+            t || '_count_insert', t);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER DELETE ON public.%I REFERENCING OLD TABLE AS old_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.table_count_on_delete()',
+            t || '_count_delete', t);
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER TRUNCATE ON public.%I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.table_count_on_truncate()',
+            t || '_count_truncate', t);
+
+        EXECUTE format(
+            'INSERT INTO public.table_count (table_name, row_count) SELECT %L, count(*) FROM public.%I '
+            'ON CONFLICT (table_name) DO UPDATE SET row_count = EXCLUDED.row_count',
+            t, t);
+    END LOOP;
+END;
+$$;
+
+COMMIT;
@@ -0,0 +1,36 @@
+--
+-- Time-ordered UUIDv7 primary key defaults.
+--
+-- Matches API_Gateway/ids.py so rows inserted without an explicit key (for
+-- example by db/populate.py) get the same index-friendly ordering as rows
+-- inserted by the gateway.
+--
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION public.uuid_generate_v7() RETURNS uuid
+    LANGUAGE plpgsql VOLATILE AS $$
+DECLARE
+    unix_ms bigint := floor(extract(epoch FROM clock_timestamp()) * 1000);
+    bytes bytea := uuid_send(gen_random_uuid());
+BEGIN
+    -- 48-bit big-endian millisecond timestamp in the first six bytes
+    bytes := overlay(bytes PLACING substring(int8send(unix_ms) FROM 3) FROM 1 FOR 6);
+    -- version 7 and RFC 4122 variant bits
+    bytes := set_byte(bytes, 6, (get_byte(bytes, 6) & 15) | 112);
+    bytes := set_byte(bytes, 8, (get_byte(bytes, 8) & 63) | 128);
+    RETURN encode(bytes, 'hex')::uuid;
+END;
+$$;
+
+
+ALTER TABLE public.doctor ALTER COLUMN doctor_id SET DEFAULT public.uuid_generate_v7();
+ALTER TABLE public.patient ALTER COLUMN patient_id SET DEFAULT public.uuid_generate_v7();
+ALTER TABLE public.doctor_patient ALTER COLUMN doctor_patient_id SET DEFAULT public.uuid_generate_v7();
+ALTER TABLE public.form ALTER COLUMN form_id SET DEFAULT public.uuid_generate_v7();
+ALTER TABLE public.symptom ALTER COLUMN symptom_id SET DEFAULT public.uuid_generate_v7();
+ALTER TABLE public.form_symptom ALTER COLUMN form_symptom_id SET DEFAULT public.uuid_generate_v7();
+ALTER TABLE public.medication ALTER COLUMN medication_id SET DEFAULT public.uuid_generate_v7();
+ALTER TABLE public.form_medication ALTER COLUMN form_medication_id SET DEFAULT public.uuid_generate_v7();
+
+COMMIT;
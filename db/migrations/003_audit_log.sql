@@ -0,0 +1,73 @@
+--
+-- Append-only audit trail of clinical data access, written in batches with
+-- COPY by the gateway (API_Gateway/audit.py).
+--
+-- Partitioned by month so old audit data can be archived or dropped a whole
+-- partition at a time instead of with row-by-row deletes.
+--
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.audit_log (
+    audit_id uuid DEFAULT public.uuid_generate_v7() NOT NULL,
+    occurred_at timestamp with time zone NOT NULL,
+    actor text,
+    client_addr text,
+    action text NOT NULL,
+    entity_type text NOT NULL,
+    entity_id uuid,
+    method text NOT NULL,
+    path text NOT NULL,
+    status_code smallint NOT NULL
+) PARTITION BY RANGE (occurred_at);
+
+
+-- Catches rows whose month partition has not been created yet
+CREATE TABLE IF NOT EXISTS public.audit_log_default PARTITION OF public.audit_log DEFAULT;
+
+
+CREATE INDEX IF NOT EXISTS idx_audit_log_entity ON public.audit_log USING btree (entity_type, entity_id, occurred_at);
+
+CREATE INDEX IF NOT EXISTS idx_audit_log_actor ON public.audit_log USING btree (actor, occurred_at);
+
+
+-- Creates the (UTC) month partition holding `month` and the one after it, so
+-- the gateway never has to write a new month's rows into the default partition
+CREATE OR REPLACE FUNCTION public.audit_log_ensure_partition(month date) RETURNS void
+    LANGUAGE plpgsql AS $$
+DECLARE
+    first_day date;
+    partition_name text;
+BEGIN
+    FOR i IN 0..1 LOOP
+        first_day := date_trunc('month', month)::date + make_interval(months => i);
+        partition_name := format('audit_log_y%sm%s', to_char(first_day, 'YYYY'), to_char(first_day, 'MM'));
+        IF to_regclass('public.' || partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE public.%I PARTITION OF public.audit_log FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                first_day::timestamp AT TIME ZONE 'UTC',
+                (first_day + interval '1 month')::timestamp AT TIME ZONE 'UTC');
+        END IF;
+    END LOOP;
+END;
+$$;
+
+
+-- Audit rows are never changed; retention works by dropping partitions
+CREATE OR REPLACE FUNCTION public.audit_log_reject_change() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+BEGIN
+    RAISE EXCEPTION 'audit_log is append-only';
+END;
+$$;
+
+DROP TRIGGER IF EXISTS audit_log_append_only ON public.audit_log;
+
+CREATE TRIGGER audit_log_append_only BEFORE UPDATE OR DELETE ON public.audit_log
+    FOR EACH STATEMENT EXECUTE FUNCTION public.audit_log_reject_change();
+
+
+SELECT public.audit_log_ensure_partition(current_date);
+
+COMMIT;
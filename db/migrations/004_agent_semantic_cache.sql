@@ -0,0 +1,30 @@
+--
+-- Near-duplicate transcript cache for the form agent (agent/semantic_cache.py).
+-- Each row stores a transcript embedding and the structured result that was
+-- extracted from it, so a similar transcript can reuse that result.
+--
+-- Requires the pgvector extension. The dimension matches the default
+-- all-MiniLM-L6-v2 embedding model; a different model needs a new column size.
+--
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+CREATE TABLE IF NOT EXISTS public.agent_semantic_cache (
+    id bigserial PRIMARY KEY,
+    namespace text NOT NULL,
+    guard text NOT NULL,
+    embedding vector(384) NOT NULL,
+    payload jsonb NOT NULL,
+    created_at timestamp with time zone DEFAULT now() NOT NULL
+);
+
+
+CREATE INDEX IF NOT EXISTS idx_agent_semantic_cache_embedding
+    ON public.agent_semantic_cache USING hnsw (embedding vector_cosine_ops);
+
+CREATE INDEX IF NOT EXISTS idx_agent_semantic_cache_created_at
+    ON public.agent_semantic_cache USING btree (created_at);
+
+COMMIT;
@@ -0,0 +1,60 @@
+--
+-- Sharded row counters for the dashboard statistics endpoint.
+--
+-- With one counter row per table (001_table_counts.sql), every insert into a
+-- table held that row's lock until commit, so concurrent form submissions
+-- queued behind each other. Each statement now adds its delta to one of
+-- 16 shard rows, and GET /stats sums the shards.
+--
+-- The shard follows the backend, not the statement: a form submission
+-- inserts several symptoms and medications in one transaction, and random
+-- shards per statement would lock several rows of a table in random order
+-- and let two submissions deadlock. Per backend, every statement of a
+-- transaction updates the same row of each table, taken in statement order.
+--
+
+BEGIN;
+
+-- Block the counting triggers while the key changes
+LOCK TABLE public.table_count IN ACCESS EXCLUSIVE MODE;
+
+ALTER TABLE public.table_count ADD COLUMN IF NOT EXISTS shard smallint NOT NULL DEFAULT 0;
+ALTER TABLE public.table_count DROP CONSTRAINT IF EXISTS table_count_pkey;
+ALTER TABLE public.table_count ADD PRIMARY KEY (table_name, shard);
+
+
+CREATE OR REPLACE FUNCTION public.table_count_add(counted text, delta bigint) RETURNS void
+    LANGUAGE sql AS $$
+    INSERT INTO public.table_count AS counter (table_name, shard, row_count)
+    VALUES (counted, (pg_backend_pid() % 16)::smallint, delta)
+    ON CONFLICT (table_name, shard) DO UPDATE SET row_count = counter.row_count + EXCLUDED.row_count;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.table_count_on_insert() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM public.table_count_add(TG_TABLE_NAME, (SELECT count(*) FROM new_rows));
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.table_count_on_delete() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM public.table_count_add(TG_TABLE_NAME, -(SELECT count(*) FROM old_rows));
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.table_count_on_truncate() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM public.table_count WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$;
+
+COMMIT;
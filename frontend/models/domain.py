@@ -196,6 +196,14 @@ class BackendPatient(BaseModel):
     created_at: datetime = Field(..., description="Creation timestamp")
 
 
+class BackendPatientPage(BaseModel):
+    """Backend keyset-paginated page of patients."""
+    items: List[BackendPatient] = Field(..., description="Patients on this page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page, None on the last page"
+    )
+
+
 class BackendPatientCreate(BaseModel):
     """Backend Patient creation request."""
     full_name: str = Field(..., description="Patient's full name")
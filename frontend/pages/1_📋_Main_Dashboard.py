@@ -8,6 +8,7 @@ from services.api_client import api_client, APIError
 from components.patient_card import render_patient_grid, render_patient_list
 from utils.state import (
     initialize_session_state, 
+    get_current_doctor,
     get_patient_search_query, 
     set_patient_search_query,
     toggle_create_patient_modal,
@@ -17,6 +18,12 @@ from utils.state import (
 from utils.config import config
 
 
+def load_roster(search_query: Optional[str]):
+    """Load the current doctor's patients, optionally filtered by search term."""
+    doctor = get_current_doctor()
+    return api_client.list_doctor_patients(doctor.id, search=search_query if search_query else None)
+
+
 def render_sidebar():
     """Render the sidebar with patient list and search."""
     with st.sidebar:
@@ -41,7 +48,7 @@ def render_sidebar():
         
         # Get filtered patients
         try:
-            patients = api_client.list_patients(search=search_query if search_query else None)
+            patients = load_roster(search_query)
         except APIError as e:
             st.error(f"Failed to load patients: {e.message}")
             patients = []
@@ -111,7 +118,9 @@ def render_create_patient_modal():
                     )
                     
                     # Create patient via API
-                    new_patient = api_client.create_patient(request)
+                    new_patient = api_client.create_patient(
+                        request, doctor_id=get_current_doctor().id
+                    )
                     
                     st.success(f"Patient '{new_patient.name}' created successfully!")
                     
@@ -131,14 +140,24 @@ def render_create_patient_modal():
             st.rerun()
 
 
+def render_stats():
+    """Render clinic-wide record counts."""
+    stats = api_client.get_stats()
+    columns = st.columns(len(stats))
+    for column, (label, count) in zip(columns, stats.items()):
+        column.metric(label.title(), f"{count:,}")
+
+
 def render_main_content():
     """Render the main content area with patient cards."""
     st.title("📋 Patient Dashboard")
     
+    render_stats()
+    
     # Get search query and filter patients
     search_query = get_patient_search_query()
     try:
-        patients = api_client.list_patients(search=search_query if search_query else None)
+        patients = load_roster(search_query)
     except APIError as e:
         st.error(f"Failed to load patients: {e.message}")
         patients = []
@@ -150,7 +169,7 @@ def render_main_content():
     if search_query:
         st.write(f"**Search results for:** '{search_query}' ({len(patients)} patients found)")
     else:
-        st.write(f"**All patients:** {len(patients)} patients")
+        st.write(f"**Your patients:** {len(patients)} patients")
     
     st.markdown("---")
     
@@ -12,7 +12,7 @@ from models.domain import (
     FormStatus,
     # Backend models
     BackendDoctor, BackendDoctorCreate, BackendDoctorUpdate,
-    BackendPatient, BackendPatientCreate, BackendPatientUpdate,
+    BackendPatient, BackendPatientCreate, BackendPatientUpdate, BackendPatientPage,
     BackendFormCreate, BackendSymptomCreate, BackendMedicationCreate,
     # Adapter functions
     doctor_to_backend, patient_to_backend, symptom_to_backend,
@@ -23,6 +23,10 @@ from models.domain import (
 from utils.config import config
 
 
+# Record types reported by get_stats
+STATS_KEYS = ("doctors", "patients", "forms", "symptoms", "medications")
+
+
 class APIError(Exception):
     """Custom exception for API errors."""
     
@@ -63,6 +67,7 @@ class HTTPAPIClient:
                 url=url,
                 json=data,
                 params=params,
+                headers=self._actor_headers(),
                 timeout=self.timeout
             )
             
@@ -83,10 +88,28 @@ class HTTPAPIClient:
         except requests.exceptions.RequestException as e:
             raise APIError(f"Network error: {str(e)}")
     
+    def _actor_headers(self) -> Dict[str, str]:
+        """Identify the signed-in doctor to the backend's audit log."""
+        # Imported lazily: the client is shared by every Streamlit session
+        from utils.state import get_current_doctor
+        try:
+            return {'X-Actor-Id': get_current_doctor().id}
+        except Exception:
+            # Outside a Streamlit script run there is no session to read
+            return {}
+    
     def _generate_id(self) -> str:
         """Generate a unique ID for frontend use."""
         return str(uuid.uuid4())
     
+    def _is_backend_id(self, value: Optional[str]) -> bool:
+        """Check whether an ID is a backend UUID rather than a demo placeholder."""
+        try:
+            uuid.UUID(str(value))
+            return True
+        except ValueError:
+            return False
+    
     # Doctor operations
     def get_doctor(self, doctor_id: str) -> Optional[Doctor]:
         """Get a doctor by ID."""
@@ -144,8 +167,12 @@ class HTTPAPIClient:
             raise
     
     # Patient operations
-    def create_patient(self, request: CreatePatientRequest) -> Patient:
-        """Create a new patient."""
+    def create_patient(
+        self,
+        request: CreatePatientRequest,
+        doctor_id: Optional[str] = None
+    ) -> Patient:
+        """Create a new patient, adding them to the doctor's roster if given."""
         # Convert frontend request to backend format
         backend_request = BackendPatientCreate(
             full_name=request.name,
@@ -155,7 +182,8 @@ class HTTPAPIClient:
             email=request.email
         )
         
-        response = self._make_request('POST', '/patients/', backend_request.dict())
+        params = {'doctor_id': doctor_id} if self._is_backend_id(doctor_id) else None
+        response = self._make_request('POST', '/patients/', backend_request.dict(), params)
         backend_patient = BackendPatient(**response.json())
         return backend_patient_to_frontend(backend_patient)
     
@@ -191,6 +219,33 @@ class HTTPAPIClient:
             # If backend fails, return empty list
             return []
     
+    def list_doctor_patients(
+        self,
+        doctor_id: str,
+        search: Optional[str] = None
+    ) -> List[Patient]:
+        """List the patients on a doctor's roster, optionally filtered by search term."""
+        # The demo doctor has no backend record, so it sees every patient
+        if not self._is_backend_id(doctor_id):
+            return self.list_patients(search=search)
+        
+        patients = []
+        params = {'limit': config.ROSTER_PAGE_SIZE}
+        if search:
+            params['search'] = search
+        
+        try:
+            while True:
+                response = self._make_request('GET', f'/doctors/{doctor_id}/patients', params=params)
+                page = BackendPatientPage(**response.json())
+                patients.extend(backend_patient_to_frontend(p) for p in page.items)
+                if page.next_cursor is None:
+                    return patients
+                params['after'] = page.next_cursor
+        except APIError:
+            # If backend fails, return empty list
+            return []
+    
     def update_patient(self, patient_id: str, **fields) -> Optional[Patient]:
         """Update a patient."""
         update_data = {}
@@ -344,14 +399,14 @@ class HTTPAPIClient:
     
     # Utility methods
     def get_stats(self) -> Dict[str, int]:
-        """Get storage statistics (not applicable for HTTP client)."""
-        return {
-            "doctors": 0,
-            "patients": 0,
-            "forms": 0,
-            "symptoms": 0,
-            "medications": 0
-        }
+        """Get record counts from the backend's O(1) statistics endpoint."""
+        try:
+            response = self._make_request('GET', '/stats', params={'mode': config.STATS_MODE})
+            stats = response.json()
+            return {key: stats.get(key, 0) for key in STATS_KEYS}
+        except APIError:
+            # If backend fails, return zero counts
+            return {key: 0 for key in STATS_KEYS}
     
     def clear_all_data(self):
         """Clear all data (not applicable for HTTP client)."""
@@ -368,6 +423,7 @@ class MockAPIClient:
         self._forms: Dict[str, Form] = {}
         self._symptoms: Dict[str, Symptom] = {}
         self._medications: Dict[str, Medication] = {}
+        self._rosters: Dict[str, set] = {}
         
         # Initialize with default doctor
         self._initialize_default_data()
@@ -419,8 +475,12 @@ class MockAPIClient:
         return False
     
     # Patient operations
-    def create_patient(self, request: CreatePatientRequest) -> Patient:
-        """Create a new patient."""
+    def create_patient(
+        self,
+        request: CreatePatientRequest,
+        doctor_id: Optional[str] = None
+    ) -> Patient:
+        """Create a new patient, adding them to the doctor's roster if given."""
         patient = Patient(
             id=self._generate_id(),
             name=request.name,
@@ -428,6 +488,8 @@ class MockAPIClient:
             date_of_birth=request.date_of_birth
         )
         self._patients[patient.id] = patient
+        if doctor_id:
+            self._rosters.setdefault(doctor_id, set()).add(patient.id)
         return patient
     
     def get_patient(self, patient_id: str) -> Optional[Patient]:
@@ -448,6 +510,15 @@ class MockAPIClient:
         
         return patients
     
+    def list_doctor_patients(
+        self,
+        doctor_id: str,
+        search: Optional[str] = None
+    ) -> List[Patient]:
+        """List the patients on a doctor's roster, optionally filtered by search term."""
+        roster = self._rosters.get(doctor_id, set())
+        return [p for p in self.list_patients(search=search) if p.id in roster]
+    
     def update_patient(self, patient_id: str, **fields) -> Optional[Patient]:
         """Update a patient."""
         if patient_id not in self._patients:
@@ -478,6 +549,7 @@ class MockAPIClient:
             status=FormStatus.DRAFT
         )
         self._forms[form.id] = form
+        self._rosters.setdefault(request.doctor_id, set()).add(request.patient_id)
         return form
     
     def get_form(self, form_id: str) -> Optional[Form]:
@@ -645,6 +717,7 @@ class MockAPIClient:
         self._forms.clear()
         self._symptoms.clear()
         self._medications.clear()
+        self._rosters.clear()
         self._initialize_default_data()
 
 
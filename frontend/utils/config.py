@@ -28,12 +28,16 @@ class Config:
     
     # UI configuration
     PATIENTS_PER_PAGE: int = int(os.getenv("PATIENTS_PER_PAGE", "12"))
+    ROSTER_PAGE_SIZE: int = int(os.getenv("ROSTER_PAGE_SIZE", "100"))
     TRANSCRIPT_MAX_LINES: int = int(os.getenv("TRANSCRIPT_MAX_LINES", "50"))
     
     # HTTP client configuration
     HTTP_TIMEOUT: int = int(os.getenv("HTTP_TIMEOUT", "30"))
     HTTP_RETRY_ATTEMPTS: int = int(os.getenv("HTTP_RETRY_ATTEMPTS", "3"))
     
+    # Dashboard statistics: "exact" (trigger-maintained) or "estimated" (planner)
+    STATS_MODE: str = os.getenv("STATS_MODE", "exact")
+    
     # Development settings
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
     MOCK_API: bool = os.getenv("MOCK_API", "false").lower() == "true"
@@ -0,0 +1,13 @@
+import pytest
+
+import agent.config as conf
+from agent.providers import ProviderRegistry
+
+
+@pytest.fixture(autouse=True)
+def offline_providers(monkeypatch):
+    # Tests never reach a real provider or need its API key; the ones that
+    # call a model patch conf.CLIENTS with their own fakes
+    monkeypatch.setattr(conf, "PROVIDERS", ProviderRegistry(
+        [conf.DEFAULT_PROVIDERS["simulated"]], schedulers=conf.SCHEDULERS, telemetry=conf.TELEMETRY,
+    ))
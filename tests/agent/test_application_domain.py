@@ -58,3 +58,69 @@ class TestPatientFormBuilder:
         assert result[ii.SYMPS] is True
         assert result[ii.PII] is False
 
+
+    async def test_extractions_run_concurrently(self, builder, monkeypatch):
+        import asyncio
+        import time
+
+        async def slow_get_info(intent, text):
+            await asyncio.sleep(0.1)
+            return intent
+
+        builder._contains = AsyncMock(return_value={ii.PII: True, ii.MEDS: True, ii.SYMPS: True})
+        monkeypatch.setattr(builder, "get_info", slow_get_info)
+        monkeypatch.setattr(schemas, "PatientSchema", dict)
+
+        started = time.perf_counter()
+        form = await builder.get_patient_form("text")
+        assert time.perf_counter() - started < 0.25
+        assert form == {"pii": ii.PII, "medication": ii.MEDS, "symptoms": ii.SYMPS}
+
+    async def test_speculative_drops_irrelevant_failures(self, monkeypatch):
+        from agent.errors import error
+
+        builder = PatientFormBuilder(speculative=True)
+
+        async def get_info(intent, text):
+            if intent == ii.PII:
+                raise error.LLMError("no personal information found")
+            return intent
+
+        builder._contains = AsyncMock(return_value={ii.PII: False, ii.MEDS: True, ii.SYMPS: False})
+        monkeypatch.setattr(builder, "get_info", get_info)
+        monkeypatch.setattr(schemas, "PatientSchema", dict)
+
+        form = await builder.get_patient_form("text")
+        assert form == {"pii": None, "medication": ii.MEDS, "symptoms": None}
+
+    async def test_single_call_uses_combined_schema(self, monkeypatch):
+        from agent.form_agent.schemas import extractionStrategy
+
+        form = schemas.PatientSchema(
+            pii=schemas.PatientPIISchema(
+                name=None, email=None, date_of_birth=None,
+                error=schemas.ErrorMixin(error=True, error_message="No PII"),
+            ),
+            symptoms=schemas.ListSymptomSchema(
+                symps=[schemas.SymptomSchema(name="cough", duration=7, intensity=2, recurrence=False)],
+                error=None,
+            ),
+        )
+        query = AsyncMock(return_value=form)
+        monkeypatch.setattr("agent.form_agent.utils.query_llm", query)
+
+        builder = PatientFormBuilder(strategy=extractionStrategy.SINGLE)
+        result = await builder.get_patient_form("I've had a cough for a week")
+
+        query.assert_awaited_once()
+        assert query.await_args.args[1] is schemas.PatientSchema
+        assert result.pii is None
+        assert result.symptoms.symps[0].name == "cough"
+
+    async def test_auto_strategy_depends_on_length(self):
+        from agent.form_agent.schemas import extractionStrategy
+
+        builder = PatientFormBuilder(strategy=extractionStrategy.AUTO, single_call_max_chars=20)
+        assert builder.resolve_strategy("short") == extractionStrategy.SINGLE
+        assert builder.resolve_strategy("x" * 21) == extractionStrategy.MULTI
+        assert builder.resolve_strategy("short", extractionStrategy.MULTI) == extractionStrategy.MULTI
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import pytest
+
+import httpx
+
+import agent.api_gateway as gateway
+import agent.batch as batch
+import agent.form_agent.schemas as schemas
+from agent.batch import BatchItem, extract_batch
+from agent.ratelimit import TokenBucket
+
+
+class FakeBuilder:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.running = 0
+        self.peak = 0
+
+    async def get_patient_form(self, text, strategy=None):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if text in self.fail:
+            raise RuntimeError("No model managed to get a validated response")
+        return schemas.PatientSchema(pii=schemas.PatientPIISchema(name=text, email=None, date_of_birth=None, error=None))
+
+
+@pytest.mark.asyncio
+async def test_batch_is_bounded_and_reports_failures():
+    builder = FakeBuilder(fail={"t3"})
+    items = [BatchItem(id=str(i), text=f"t{i}") for i in range(10)]
+
+    results = [result async for result in extract_batch(builder, items, concurrency=3)]
+
+    assert builder.peak == 3
+    assert sorted(r["id"] for r in results) == [str(i) for i in range(10)]
+    assert [r["error"] for r in results if "error" in r] == ["No model managed to get a validated response"]
+
+
+@pytest.mark.asyncio
+async def test_cancelling_with_a_full_queue_stops_promptly():
+    class StuckBuilder:
+        async def get_patient_form(self, text, strategy=None):
+            await asyncio.Event().wait()
+
+    items = (BatchItem(id=str(i), text=f"t{i}") for i in range(100))
+    consumer = asyncio.create_task(anext(extract_batch(StuckBuilder(), items, concurrency=2)))
+    # Both workers are busy and the producer waits on the full queue
+    await asyncio.sleep(0.05)
+
+    consumer.cancel()
+    done, _ = await asyncio.wait([consumer], timeout=1)
+
+    assert consumer in done and consumer.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_cli_run_resumes_from_output(tmp_path, monkeypatch):
+    source = tmp_path / "notes.jsonl"
+    source.write_text("".join(json.dumps({"id": str(i), "text": f"t{i}"}) + "\n" for i in range(4)))
+    output = tmp_path / "forms.ndjson"
+    # An earlier run finished "0", failed "1" and was cut off mid-line
+    output.write_text(json.dumps({"id": "0", "form": {}}) + "\n" + json.dumps({"id": "1", "error": "x"}) + '\n{"id": "2", "fo')
+
+    builder = FakeBuilder()
+    monkeypatch.setattr(batch, "PatientFormBuilder", lambda: builder)
+
+    succeeded, failed = await batch.run(source, output, concurrency=2, strategy=None)
+
+    assert (succeeded, failed) == (3, 0)
+    assert batch.completed_ids(output) == {"0", "1", "2", "3"}
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_streams_ndjson(monkeypatch):
+    monkeypatch.setattr(gateway, "builder", FakeBuilder())
+    transport = httpx.ASGITransport(app=gateway.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/get_forms/batch", json=[{"id": "a", "text": "Alice"}, {"id": "b", "text": "Bob"}])
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert {line["id"]: line["form"]["pii"]["name"] for line in lines} == {"a": "Alice", "b": "Bob"}
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_out_requests():
+    bucket = TokenBucket(rate=100, capacity=1)
+    loop = asyncio.get_running_loop()
+
+    started = loop.time()
+    for _ in range(4):
+        await bucket.acquire()
+
+    assert loop.time() - started >= 0.025
+    assert bucket.waits >= 3
@@ -0,0 +1,75 @@
+import pytest
+from unittest.mock import AsyncMock
+
+import agent.form_agent.schemas as schemas
+import agent.utils as llm
+from agent.cache import LLMCache, bypass
+
+RESPONSE = schemas.RecommendationSchema(recommendation="Rest and fluids", error=None)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = LLMCache(tmp_path / "cache.sqlite3", ttl=60, max_entries=2)
+    monkeypatch.setattr(llm.conf, "LLM_CACHE", cache)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_identical_prompt_is_served_from_cache(cache, monkeypatch):
+    call = AsyncMock(return_value=RESPONSE)
+    monkeypatch.setattr(llm, "LLM_CALL_FALLABLE", call)
+
+    first = await llm.query_llm("Patient has a cold", schemas.RecommendationSchema)
+    second = await llm.query_llm("Patient has a cold", schemas.RecommendationSchema)
+
+    call.assert_awaited_once()
+    assert second == first
+    stats = await cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_bypass_reaches_the_provider(cache, monkeypatch):
+    call = AsyncMock(return_value=RESPONSE)
+    monkeypatch.setattr(llm, "LLM_CALL_FALLABLE", call)
+
+    await llm.query_llm("Patient has a cold", schemas.RecommendationSchema)
+    with bypass():
+        await llm.query_llm("Patient has a cold", schemas.RecommendationSchema)
+
+    assert call.await_count == 2
+    assert (await cache.stats())["bypassed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_misses(cache):
+    cache.ttl = -1
+    await cache.put("prompt", schemas.RecommendationSchema, "model", RESPONSE)
+
+    assert await cache.get("prompt", schemas.RecommendationSchema, "model") is None
+    assert (await cache.stats())["expired"] == 1
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted(cache):
+    for prompt in ("a", "b"):
+        await cache.put(prompt, schemas.RecommendationSchema, "model", RESPONSE)
+    await cache.get("a", schemas.RecommendationSchema, "model")
+    await cache.put("c", schemas.RecommendationSchema, "model", RESPONSE)
+
+    assert await cache.get("a", schemas.RecommendationSchema, "model") is not None
+    assert await cache.get("b", schemas.RecommendationSchema, "model") is None
+    assert (await cache.stats())["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_one_schema(cache):
+    form = schemas.PatientSchema()
+    await cache.put("prompt", schemas.RecommendationSchema, "model", RESPONSE)
+    await cache.put("prompt", schemas.PatientSchema, "model", form)
+
+    assert await cache.invalidate(schemas.RecommendationSchema) == 1
+    assert await cache.get("prompt", schemas.RecommendationSchema, "model") is None
+    assert await cache.get("prompt", schemas.PatientSchema, "model") == form
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+
+import agent.form_agent.schemas as schemas
+import agent.utils as llm
+from agent.form_agent.utils import PatientFormBuilder
+from agent.schemas import ClientBase
+from agent.simulated import SimulatedProvider
+
+
+def med(name, strength=None, frequency=None):
+    return schemas.MedicationSchema(name=name, strength=strength, frequency=frequency, duration=None)
+
+
+def form(*meds):
+    return schemas.PatientSchema(medication=schemas.ListMedicationSchema(meds=list(meds), error=None))
+
+
+def chunked_builder(**kwargs) -> PatientFormBuilder:
+    return PatientFormBuilder(chunk_min_chars=100, chunk_chars=80, chunk_overlap_chars=0, **kwargs)
+
+
+# Splits into one chunk per part
+TRANSCRIPT = "First part of the talk. " * 3 + "Second part of the talk. " * 3 + "Third part of the talk."
+ORDER = {"First": 0, "Second": 1, "Third": 2}
+
+
+def test_only_long_transcripts_are_chunked():
+    builder = chunked_builder()
+
+    assert builder.chunks("short") == ["short"]
+    assert len(builder.chunks(TRANSCRIPT)) == 3
+    assert PatientFormBuilder(chunk_min_chars=0).chunks(TRANSCRIPT) == [TRANSCRIPT]
+
+
+@pytest.mark.asyncio
+async def test_chunk_forms_are_merged_in_transcript_order(monkeypatch):
+    builder = chunked_builder(chunk_concurrency=2)
+    running = peak = 0
+    extracted = {
+        "First": form(med("Metformin", strength=500), med("Ibuprofen")),
+        "Second": form(med("metformin ", frequency=2)),
+        "Third": form(med("Metformin", strength=850)),
+    }
+
+    async def extract_form(text, strategy=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        # Chunks finish out of order
+        await asyncio.sleep(0.03 if text.startswith("First") else 0.01)
+        running -= 1
+        return extracted[text.split()[0]]
+
+    monkeypatch.setattr(builder, "_extract_form", extract_form)
+
+    result = await builder.get_patient_form(TRANSCRIPT)
+
+    assert peak == 2
+    assert [(m.name, m.strength, m.frequency) for m in result.medication.meds] == [
+        ("Metformin", 850, 2), ("Ibuprofen", None, None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_a_failed_chunk_fails_the_form(monkeypatch):
+    builder = chunked_builder()
+    cancelled = []
+
+    async def extract_form(text, strategy=None):
+        if text.startswith("Second"):
+            raise RuntimeError("provider down")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(text)
+            raise
+
+    monkeypatch.setattr(builder, "_extract_form", extract_form)
+
+    with pytest.raises(RuntimeError, match="provider down"):
+        await builder.get_patient_form(TRANSCRIPT)
+    assert len(cancelled) == 2
+
+
+@pytest.mark.asyncio
+async def test_long_transcripts_stream_the_merged_form(monkeypatch):
+    builder = chunked_builder()
+
+    async def extract_form(text, strategy=None):
+        await asyncio.sleep(0.01 * ORDER[text.split()[0]])
+        return form(med(text.split()[0]))
+
+    monkeypatch.setattr(builder, "_extract_form", extract_form)
+
+    events = [event async for event in builder.stream_patient_form(TRANSCRIPT)]
+
+    assert [len(event["medication"]["meds"]) for event in events[:-1]] == [1, 2, 3]
+    assert [m.name for m in events[-1].medication.meds] == ["First", "Second", "Third"]
+
+
+@pytest.mark.asyncio
+async def test_chunked_pipeline_runs_on_simulated_provider(monkeypatch):
+    provider = SimulatedProvider(latency_median=0.001, seed=0)
+    monkeypatch.setattr(llm.conf, "CLIENTS", [ClientBase(client=provider.client, model="simulated")])
+
+    result = await chunked_builder().get_patient_form("I take Metformin and have a headache. " * 6)
+
+    assert isinstance(result, schemas.PatientSchema)
+    assert provider.calls > 4
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+
+import agent.form_agent.utils as form_utils
+from agent.form_agent.classifier import IntentClassifier, split_sentences
+from agent.form_agent.schemas import infoIntent as ii
+from agent.form_agent.utils import PatientFormBuilder
+
+# One dimension per intent: texts using these words sit close to its prototypes
+VOCABULARY = [
+    ("name", "old", "born", "email", "aged"),
+    ("take", "taking", "takes", "prescribed", "inhaler", "tablets", "pill", "ibuprofen"),
+    ("headache", "chest", "tired", "cough", "nauseous", "hurts"),
+]
+
+
+async def bag_of_words(texts: list[str]) -> np.ndarray:
+    rows = []
+    for text in texts:
+        words = text.lower().replace(",", " ").replace(".", " ").split()
+        vector = np.array([float(any(word in words for word in group)) for group in VOCABULARY]) + 1e-3
+        rows.append(vector / np.linalg.norm(vector))
+    return np.stack(rows)
+
+
+async def unavailable(texts: list[str]) -> np.ndarray:
+    raise ImportError("No module named 'sentence_transformers'")
+
+
+def test_split_sentences():
+    assert split_sentences("I'm tired. My head hurts!\nI take Ibuprofen") == [
+        "I'm tired.", "My head hurts!", "I take Ibuprofen",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_confident_scores_classify_locally():
+    classifier = IntentClassifier(bag_of_words)
+
+    detected = await classifier.classify("My name is John. I have a headache.")
+
+    assert detected == {ii.PII: True, ii.MEDS: False, ii.SYMPS: True}
+    assert classifier.stats()["classified"] == 1
+
+
+@pytest.mark.asyncio
+async def test_uncertain_scores_escalate():
+    # Every score sits between the thresholds
+    classifier = IntentClassifier(bag_of_words, present=0.99, absent=0.0)
+
+    assert await classifier.classify("I have a headache.") is None
+    assert classifier.escalated == 1
+
+
+@pytest.mark.asyncio
+async def test_keywords_replace_missing_model():
+    classifier = IntentClassifier(unavailable)
+
+    assert await classifier.classify("I take 500 mg of Metformin for the pain") == {
+        ii.PII: False, ii.MEDS: True, ii.SYMPS: True,
+    }
+    assert await classifier.classify("Nothing relevant here") is None
+    assert classifier.stats() == {
+        "embeddings_available": False, "classified": 1, "keyword_fallbacks": 2, "escalated": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_builder_skips_llm_classification(monkeypatch):
+    query = AsyncMock()
+    monkeypatch.setattr(form_utils, "query_llm", query)
+    builder = PatientFormBuilder(classifier=IntentClassifier(bag_of_words))
+
+    detected = await builder._contains("I take ibuprofen.")
+
+    assert detected == {ii.PII: False, ii.MEDS: True, ii.SYMPS: False}
+    query.assert_not_called()
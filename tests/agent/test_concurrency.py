@@ -0,0 +1,76 @@
+import asyncio
+import time
+import pytest
+
+import httpx
+from instructor import AsyncInstructor
+
+import agent.form_agent.schemas as schemas
+import agent.utils as llm
+from agent.api_gateway import app
+from agent.schemas import ClientBase
+
+LATENCY = 0.2
+REQUESTS = 10
+
+
+async def slow_create(response_model, messages, **kwargs):
+    # Stands in for a provider round trip without blocking the event loop
+    await asyncio.sleep(LATENCY)
+    if response_model is schemas.InfoIntentSchema:
+        return schemas.InfoIntentSchema(intents=["Symptoms"], error=None)
+    return schemas.ListSymptomSchema(
+        symps=[schemas.SymptomSchema(name="headache", duration=3, intensity=2, recurrence=False)],
+        error=None,
+    )
+
+
+@pytest.fixture
+def slow_client(monkeypatch):
+    client = ClientBase(
+        client=AsyncInstructor(client=None, create=slow_create),
+        model="fake-model",
+        max_concurrency=REQUESTS,
+        timeout=5,
+    )
+    monkeypatch.setattr(llm.conf, "CLIENTS", [client])
+    return client
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_finish_in_about_the_time_of_one(slow_client):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        started = time.perf_counter()
+        response = await client.post("/get_form/", json="I have had a headache for 3 days")
+        single = time.perf_counter() - started
+        assert response.status_code == 200
+        assert response.json()["symptoms"]["symps"][0]["name"] == "headache"
+
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/get_form/", json="I have had a headache for 3 days")
+            for _ in range(REQUESTS)
+        ])
+        concurrent = time.perf_counter() - started
+
+    assert all(r.status_code == 200 for r in responses)
+    # Serialised on the event loop this would take REQUESTS times as long
+    assert concurrent < 2 * single
+
+
+@pytest.mark.asyncio
+async def test_call_times_out_and_falls_through(monkeypatch):
+    async def hung_create(response_model, messages, **kwargs):
+        await asyncio.sleep(10)
+
+    async def fast_create(response_model, messages, **kwargs):
+        return schemas.RecommendationSchema(recommendation="Rest", error=None)
+
+    monkeypatch.setattr(llm.conf, "CLIENTS", [
+        ClientBase(client=AsyncInstructor(client=None, create=hung_create), model="hung", timeout=0.05),
+        ClientBase(client=AsyncInstructor(client=None, create=fast_create), model="fast", timeout=1),
+    ])
+
+    result = await llm.LLM_CALL_FALLABLE(schemas.RecommendationSchema, "Hi there!")
+    assert result.recommendation == "Rest"
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 from pydantic import BaseModel
@@ -46,6 +47,8 @@ async def test_llm_call_fallable_success(monkeypatch):
     mock_conf_client = MagicMock()
     mock_conf_client.model = "gpt-4o-mini"
     mock_conf_client.client = mock_client
+    mock_conf_client.timeout = 5
+    mock_conf_client.semaphore = asyncio.Semaphore(1)
 
     monkeypatch.setattr(llm.conf, "CLIENTS", [mock_conf_client])
 
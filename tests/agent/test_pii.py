@@ -0,0 +1,90 @@
+from datetime import date
+from unittest.mock import AsyncMock
+import pytest
+
+import agent.form_agent.schemas as schemas
+import agent.form_agent.utils as form_utils
+from agent.form_agent.pii import PIIExtractor, parse_dates
+from agent.form_agent.schemas import infoIntent as ii
+from agent.form_agent.utils import PatientFormBuilder
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Born 1980-03-14", date(1980, 3, 14)),
+    ("Born 14/03/1980", date(1980, 3, 14)),
+    ("Born 14.03.80", date(1980, 3, 14)),
+    ("Born on the 14th of March, 1980", date(1980, 3, 14)),
+    ("Born Mar 14th 1980", date(1980, 3, 14)),
+    ("Born Sept 5, 2001", date(2001, 9, 5)),
+])
+def test_date_formats(text, expected):
+    assert parse_dates(text) == ([expected], False)
+
+
+def test_numeric_dates_follow_day_first():
+    assert parse_dates("03/04/1980") == ([date(1980, 4, 3)], True)
+    assert parse_dates("03/04/1980", day_first=False) == ([date(1980, 3, 4)], True)
+    # A day above 12 settles the order either way
+    assert parse_dates("03/14/1980") == ([date(1980, 3, 14)], False)
+
+
+def test_extracts_every_field():
+    local = PIIExtractor().extract(
+        "Hi, my name is Maria de la Cruz. I was born on 3 March 1975 and my email is Maria.Cruz@example.com."
+    )
+
+    assert local.confident
+    assert (local.pii.name, local.pii.email, local.pii.date_of_birth) == (
+        "Maria de la Cruz", "maria.cruz@example.com", date(1975, 3, 3),
+    )
+
+
+def test_weak_cues_defer_to_a_stated_name():
+    local = PIIExtractor().extract("My name is Nikos Papadopoulos and I am Greek.")
+
+    assert local.confident
+    assert local.pii.name == "Nikos Papadopoulos"
+
+
+def test_dates_outside_birth_sentences_are_ignored():
+    local = PIIExtractor().extract("My name is John Smith. I started Metformin on 01/02/2020.")
+
+    assert local.confident
+    assert (local.pii.name, local.pii.date_of_birth) == ("John Smith", None)
+
+
+@pytest.mark.parametrize("text, reason", [
+    ("my name is john and I have a headache", "name:unreadable"),
+    ("My name is Anna. Call me Bob.", "name:conflict"),
+    ("Call me Ann, reach me at a@example.com or b@example.com", "email:conflict"),
+    ("Call me Ann, I was born 03/04/1980", "date_of_birth:ambiguous"),
+    ("Call me Ann, my birthday is in spring", "date_of_birth:unreadable"),
+    # Capitalised words after "I am" are often not names
+    ("I am 45 years old and I am Greek.", "name:weak_cue"),
+    ("I am Allergic to Penicillin.", "name:weak_cue"),
+    ("I'm Fine thanks. My email is a@b.com", "name:weak_cue"),
+    ("Hi, I'm John Smith", "name:weak_cue"),
+    ("I have a headache", "none_found"),
+])
+def test_uncertain_results(text, reason):
+    local = PIIExtractor().extract(text)
+
+    assert not local.confident
+    assert reason in local.uncertain
+
+
+@pytest.mark.asyncio
+async def test_llm_only_runs_when_unsure(monkeypatch):
+    llm_pii = schemas.PatientPIISchema(name="John", email=None, date_of_birth=None, error=None)
+    query = AsyncMock(return_value=llm_pii)
+    monkeypatch.setattr(form_utils, "query_llm", query)
+    extractor = PIIExtractor()
+    builder = PatientFormBuilder(pii_extractor=extractor)
+
+    local = await builder.get_info(ii.PII, "Hello, my name is John Smith, born 14 March 1980.")
+    assert (local.name, local.date_of_birth) == ("John Smith", date(1980, 3, 14))
+    query.assert_not_awaited()
+
+    assert await builder.get_info(ii.PII, "my name is john smith") is llm_pii
+    query.assert_awaited_once()
+    assert extractor.stats() == {"extracted": 1, "escalated": 1}
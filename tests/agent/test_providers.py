@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+import pytest
+
+from agent.providers import ProviderConfig, ProviderRegistry, load_providers
+from agent.ratelimit import Schedulers
+
+
+def test_importing_the_agent_loads_no_provider_sdk():
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, agent.api_gateway; print('instructor' in sys.modules, 'openai' in sys.modules)"],
+        capture_output=True, text=True, env=env,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["False", "False"]
+
+
+def test_clients_are_built_on_first_use():
+    registry = ProviderRegistry(load_providers(
+        '[{"name": "fake", "kind": "simulated", "models": ["first", "second"], "timeout": 5}]', None,
+    ))
+    assert registry._instances == {}
+
+    clients = registry.clients()
+
+    assert [client.model for client in clients] == ["first", "second"]
+    assert clients[0].client is clients[1].client
+    assert clients[0].timeout == 5
+    assert registry.clients() is clients
+
+
+def test_model_limits_reach_the_schedulers():
+    schedulers = Schedulers({"second": (10, 0)})
+    registry = ProviderRegistry([
+        ProviderConfig(name="fake", kind="simulated", models=[{"name": "first", "rpm": 60}, {"name": "second", "rpm": 60}]),
+    ], schedulers=schedulers)
+
+    registry.clients()
+
+    # LLM_MODEL_LIMITS entries win over the provider config
+    assert schedulers.limits == {"first": (60, 0), "second": (10, 0)}
+
+
+def test_factory_by_import_path():
+    registry = ProviderRegistry([ProviderConfig(name="custom", kind="agent.providers:_simulated", models=["m"])])
+
+    assert registry.clients()[0].model == "m"
+
+
+def test_missing_api_key_fails_on_first_use(monkeypatch):
+    monkeypatch.delenv("EXAMPLE_API_KEY", raising=False)
+    registry = ProviderRegistry([ProviderConfig(name="example", api_key_env="EXAMPLE_API_KEY", models=["m"])])
+
+    with pytest.raises(ValueError, match="EXAMPLE_API_KEY"):
+        registry.clients()
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+
+import agent.form_agent.schemas as schemas
+import agent.utils as llm
+from agent.ratelimit import Priority, Scheduler, Schedulers, parse_limits, priority
+from agent.schemas import ClientBase
+from agent.simulated import SimulatedProvider
+
+
+@pytest.mark.asyncio
+async def test_unlimited_scheduler_never_waits():
+    scheduler = Scheduler()
+
+    assert await scheduler.acquire(10_000) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_calls_within_budget_go_straight_through():
+    scheduler = Scheduler(rpm=600, burst_seconds=1)
+
+    waits = [await scheduler.acquire() for _ in range(10)]
+
+    assert waits == [0.0] * 10
+    assert scheduler.snapshot()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_interactive_calls_overtake_queued_background_calls():
+    # One request per 10ms, with no burst left after the first
+    scheduler = Scheduler(rpm=6000, burst_seconds=0.01)
+    await scheduler.acquire()
+    order = []
+
+    async def call(name: str, level: Priority):
+        with priority(level):
+            await scheduler.acquire()
+        order.append(name)
+
+    async with asyncio.TaskGroup() as tg:
+        for i in range(3):
+            tg.create_task(call(f"batch-{i}", Priority.BACKGROUND))
+        await asyncio.sleep(0)
+        tg.create_task(call("live", Priority.INTERACTIVE))
+
+    assert order == ["live", "batch-0", "batch-1", "batch-2"]
+    waits = scheduler.snapshot()["wait_seconds"]
+    assert waits["background"]["max"] > waits["interactive"]["max"] > 0
+
+
+@pytest.mark.asyncio
+async def test_token_budget_is_settled_with_real_usage():
+    scheduler = Scheduler(tpm=6000, burst_seconds=1)
+
+    await scheduler.acquire(10)
+    scheduler.settle(10, 100)
+
+    assert scheduler.tokens.tokens == pytest.approx(0, abs=1)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = Scheduler(rpm=60, burst_seconds=1)
+    await scheduler.acquire()
+
+    waiter = asyncio.create_task(scheduler.acquire())
+    await asyncio.sleep(0)
+    assert scheduler.snapshot()["queued"] == 1
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+    assert scheduler.snapshot()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_llm_calls_wait_for_the_model_limits(monkeypatch):
+    provider = SimulatedProvider(latency_median=0, seed=0)
+    schedulers = Schedulers(parse_limits("simulated=6000:600000"), burst_seconds=0.01)
+    monkeypatch.setattr(llm.conf, "SCHEDULERS", schedulers)
+    monkeypatch.setattr(llm.conf, "CLIENTS", [ClientBase(client=provider.client, model="simulated")])
+
+    await asyncio.gather(*(llm.LLM_CALL_FALLABLE(schemas.RecommendationSchema, "Hi") for _ in range(5)))
+
+    assert provider.calls == 5
+    assert schedulers.snapshot()["simulated"]["wait_seconds"]["standard"]["max"] > 0
+
+
+def test_parse_limits():
+    assert parse_limits("gpt-4o-mini=500:200000, gpt-3.5-turbo=3500") == {
+        "gpt-4o-mini": (500.0, 200000.0),
+        "gpt-3.5-turbo": (3500.0, 0.0),
+    }
@@ -0,0 +1,103 @@
+import json
+import pytest
+
+import httpx
+from instructor import from_openai
+from openai import AsyncOpenAI
+from pydantic import ValidationError
+
+import agent.form_agent.schemas as schemas
+import agent.utils as llm
+from agent.form_agent.repair import repair_context
+from agent.schemas import ClientBase
+from agent.telemetry import CallTelemetry
+
+
+@pytest.mark.parametrize("field, value, repaired", [
+    ("strength", "500mg", 500),
+    ("strength", "1,000 mg", 1000),
+    ("strength", "0.5 g", 500),
+    ("frequency", "twice daily", 2),
+    ("frequency", "3 times a day", 3),
+    ("duration", "2 weeks", 14),
+    ("duration", 0, None),
+    ("strength", -10, None),
+    ("strength", "0,5 g", 500),
+    ("strength", "1,000 mcg", 1),
+    ("strength", "1,500 mcg", None),
+    # Doses the field cannot hold exactly are dropped, never rounded
+    ("strength", "25 mcg", None),
+    ("strength", "50mcg", None),
+    ("strength", "2.5 mg", None),
+    ("strength", "1,5 mg", None),
+    ("strength", 2.5, None),
+])
+def test_medication_values_are_repaired(field, value, repaired):
+    data = {"name": "Metformin", "strength": 500, "frequency": 1, "duration": 7, field: value}
+    context = repair_context()
+
+    med = schemas.MedicationSchema.model_validate(data, context=context)
+
+    assert getattr(med, field) == repaired
+    assert [(r.field, r.original, r.value) for r in context["repairs"]] == [(field, value, repaired)]
+
+
+@pytest.mark.parametrize("value, repaired", [("4", 4), (7, 5), (0, 1), ("7/10", 4), ("severe", 4)])
+def test_symptom_intensity_is_repaired(value, repaired):
+    context = repair_context()
+
+    symptom = schemas.SymptomSchema.model_validate(
+        {"name": "headache", "duration": "3 days", "intensity": value, "recurrence": None}, context=context,
+    )
+
+    assert (symptom.duration, symptom.intensity) == (3, repaired)
+
+
+def test_valid_and_irreparable_values():
+    context = repair_context()
+    schemas.MedicationSchema.model_validate(
+        {"name": "Metformin", "strength": 500, "frequency": "2", "duration": None}, context=context,
+    )
+    assert context["repairs"] == []
+
+    with pytest.raises(ValidationError):
+        schemas.MedicationSchema.model_validate(
+            {"name": "Metformin", "strength": "a lot", "frequency": 1, "duration": 1}, context=repair_context(),
+        )
+
+
+def test_no_repairs_without_context():
+    with pytest.raises(ValidationError):
+        schemas.MedicationSchema.model_validate({"name": "Metformin", "strength": "500mg", "frequency": 1, "duration": 1})
+
+
+@pytest.mark.asyncio
+async def test_repaired_answer_needs_no_second_call(monkeypatch):
+    requests = []
+    arguments = {"meds": [{"name": "Metformin", "strength": "500mg", "frequency": "twice daily", "duration": 0}], "error": None}
+
+    def completion(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={
+            "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {
+                "role": "assistant", "content": None,
+                "tool_calls": [{"id": "call-1", "type": "function", "function": {
+                    "name": "ListMedicationSchema", "arguments": json.dumps(arguments),
+                }}],
+            }}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        })
+
+    client = from_openai(AsyncOpenAI(api_key="sk-test", http_client=httpx.AsyncClient(transport=httpx.MockTransport(completion))))
+    telemetry = CallTelemetry()
+    monkeypatch.setattr(llm.conf, "TELEMETRY", telemetry)
+    monkeypatch.setattr(llm.conf, "CLIENTS", [ClientBase(client=client, model="gpt-4o-mini")])
+
+    result = await llm.LLM_CALL_FALLABLE(schemas.ListMedicationSchema, "I take Metformin")
+
+    assert len(requests) == 1
+    assert (result.meds[0].strength, result.meds[0].frequency, result.meds[0].duration) == (500, 2, None)
+    metrics = telemetry.exposition().decode()
+    assert 'agent_llm_repairs_total{model="gpt-4o-mini",repair="MedicationSchema.strength:coerced"} 1.0' in metrics
+    assert 'agent_llm_repairs_total{model="gpt-4o-mini",repair="MedicationSchema.duration:nulled"} 1.0' in metrics
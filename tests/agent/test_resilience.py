@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+import httpx
+from instructor import AsyncInstructor
+
+import agent.form_agent.schemas as schemas
+import agent.utils as llm
+from agent.resilience import CircuitBreaker, ProviderHealth
+from agent.schemas import ClientBase
+
+ANSWER = schemas.RecommendationSchema(recommendation="Rest", error=None)
+
+
+def make_client(model, create, timeout=1.0):
+    return ClientBase(client=AsyncInstructor(client=None, create=create), model=model, timeout=timeout)
+
+
+@pytest.fixture
+def health(monkeypatch):
+    health = ProviderHealth(failure_threshold=2, reset_timeout=60, min_samples=5)
+    monkeypatch.setattr(llm.conf, "PROVIDER_HEALTH", health)
+    return health
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled(monkeypatch, health):
+    cancelled = asyncio.Event()
+
+    async def slow_create(response_model, messages, **kwargs):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def fast_create(response_model, messages, **kwargs):
+        return ANSWER
+
+    for _ in range(5):
+        health.latency("primary").record(0.01)
+    monkeypatch.setattr(llm.conf, "CLIENTS", [make_client("primary", slow_create), make_client("backup", fast_create)])
+
+    result = await asyncio.wait_for(llm.LLM_CALL_FALLABLE(schemas.RecommendationSchema, "Hi"), timeout=1)
+
+    assert result == ANSWER
+    assert cancelled.is_set()
+    assert health.hedges == 1
+    assert health.breaker("primary").failures == 0
+
+
+@pytest.mark.asyncio
+async def test_network_errors_fall_through_and_open_the_breaker(monkeypatch, health):
+    calls = []
+
+    async def broken_create(response_model, messages, **kwargs):
+        calls.append("broken")
+        raise httpx.ConnectError("connection refused")
+
+    async def fast_create(response_model, messages, **kwargs):
+        return ANSWER
+
+    monkeypatch.setattr(llm.conf, "CLIENTS", [make_client("broken", broken_create), make_client("backup", fast_create)])
+
+    for _ in range(3):
+        assert await llm.LLM_CALL_FALLABLE(schemas.RecommendationSchema, "Hi") == ANSWER
+
+    # The third request skipped the broken provider entirely
+    assert len(calls) == 2
+    assert health.breaker("broken").state == "open"
+
+
+@pytest.mark.asyncio
+async def test_unexpected_errors_release_the_half_open_trial(monkeypatch):
+    health = ProviderHealth(failure_threshold=1, reset_timeout=0, min_samples=5)
+    monkeypatch.setattr(llm.conf, "PROVIDER_HEALTH", health)
+    breaker = health.breaker("flaky")
+    breaker.record_failure()
+
+    async def create(response_model, messages, **kwargs):
+        raise KeyError("choices")
+
+    async def create_partial(response_model, messages, **kwargs):
+        raise KeyError("choices")
+        yield
+
+    monkeypatch.setattr(llm.conf, "CLIENTS", [make_client("flaky", create)])
+    with pytest.raises(KeyError):
+        await llm.LLM_CALL_FALLABLE(schemas.RecommendationSchema, "Hi")
+    assert breaker.allow() is True
+    breaker.record_cancelled()
+
+    streaming = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create_partial=create_partial)))
+    monkeypatch.setattr(llm.conf, "CLIENTS", [ClientBase(client=streaming, model="flaky")])
+    with pytest.raises(KeyError):
+        async for _ in llm.LLM_STREAM_FALLABLE(schemas.RecommendationSchema, "Hi"):
+            pass
+    assert breaker.allow() is True
+
+
+def test_breaker_half_opens_after_reset_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.state == "half-open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False  # only one trial call at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
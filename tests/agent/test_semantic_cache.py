@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import agent.form_agent.schemas as schemas
+import agent.form_agent.utils as form_utils
+from agent.cache import bypass
+from agent.form_agent.pii import PIIExtractor
+from agent.form_agent.utils import PatientFormBuilder
+from agent.semantic_cache import NumpyIndex, SemanticCache, guard_tokens
+
+VOCABULARY = ["headache", "cough", "days", "fever", "john", "jane"]
+
+
+async def bag_of_words(text: str) -> np.ndarray:
+    # Stands in for a sentence embedding: texts sharing these words are similar
+    words = text.lower().replace(",", " ").split()
+    vector = np.array([float(word in words) for word in VOCABULARY]) + 1e-3
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def semantic():
+    return SemanticCache(NumpyIndex(), bag_of_words, threshold=0.9)
+
+
+def test_guard_tokens_normalise_numbers():
+    assert guard_tokens("headache 3 days") == guard_tokens("a headache for three days")
+    assert guard_tokens("headache 3 days") != guard_tokens("headache 5 days")
+    assert guard_tokens("My name is John") != guard_tokens("My name is Jane")
+
+
+def test_guard_tokens_keep_negations_and_lowercase_names():
+    assert guard_tokens("no headache") != guard_tokens("headache")
+    assert guard_tokens("I don't have a fever") != guard_tokens("I have a fever")
+    assert guard_tokens("my name is john, headache") != guard_tokens("my name is jane, headache")
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_reuses_result(semantic):
+    await semantic.store("form", "headache 3 days", {"symptoms": "headache"})
+
+    assert await semantic.lookup("form", "a headache for three days") == {"symptoms": "headache"}
+    assert await semantic.lookup("form", "cough and fever") is None
+    assert (semantic.hits, semantic.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_different_numbers_are_not_reused(semantic):
+    await semantic.store("form", "headache 3 days", {"symptoms": "headache"})
+
+    assert await semantic.lookup("form", "headache 5 days") is None
+    assert semantic.guard_rejections == 1
+
+
+@pytest.mark.asyncio
+async def test_namespaces_and_bypass(semantic):
+    await semantic.store("form", "headache 3 days", {"symptoms": "headache"})
+
+    assert await semantic.lookup("recommendation", "headache 3 days") is None
+    with bypass():
+        assert await semantic.lookup("form", "headache 3 days") is None
+
+
+@pytest.mark.asyncio
+async def test_forms_are_reused_without_pii(semantic, monkeypatch):
+    builds = 0
+
+    async def build(text, strategy=None):
+        nonlocal builds
+        builds += 1
+        return schemas.PatientSchema(
+            pii=schemas.PatientPIISchema(name="John Smith", email=None, date_of_birth=None, error=None),
+            symptoms=schemas.ListSymptomSchema(
+                symps=[schemas.SymptomSchema(name="headache", duration=3, intensity=None, recurrence=None)],
+                error=None,
+            ),
+        )
+
+    monkeypatch.setattr(form_utils.conf, "SEMANTIC_CACHE", semantic)
+    builder = PatientFormBuilder(pii_extractor=PIIExtractor())
+    monkeypatch.setattr(builder, "_build_patient_form", build)
+
+    await builder.get_patient_form("My name is John Smith, headache 3 days")
+    [entry] = semantic.index._entries["form"]
+    assert "pii" not in entry[2]
+
+    # The reused form carries the PII of the new transcript
+    form = await builder.get_patient_form("My name is John Smith, a headache for three days")
+    assert builds == 1
+    assert form.pii.name == "John Smith"
+    assert form.symptoms.symps[0].name == "headache"
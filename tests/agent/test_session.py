@@ -0,0 +1,72 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from fastapi.testclient import TestClient
+
+import agent.api_gateway as gateway
+import agent.form_agent.schemas as schemas
+from agent.form_agent.merge import diff_forms, merge_forms
+from agent.form_agent.session import TranscriptSession
+
+
+def med(name, strength=None, frequency=None, duration=None):
+    return schemas.MedicationSchema(name=name, strength=strength, frequency=frequency, duration=duration)
+
+
+def form_with_meds(*meds):
+    return schemas.PatientSchema(medication=schemas.ListMedicationSchema(meds=list(meds), error=None))
+
+
+class TestMerge:
+    def test_repeated_mention_refines_entry(self):
+        base = form_with_meds(med("Metformin", strength=500))
+        update = form_with_meds(med(" metformin ", frequency=2), med("Ibuprofen", strength=200))
+
+        merged = merge_forms(base, update)
+
+        assert [(m.name, m.strength, m.frequency) for m in merged.medication.meds] == [
+            ("Metformin", 500, 2),
+            ("Ibuprofen", 200, None),
+        ]
+
+    def test_diff_only_reports_changed_entries(self):
+        old = form_with_meds(med("Metformin", strength=500))
+        new = form_with_meds(med("Metformin", strength=500), med("Ibuprofen", strength=200))
+
+        assert diff_forms(old, new) == {
+            "medication": [{"name": "Ibuprofen", "strength": 200, "frequency": None, "duration": None}]
+        }
+        assert diff_forms(new, new) == {}
+
+
+@pytest.mark.asyncio
+async def test_session_extracts_from_delta_plus_context():
+    builder = AsyncMock()
+    builder.get_patient_form.return_value = form_with_meds(med("Metformin", strength=500))
+    session = TranscriptSession(builder, context_chars=10)
+
+    await session.update("I take Metformin 500mg")
+    builder.get_patient_form.return_value = schemas.PatientSchema()
+    changes = await session.update("every day")
+
+    assert builder.get_patient_form.await_args.args[0] == "rmin 500mg every day"
+    assert changes == {}
+    assert session.form.medication.meds[0].name == "Metformin"
+
+
+def test_websocket_pushes_changes(monkeypatch):
+    responses = [
+        form_with_meds(med("Metformin", strength=500)),
+        form_with_meds(med("Metformin", strength=500)),
+    ]
+    monkeypatch.setattr(gateway.builder, "get_patient_form", AsyncMock(side_effect=responses))
+
+    with TestClient(gateway.app).websocket_connect("/sessions/form") as websocket:
+        websocket.send_text("I take Metformin 500mg")
+        first = websocket.receive_json()
+        websocket.send_text("as I said, Metformin 500mg")
+        second = websocket.receive_json()
+
+    assert first["changes"]["medication"][0]["name"] == "Metformin"
+    assert first["version"] == 1
+    assert second == {"type": "update", "version": 1, "changes": {}}
@@ -0,0 +1,42 @@
+import pytest
+
+import agent.form_agent.schemas as schemas
+import agent.utils as llm
+from agent.form_agent.utils import PatientFormBuilder
+from agent.schemas import ClientBase
+from agent.simulated import SimulatedProvider
+
+
+@pytest.mark.parametrize("schema", list(schemas.SCHEMAS.values()))
+def test_responses_are_schema_valid(schema):
+    provider = SimulatedProvider(seed=0)
+    for _ in range(20):
+        assert isinstance(provider.respond(schema), schema)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_runs_on_simulated_provider(monkeypatch):
+    provider = SimulatedProvider(latency_median=0.001, seed=0)
+    monkeypatch.setattr(llm.conf, "CLIENTS", [ClientBase(client=provider.client, model="simulated")])
+
+    form = await PatientFormBuilder().get_patient_form("I take Metformin and have a headache")
+
+    assert isinstance(form, schemas.PatientSchema)
+    # Classification plus one call per detected intent
+    assert provider.calls == 1 + sum(section is not None for section in (form.pii, form.medication, form.symptoms))
+
+
+@pytest.mark.asyncio
+async def test_failures_fall_through_to_the_next_model(monkeypatch):
+    failing = SimulatedProvider(latency_median=0, validation_failure_rate=1.0, seed=0)
+    healthy = SimulatedProvider(latency_median=0, seed=0)
+    monkeypatch.setattr(llm.conf, "CLIENTS", [
+        ClientBase(client=failing.client, model="failing"),
+        ClientBase(client=healthy.client, model="healthy"),
+    ])
+
+    result = await llm.LLM_CALL_FALLABLE(schemas.RecommendationSchema, "Hi")
+
+    assert isinstance(result, schemas.RecommendationSchema)
+    assert failing.validation_failures == 3
+    assert healthy.calls == 1
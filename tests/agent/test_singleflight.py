@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+
+import httpx
+
+import agent.api_gateway as gateway
+import agent.form_agent.schemas as schemas
+from agent.singleflight import SingleFlight, flight_key
+
+
+def test_flight_key_ignores_whitespace_only():
+    assert flight_key("form", "I have a  headache\n") == flight_key("form", "I have a headache")
+    assert flight_key("form", "I have a headache") != flight_key("recommendation", "I have a headache")
+    assert flight_key("form", "I am John") != flight_key("form", "I am john")
+    assert flight_key("form", "text", "auto") != flight_key("form", "text", "single-call")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_run():
+    flights = SingleFlight()
+    runs = 0
+
+    async def work():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.01)
+        return runs
+
+    results = await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+
+    assert results == [1] * 5
+    assert flights.stats() == {"in_flight": 0, "started": 1, "joined": 4}
+    # Once finished, the next call runs again
+    assert await flights.do("key", work) == 2
+
+
+@pytest.mark.asyncio
+async def test_failures_reach_every_caller():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    results = await asyncio.gather(*(flights.do("key", work) for _ in range(3)), return_exceptions=True)
+
+    assert [str(result) for result in results] == ["provider down"] * 3
+
+
+@pytest.mark.asyncio
+async def test_work_survives_one_caller_leaving():
+    flights = SingleFlight()
+    finished = asyncio.Event()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        finished.set()
+        return "form"
+
+    first = asyncio.create_task(flights.do("key", work))
+    second = asyncio.create_task(flights.do("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "form"
+    assert finished.is_set()
+
+
+@pytest.mark.asyncio
+async def test_work_is_cancelled_when_every_caller_leaves():
+    flights = SingleFlight()
+    started = asyncio.Event()
+
+    async def work():
+        started.set()
+        await asyncio.sleep(10)
+
+    caller = asyncio.create_task(flights.do("key", work))
+    await started.wait()
+    caller.cancel()
+    await asyncio.gather(caller, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert flights.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_identical_form_requests_extract_once(monkeypatch):
+    calls = 0
+
+    async def get_patient_form(text, strategy=None):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return schemas.PatientSchema(pii=None, medication=None, symptoms=None)
+
+    monkeypatch.setattr(gateway, "flights", SingleFlight())
+    monkeypatch.setattr(gateway.builder, "get_patient_form", get_patient_form)
+
+    transport = httpx.ASGITransport(app=gateway.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.post("/get_form/", json="I have a headache") for _ in range(4)))
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert calls == 1
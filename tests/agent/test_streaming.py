@@ -0,0 +1,88 @@
+import asyncio
+import json
+import time
+import pytest
+
+import httpx
+from instructor import AsyncInstructor
+
+import agent.api_gateway as gateway
+import agent.form_agent.schemas as schemas
+import agent.utils as llm
+from agent.form_agent.schemas import extractionStrategy
+from agent.form_agent.utils import PatientFormBuilder
+from agent.schemas import ClientBase
+
+HEADACHE = {"name": "headache", "duration": 3, "intensity": 2, "recurrence": False}
+METFORMIN = {"name": "Metformin", "strength": 500, "frequency": 2, "duration": 30}
+COMPLETE = {
+    schemas.PatientSchema: {"symptoms": {"symps": [HEADACHE], "error": None}, "medication": {"meds": [METFORMIN], "error": None}},
+    schemas.ListSymptomSchema: {"symps": [HEADACHE], "error": None},
+    schemas.ListMedicationSchema: {"meds": [METFORMIN], "error": None},
+}
+FIRST_CHUNK = {
+    schemas.PatientSchema: {"symptoms": {"symps": [{"name": "headache"}]}},
+    schemas.ListSymptomSchema: {"symps": [{"name": "headache"}]},
+    schemas.ListMedicationSchema: {"meds": [{"name": "Metformin"}]},
+}
+REST_OF_RESPONSE = 0.3
+
+
+async def streaming_create(response_model, messages, stream=False, **kwargs):
+    if not stream:
+        return schemas.InfoIntentSchema(intents=["Medication", "Symptoms"], error=None)
+
+    # Partial[Schema] streams the fields it has so far, then the rest
+    schema = next(s for s in COMPLETE if response_model.__name__ == f"Partial{s.__name__}")
+    partial_model = response_model.get_partial_model()
+
+    async def chunks():
+        yield partial_model.model_validate(FIRST_CHUNK[schema])
+        await asyncio.sleep(REST_OF_RESPONSE)
+        yield partial_model.model_validate(COMPLETE[schema])
+
+    return chunks()
+
+
+@pytest.fixture(autouse=True)
+def streaming_client(monkeypatch):
+    monkeypatch.setattr(llm.conf, "CLIENTS", [
+        ClientBase(client=AsyncInstructor(client=None, create=streaming_create), model="fake"),
+    ])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", [extractionStrategy.SINGLE, extractionStrategy.MULTI])
+async def test_first_symptom_arrives_before_the_form_completes(strategy):
+    builder = PatientFormBuilder()
+    started = time.perf_counter()
+    first_symptom_at = None
+    events = []
+
+    async for event in builder.stream_patient_form("headache and metformin", strategy):
+        events.append(event)
+        if first_symptom_at is None and isinstance(event, dict) and event["symptoms"]:
+            first_symptom_at = time.perf_counter() - started
+
+    assert first_symptom_at < REST_OF_RESPONSE / 2
+    assert time.perf_counter() - started >= REST_OF_RESPONSE
+    form = events[-1]
+    assert isinstance(form, schemas.PatientSchema)
+    assert form.symptoms.symps[0].intensity == 2
+    assert form.medication.meds[0].strength == 500
+
+
+@pytest.mark.asyncio
+async def test_sse_endpoint_emits_partial_then_complete():
+    transport = httpx.ASGITransport(app=gateway.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/get_form/stream?strategy=single-call", json="I have a headache")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (block.split("\n")[0].removeprefix("event: "), json.loads(block.split("\n")[1].removeprefix("data: ")))
+        for block in response.text.strip().split("\n\n")
+    ]
+    assert [name for name, _ in events] == ["partial", "partial", "complete"]
+    assert events[0][1]["symptoms"]["symps"][0]["name"] == "headache"
+    assert events[-1][1]["symptoms"]["symps"][0]["duration"] == 3
@@ -0,0 +1,62 @@
+import json
+import pytest
+
+import httpx
+
+import agent.api_gateway as gateway
+import agent.form_agent.schemas as schemas
+import agent.utils as llm
+from agent.schemas import ClientBase
+from agent.simulated import SimulatedProvider
+from agent.telemetry import CallTelemetry, count_retry
+
+
+@pytest.fixture
+def telemetry(monkeypatch, tmp_path):
+    telemetry = CallTelemetry(str(tmp_path / "trace.jsonl"))
+    monkeypatch.setattr(llm.conf, "TELEMETRY", telemetry)
+    return telemetry
+
+
+@pytest.mark.asyncio
+async def test_calls_are_recorded_per_outcome(monkeypatch, telemetry):
+    failing = SimulatedProvider(latency_median=0, validation_failure_rate=1.0, seed=0)
+    healthy = SimulatedProvider(latency_median=0, seed=0)
+    monkeypatch.setattr(llm.conf, "CLIENTS", [
+        ClientBase(client=failing.client, model="failing"),
+        ClientBase(client=healthy.client, model="healthy"),
+    ])
+
+    await llm.LLM_CALL_FALLABLE(schemas.RecommendationSchema, "Hi")
+
+    metrics = telemetry.exposition().decode()
+    assert 'agent_llm_calls_total{model="failing",outcome="validation_error",schema="RecommendationSchema"} 1.0' in metrics
+    assert 'agent_llm_calls_total{model="healthy",outcome="success",schema="RecommendationSchema"} 1.0' in metrics
+    assert 'agent_llm_fallbacks_total{model="failing"} 1.0' in metrics
+    assert 'agent_llm_tokens_total{kind="prompt",model="healthy",schema="RecommendationSchema"}' in metrics
+
+    with open(telemetry.trace_path) as trace:
+        calls = [json.loads(line) for line in trace]
+    assert [(call["model"], call["outcome"]) for call in calls] == [("failing", "validation_error"), ("healthy", "success")]
+    assert calls[1]["prompt_tokens"] > 0
+
+
+def test_retries_are_counted_only_inside_a_call(telemetry):
+    count_retry()
+    with telemetry.retry_counter() as retries:
+        count_retry()
+        count_retry()
+    assert retries == [2]
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(telemetry):
+    telemetry.hedges.inc()
+
+    transport = httpx.ASGITransport(app=gateway.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "agent_llm_hedges_total 1.0" in response.text
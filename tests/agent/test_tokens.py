@@ -0,0 +1,76 @@
+import os
+import pytest
+from types import SimpleNamespace
+
+from instructor import AsyncInstructor
+
+import agent.form_agent.prompts as prompts
+import agent.form_agent.schemas as schemas
+import agent.utils as llm
+from agent.form_agent.schemas import infoIntent as ii
+from agent.schemas import ClientBase
+from agent.telemetry import UsageStats
+from agent.tokens import TRIM_MARKER, estimate_tokens, fit_to_budget, split_chunks
+
+
+def test_short_text_is_untouched():
+    assert fit_to_budget("headache for 3 days", 100) == "headache for 3 days"
+
+
+def test_long_text_keeps_opening_and_end():
+    text = "My name is Alice. " + "filler " * 2000 + "Now I also have a fever."
+    trimmed = fit_to_budget(text, 200)
+
+    assert estimate_tokens(trimmed) <= 200
+    assert trimmed.startswith("My name is Alice.")
+    assert trimmed.endswith("Now I also have a fever.")
+    assert TRIM_MARKER in trimmed
+
+
+def test_chunks_break_between_sentences_and_overlap():
+    text = " ".join(f"Sentence number {i} is here." for i in range(40))
+    chunks = split_chunks(text, 200, 60)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert all(chunk.endswith("is here.") for chunk in chunks)
+    # Each chunk repeats the last two sentences of the one before
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert previous.endswith(" ".join(chunk.split(" ")[:10]))
+    assert split_chunks("short", 200, 60) == ["short"]
+
+
+@pytest.mark.parametrize("intent", [ii.PII, ii.MEDS, ii.SYMPS, ii.ALL, ii.CONT])
+def test_prompts_share_a_stable_prefix(intent):
+    first = prompts.PROMPTS[intent]("I have a headache")
+    second = prompts.PROMPTS[intent]("Metformin 500mg twice a day")
+
+    prefix = os.path.commonprefix([first, second])
+    assert prefix.rstrip().endswith("Text:")
+    assert first.strip().endswith("I have a headache")
+
+
+@pytest.mark.asyncio
+async def test_token_usage_is_recorded_per_call(monkeypatch):
+    async def create(response_model, messages, **kwargs):
+        resp = schemas.RecommendationSchema(recommendation="Rest", error=None)
+        resp._raw_response = SimpleNamespace(usage=SimpleNamespace(
+            prompt_tokens=1200,
+            completion_tokens=40,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1024),
+        ))
+        return resp
+
+    usage = UsageStats()
+    monkeypatch.setattr(llm.conf, "TOKEN_USAGE", usage)
+    monkeypatch.setattr(llm.conf, "CLIENTS", [
+        ClientBase(client=AsyncInstructor(client=None, create=create), model="fake"),
+    ])
+
+    await llm.LLM_CALL_FALLABLE(schemas.RecommendationSchema, "Hi there!")
+
+    [row] = usage.snapshot()
+    assert row["model"] == "fake"
+    assert row["schema"] == "RecommendationSchema"
+    assert (row["calls"], row["prompt_tokens"], row["completion_tokens"]) == (1, 1200, 40)
+    assert row["cached_prompt_tokens"] == 1024
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+
+from agent.providers import ProviderConfig, ProviderRegistry
+from agent.telemetry import CallTelemetry
+from agent.transport import ConnectionTracer, TransportConfig, build_http_client, http2_available
+
+
+async def keep_alive_server(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    # Answers every request on the connection until the client closes it
+    try:
+        while await reader.readuntil(b"\r\n\r\n"):
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+    except asyncio.IncompleteReadError:
+        writer.close()
+
+
+@pytest.mark.asyncio
+async def test_requests_reuse_pooled_connections():
+    telemetry = CallTelemetry()
+    tracer = ConnectionTracer(telemetry)
+    server = await asyncio.start_server(keep_alive_server, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+
+    async with build_http_client(TransportConfig(), tracer) as client:
+        for _ in range(3):
+            response = await client.get(f"http://{host}:{port}")
+            assert response.text == "ok"
+    server.close()
+
+    assert tracer.snapshot() == {
+        "requests": 3, "connections_opened": 1, "tls_handshakes": 0, "reuse_ratio": pytest.approx(2 / 3),
+    }
+    metrics = telemetry.exposition().decode()
+    assert 'agent_http_requests_total{host="127.0.0.1",protocol="http11"} 3.0' in metrics
+    assert 'agent_http_connections_opened_total{host="127.0.0.1"} 1.0' in metrics
+
+
+@pytest.mark.asyncio
+async def test_client_settings():
+    config = TransportConfig(max_connections=7, max_keepalive_connections=3, connect_timeout=2, read_timeout=9)
+
+    async with build_http_client(config) as client:
+        assert client.timeout.connect == 2
+        assert client.timeout.read == 9
+        pool = client._transport._pool
+        assert (pool._max_connections, pool._max_keepalive_connections) == (7, 3)
+        assert pool._http2 == http2_available()
+
+
+@pytest.mark.asyncio
+async def test_providers_share_one_http_client():
+    registry = ProviderRegistry([
+        ProviderConfig(name="a", api_key="sk-test", models=["m1"]),
+        ProviderConfig(name="b", api_key="sk-test", base_url="http://localhost:8000/v1", models=["m2"]),
+    ])
+
+    first, second = registry.clients()
+
+    assert first.client.client._client is registry.http_client()
+    assert second.client.client._client is registry.http_client()
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_clients_are_rebuilt_after_close():
+    registry = ProviderRegistry([ProviderConfig(name="a", api_key="sk-test", models=["m1"])])
+    [before] = registry.clients()
+    closed = registry.http_client()
+    await registry.aclose()
+
+    [after] = registry.clients()
+
+    assert after is not before
+    assert after.client.client._client is registry.http_client()
+    assert not registry.http_client().is_closed and closed.is_closed
+    await registry.aclose()
@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+
+from API_Gateway.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    default_route_priority,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    PRIORITY_LOW,
+)
+
+
+class TestRoutePriority:
+    def test_form_submission_is_high(self):
+        assert default_route_priority("POST", "/forms/") == PRIORITY_HIGH
+
+    def test_list_browsing_is_low(self):
+        assert default_route_priority("GET", "/patients/") == PRIORITY_LOW
+
+    def test_single_record_read_is_normal(self):
+        assert default_route_priority("GET", "/patients/9fa8ddc3") == PRIORITY_NORMAL
+
+    def test_metrics_are_exempt(self):
+        assert default_route_priority("GET", "/metrics/admission") is None
+
+
+@pytest.mark.asyncio
+class TestAdmissionController:
+
+    async def test_rejects_when_queue_full(self):
+        controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=1)
+        await controller.acquire(PRIORITY_LOW)
+        waiter = asyncio.create_task(controller.acquire(PRIORITY_LOW))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire(PRIORITY_LOW)
+        assert exc.value.reason == "queue_full"
+        assert exc.value.retry_after >= 1
+
+        controller.release()
+        await waiter
+        assert controller.in_flight == 1
+
+    async def test_high_priority_is_served_first(self):
+        controller = AdmissionController(max_concurrency=1, max_queue=4, queue_timeout=1)
+        await controller.acquire(PRIORITY_LOW)
+
+        order = []
+
+        async def request(priority, name):
+            await controller.acquire(priority)
+            order.append(name)
+
+        low = asyncio.create_task(request(PRIORITY_LOW, "browse"))
+        await asyncio.sleep(0)
+        high = asyncio.create_task(request(PRIORITY_HIGH, "submit"))
+        await asyncio.sleep(0)
+
+        controller.release()
+        await high
+        controller.release()
+        await low
+        assert order == ["submit", "browse"]
+
+    async def test_high_priority_displaces_low_when_full(self):
+        controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=1)
+        await controller.acquire(PRIORITY_LOW)
+        low = asyncio.create_task(controller.acquire(PRIORITY_LOW))
+        await asyncio.sleep(0)
+        high = asyncio.create_task(controller.acquire(PRIORITY_HIGH))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected):
+            await low
+
+        controller.release()
+        await high
+        assert controller.snapshot()["rejected_total"]["displaced"] == 1
+
+    async def test_queue_timeout_sheds_request(self):
+        controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=0.01)
+        await controller.acquire(PRIORITY_NORMAL)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire(PRIORITY_NORMAL)
+        assert exc.value.reason == "timeout"
+        assert controller.queue_depth == 0
+
+    async def test_slot_granted_at_timeout_is_returned(self, monkeypatch):
+        controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=0.05)
+        await controller.acquire(PRIORITY_NORMAL)
+
+        async def wait_for(future, timeout):
+            # The holder finishes in the same loop iteration the wait times out
+            controller.release()
+            raise asyncio.TimeoutError
+
+        monkeypatch.setattr(asyncio, "wait_for", wait_for)
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire(PRIORITY_NORMAL)
+
+        assert exc.value.reason == "timeout"
+        assert (controller.in_flight, controller.queue_depth) == (0, 0)
@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+import httpx
+from fastapi import FastAPI, Request
+
+from API_Gateway.audit import AuditEntry, AuditLog, AuditMiddleware, classify_request
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, batch):
+        self.batches.append(list(batch))
+
+
+class TestClassifyRequest:
+    def test_single_record_read(self):
+        patient_id = uuid4()
+        assert classify_request("GET", f"/patients/{patient_id}") == ("read", "patient", patient_id)
+
+    def test_collection_read_is_list(self):
+        assert classify_request("GET", "/doctors/") == ("list", "doctor", None)
+
+    def test_roster_read_is_list_of_doctor(self):
+        doctor_id = uuid4()
+        assert classify_request("GET", f"/doctors/{doctor_id}/patients") == ("list", "doctor", doctor_id)
+
+    def test_unaudited_route(self):
+        assert classify_request("GET", "/stats") is None
+
+
+@pytest.mark.asyncio
+class TestAuditLog:
+
+    async def test_entries_are_flushed_in_batches(self):
+        writer = RecordingWriter()
+        audit = AuditLog(writer, batch_size=10, flush_interval=0.01)
+        app = FastAPI()
+
+        @app.post("/forms/")
+        async def create_form(request: Request):
+            request.state.audit_entity_id = UUID(int=1)
+            return {}
+
+        @app.get("/patients/")
+        async def list_patients():
+            return []
+
+        app.add_middleware(AuditMiddleware, audit=audit)
+        await audit.start()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await client.post("/forms/", headers={"X-Actor-Id": "doctor-1"})
+            for _ in range(24):
+                await client.get("/patients/")
+        await audit.stop()
+
+        entries = [entry for batch in writer.batches for entry in batch]
+        assert len(entries) == 25
+        assert all(len(batch) <= 10 for batch in writer.batches)
+        assert entries[0].action == "create"
+        assert entries[0].entity_id == UUID(int=1)
+        assert entries[0].actor == "doctor-1"
+        assert entries[0].status_code == 200
+
+    async def test_stop_writes_the_batch_being_collected(self):
+        writer = RecordingWriter()
+        audit = AuditLog(writer, flush_interval=10)
+        await audit.start()
+        for i in range(5):
+            await audit.submit(AuditEntry(
+                audit_id=uuid4(),
+                occurred_at=datetime.now(timezone.utc),
+                actor=None,
+                client_addr=None,
+                action="read",
+                entity_type="patient",
+                entity_id=UUID(int=i),
+                method="GET",
+                path=f"/patients/{UUID(int=i)}",
+                status_code=200,
+            ))
+        # Let the flusher take the entries off the queue
+        await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(audit.stop(), timeout=1)
+
+        assert [entry.entity_id for batch in writer.batches for entry in batch] == [UUID(int=i) for i in range(5)]
+        assert (audit.written_total, audit.dropped_total) == (5, 0)
+
+    async def test_full_queue_drops_after_backpressure_wait(self):
+        audit = AuditLog(RecordingWriter(), max_pending=1, enqueue_timeout=0.01)
+        entry = AuditEntry(
+            audit_id=uuid4(),
+            occurred_at=datetime.now(timezone.utc),
+            actor=None,
+            client_addr=None,
+            action="list",
+            entity_type="patient",
+            entity_id=None,
+            method="GET",
+            path="/patients/",
+            status_code=200,
+        )
+        await audit.submit(entry)
+        await audit.submit(entry)
+
+        snapshot = audit.snapshot()
+        assert snapshot["pending"] == 1
+        assert snapshot["dropped_total"] == 1
+        assert snapshot["backpressure_waits_total"] == 1
@@ -0,0 +1,21 @@
+import time
+
+from API_Gateway.ids import uuid7
+
+
+class TestUUID7:
+    def test_version_and_variant(self):
+        key = uuid7()
+        assert key.version == 7
+        assert key.variant == "specified in RFC 4122"
+
+    def test_embeds_current_timestamp(self):
+        before = time.time_ns() // 1_000_000
+        key = uuid7()
+        after = time.time_ns() // 1_000_000
+        assert before <= key.int >> 80 <= after + 1
+
+    def test_keys_are_monotonic(self):
+        keys = [uuid7() for _ in range(10_000)]
+        assert keys == sorted(keys)
+        assert len(set(keys)) == len(keys)
@@ -0,0 +1,56 @@
+"""Counter triggers from db/migrations/001 and 005 under concurrent writers.
+
+Needs a database with the schema and migrations applied, such as the one
+from db/docker-compose.yml, in TEST_DATABASE_URL. Every transaction is
+rolled back, so no rows or counts are left behind.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+asyncpg = pytest.importorskip("asyncpg")
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+
+async def submit_form(conn, symptoms: int, ready: asyncio.Barrier):
+    # Mirrors create_form_submission: one INSERT per symptom and medication
+    # in a single transaction, interleaved with the other submission
+    tx = conn.transaction()
+    await tx.start()
+    try:
+        await ready.wait()
+        for i in range(symptoms):
+            await conn.execute("INSERT INTO public.symptom (name, duration, intensity) VALUES ($1, 1, 1)", f"s{i}")
+            await conn.execute("INSERT INTO public.medication (name, strength) VALUES ($1, 10)", f"m{i}")
+            await asyncio.sleep(0.005)
+        return await conn.fetchval(
+            "SELECT sum(row_count) FROM public.table_count WHERE table_name = 'symptom'"
+        )
+    finally:
+        await tx.rollback()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_do_not_deadlock():
+    dsn = TEST_DATABASE_URL.replace("+asyncpg", "")
+    first, second = await asyncpg.connect(dsn), await asyncpg.connect(dsn)
+    try:
+        before = await first.fetchval("SELECT sum(row_count) FROM public.table_count WHERE table_name = 'symptom'")
+        for _ in range(10):
+            ready = asyncio.Barrier(2)
+            counts = await asyncio.wait_for(asyncio.gather(
+                submit_form(first, 5, ready),
+                submit_form(second, 5, ready),
+            ), timeout=30)
+            # Each transaction sees its own five symptoms counted
+            assert all(count >= before + 5 for count in counts)
+        after = await first.fetchval("SELECT sum(row_count) FROM public.table_count WHERE table_name = 'symptom'")
+        assert after == before
+    finally:
+        await first.close()
+        await second.close()